@@ -4,7 +4,10 @@ import os
 
 from dxlbootstrap.app import Application
 from dxlclient.service import ServiceRegistrationInfo
+from . import json_codec
+from .request_context import RequestTimeouts
 from .requesthandlers import *
+from .client_settings import ClientSettings
 from .thehive_client import TheHiveClient
 
 # Configure local logger
@@ -18,6 +21,10 @@ class TheHiveService(Application):
 
     #: The service type for TheHive service API.
     _SERVICE_TYPE = "/opendxl-thehive/service/thehive-api"
+    #: Suffixes of API names which are appended to the end of the request
+    #: topic, after the method name. For example, the "get_alert_bulk" API
+    #: is exposed on the "alert/get/bulk" topic.
+    _API_NAME_MODIFIERS = ("bulk", "full")
 
     #: The name of the "General" section within the application configuration
     #: file.
@@ -53,6 +60,175 @@ class TheHiveService(Application):
     #: a path to a bundle of trusted CA certificates to use for validating
     #: TheHive server's certificate.
     _GENERAL_VERIFY_CERT_BUNDLE_CONFIG_PROP = "verifyCertBundle"
+    #: The property used to specify in the application configuration file
+    #: the engine through which requests are sent to TheHive server.
+    _GENERAL_ENGINE_CONFIG_PROP = "engine"
+    #: The property used to specify in the application configuration file
+    #: the number of worker threads used by the async engine.
+    _GENERAL_ASYNC_WORKER_COUNT_CONFIG_PROP = "asyncWorkerCount"
+    #: The property used to specify in the application configuration file
+    #: whether or not the raw body of responses from TheHive server should
+    #: be copied straight into the payload of DXL responses.
+    _GENERAL_RESPONSE_PASSTHROUGH_CONFIG_PROP = "responsePassthrough"
+    #: The property used to specify in the application configuration file
+    #: the name of the codec used to decode and encode JSON.
+    _GENERAL_JSON_CODEC_CONFIG_PROP = "jsonCodec"
+    #: The property used to specify in the application configuration file
+    #: whether or not concurrent identical read-only requests should share a
+    #: single request to TheHive server.
+    _GENERAL_COALESCE_REQUESTS_CONFIG_PROP = "coalesceRequests"
+    #: The property used to specify in the application configuration file
+    #: whether or not the results of searches should be parsed as the search
+    #: response is received from TheHive server.
+    _GENERAL_STREAM_SEARCH_RESULTS_CONFIG_PROP = "streamSearchResults"
+
+    #: The name of the "ConnectionPool" section within the application
+    #: configuration file.
+    _CONNECTION_POOL_CONFIG_SECTION = "ConnectionPool"
+    #: The property used to specify the maximum number of idle keep-alive
+    #: connections to TheHive server to retain for reuse in the application
+    #: configuration file.
+    _CONNECTION_POOL_SIZE_CONFIG_PROP = "poolSize"
+    #: The property used to specify the maximum number of connections which
+    #: may be open concurrently to TheHive server in the application
+    #: configuration file.
+    _CONNECTION_POOL_MAX_PER_HOST_CONFIG_PROP = "maxConnectionsPerHost"
+    #: The property used to specify the number of seconds after which an idle
+    #: connection to TheHive server is closed in the application
+    #: configuration file.
+    _CONNECTION_POOL_IDLE_TIMEOUT_CONFIG_PROP = "idleTimeout"
+
+    #: The name of the "Timeouts" section within the application
+    #: configuration file. Each property in the section may be overridden
+    #: for an individual API by prefixing the property name with the API
+    #: name and a period, for example "search_case.readTimeout".
+    _TIMEOUTS_CONFIG_SECTION = "Timeouts"
+    #: The property used to specify the number of seconds to wait for a
+    #: connection to TheHive server to be established in the application
+    #: configuration file.
+    _TIMEOUTS_CONNECT_CONFIG_PROP = "connectTimeout"
+    #: The property used to specify the number of seconds to wait for data to
+    #: be received from TheHive server in the application configuration file.
+    _TIMEOUTS_READ_CONFIG_PROP = "readTimeout"
+    #: The property used to specify the total number of seconds within which
+    #: a DXL request must be handled in the application configuration file.
+    _TIMEOUTS_DEADLINE_CONFIG_PROP = "deadline"
+    #: The property used to specify the maximum number of seconds that a DXL
+    #: request may wait before it is sent to TheHive server in the
+    #: application configuration file.
+    _TIMEOUTS_MAX_QUEUE_AGE_CONFIG_PROP = "maxQueueAge"
+
+    #: The name of the "Cache" section within the application configuration
+    #: file.
+    _CACHE_CONFIG_SECTION = "Cache"
+    #: The property used to specify the number of seconds for which the
+    #: responses to get requests are cached in the application configuration
+    #: file.
+    _CACHE_READ_TTL_CONFIG_PROP = "readCacheTtl"
+    #: The property used to specify the maximum total size, in bytes, of the
+    #: responses held in the read cache in the application configuration file.
+    _CACHE_READ_MAX_BYTES_CONFIG_PROP = "readCacheMaxBytes"
+    #: The property used to specify the number of seconds for which the
+    #: responses to searches are cached in the application configuration
+    #: file. The property may be overridden for an individual search API by
+    #: prefixing the property name with the API name and a period, for
+    #: example "search_alert.searchCacheTtl".
+    _CACHE_SEARCH_TTL_CONFIG_PROP = "searchCacheTtl"
+    #: The property used to specify the maximum total size, in bytes, of the
+    #: responses held in the search cache in the application configuration
+    #: file.
+    _CACHE_SEARCH_MAX_BYTES_CONFIG_PROP = "searchCacheMaxBytes"
+    #: The property used to specify the number of seconds for which "not
+    #: found" responses to get requests are cached in the application
+    #: configuration file.
+    _CACHE_NOT_FOUND_TTL_CONFIG_PROP = "notFoundCacheTtl"
+    #: The property used to specify the maximum total size, in bytes, of the
+    #: responses held in the not found cache in the application
+    #: configuration file.
+    _CACHE_NOT_FOUND_MAX_BYTES_CONFIG_PROP = "notFoundCacheMaxBytes"
+
+    #: The name of the "Bulk" section within the application configuration
+    #: file.
+    _BULK_CONFIG_SECTION = "Bulk"
+    #: The property used to specify the maximum number of requests to
+    #: TheHive server which may be in flight at a time for a single bulk DXL
+    #: request in the application configuration file.
+    _BULK_CONCURRENCY_CONFIG_PROP = "concurrency"
+    #: The property used to specify the maximum number of observables of a
+    #: bulk DXL request which may be combined into a single multi-value
+    #: request to TheHive server in the application configuration file.
+    _BULK_CHUNK_SIZE_CONFIG_PROP = "chunkSize"
+
+    #: The name of the "Batching" section within the application
+    #: configuration file.
+    _BATCHING_CONFIG_SECTION = "Batching"
+    #: The property used to specify the maximum number of seconds to wait
+    #: for concurrent get requests to be batched together in the application
+    #: configuration file.
+    _BATCHING_MAX_WAIT_CONFIG_PROP = "maxWait"
+    #: The property used to specify the maximum number of get requests in a
+    #: batch in the application configuration file.
+    _BATCHING_MAX_SIZE_CONFIG_PROP = "maxSize"
+
+    #: The name of the "Paging" section within the application configuration
+    #: file.
+    _PAGING_CONFIG_SECTION = "Paging"
+    #: The property used to specify the number of seconds after which an
+    #: unused cursor for a paged search expires in the application
+    #: configuration file.
+    _PAGING_CURSOR_TTL_CONFIG_PROP = "cursorTtl"
+    #: The property used to specify the maximum number of cursors for paged
+    #: searches which may be open at a time in the application configuration
+    #: file.
+    _PAGING_MAX_CURSORS_CONFIG_PROP = "maxCursors"
+    #: The property used to specify the maximum number of results in a page
+    #: of a paged search in the application configuration file.
+    _PAGING_MAX_PAGE_SIZE_CONFIG_PROP = "maxPageSize"
+
+    #: The name of the "Partitioning" section within the application
+    #: configuration file.
+    _PARTITIONING_CONFIG_SECTION = "Partitioning"
+    #: The property used to specify the maximum number of partitions into
+    #: which a partitioned search may be split in the application
+    #: configuration file.
+    _PARTITIONING_MAX_PARTITIONS_CONFIG_PROP = "maxPartitions"
+
+    #: The name of the "Chunking" section within the application
+    #: configuration file.
+    _CHUNKING_CONFIG_SECTION = "Chunking"
+    #: The property used to specify the maximum number of bytes in the
+    #: payload of a DXL response in the application configuration file.
+    _CHUNKING_MAX_MESSAGE_BYTES_CONFIG_PROP = "maxMessageBytes"
+    #: The property used to specify the number of seconds for which the
+    #: chunks of an oversized response are held in the application
+    #: configuration file.
+    _CHUNKING_TRANSFER_TTL_CONFIG_PROP = "transferTtl"
+    #: The property used to specify the maximum total size, in bytes, of the
+    #: oversized responses held for their chunks to be requested in the
+    #: application configuration file.
+    _CHUNKING_TRANSFER_MAX_BYTES_CONFIG_PROP = "transferMaxBytes"
+
+    #: The name of the "Compression" section within the application
+    #: configuration file.
+    _COMPRESSION_CONFIG_SECTION = "Compression"
+    #: The property used to specify the minimum number of bytes in the
+    #: payload of a DXL response for it to be compressed in the application
+    #: configuration file.
+    _COMPRESSION_MIN_BYTES_CONFIG_PROP = "minBytes"
+    #: The property used to specify the encodings in which response payloads
+    #: may be compressed in the application configuration file.
+    _COMPRESSION_ENCODINGS_CONFIG_PROP = "encodings"
+
+    #: The name of the "HttpCompression" section within the application
+    #: configuration file.
+    _HTTP_COMPRESSION_CONFIG_SECTION = "HttpCompression"
+    #: The property used to specify the value of the Accept-Encoding header
+    #: sent to TheHive server in the application configuration file.
+    _HTTP_COMPRESSION_ACCEPT_ENCODING_CONFIG_PROP = "acceptEncoding"
+    #: The property used to specify the minimum number of bytes in the body
+    #: of a request to TheHive server for it to be compressed in the
+    #: application configuration file.
+    _HTTP_COMPRESSION_REQUEST_MIN_BYTES_CONFIG_PROP = "requestMinBytes"
 
     #: Default plaintext HTTP port number at which TheHive API server is
     #: expected to be hosted.
@@ -63,6 +239,81 @@ class TheHiveService(Application):
     #: Default for whether or not TheHive server is expected to be hosted
     #: under SSL/TLS.
     _DEFAULT_USE_SSL = True
+    #: Default maximum number of idle connections to retain in the pool.
+    _DEFAULT_CONNECTION_POOL_SIZE = 10
+    #: Default number of worker threads used by the async engine.
+    _DEFAULT_ASYNC_WORKER_COUNT = 10
+    #: Default maximum number of concurrent connections to TheHive server
+    #: (0 for no limit).
+    _DEFAULT_CONNECTION_POOL_MAX_PER_HOST = 0
+    #: Default number of seconds after which an idle connection is closed.
+    _DEFAULT_CONNECTION_POOL_IDLE_TIMEOUT = 60
+    #: Default number of seconds to wait for a connection to TheHive server.
+    _DEFAULT_CONNECT_TIMEOUT = 10
+    #: Default number of seconds to wait for data from TheHive server.
+    _DEFAULT_READ_TIMEOUT = 60
+    #: Default total number of seconds within which a DXL request must be
+    #: handled (0 for no deadline).
+    _DEFAULT_DEADLINE = 0
+    #: Default maximum number of seconds that a DXL request may wait before
+    #: it is sent to TheHive server (0 for no limit).
+    _DEFAULT_MAX_QUEUE_AGE = 0
+    #: Default number of seconds for which the responses to get requests are
+    #: cached (0 to disable the read cache).
+    _DEFAULT_READ_CACHE_TTL = 0
+    #: Default maximum total size, in bytes, of the read cache.
+    _DEFAULT_READ_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    #: Default number of seconds for which the responses to searches are
+    #: cached (0 to disable the search cache).
+    _DEFAULT_SEARCH_CACHE_TTL = 0
+    #: Default maximum total size, in bytes, of the search cache.
+    _DEFAULT_SEARCH_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    #: Default number of seconds for which "not found" responses to get
+    #: requests are cached (0 to disable the not found cache).
+    _DEFAULT_NOT_FOUND_CACHE_TTL = 0
+    #: Default maximum total size, in bytes, of the not found cache.
+    _DEFAULT_NOT_FOUND_CACHE_MAX_BYTES = 1024 * 1024
+    #: Default maximum number of seconds to wait for get requests to be
+    #: batched together (0 to disable batching).
+    _DEFAULT_BATCHING_MAX_WAIT = 0
+    #: Default maximum number of get requests in a batch.
+    _DEFAULT_BATCHING_MAX_SIZE = 50
+    #: Default maximum number of requests to TheHive server in flight at a
+    #: time for a single bulk DXL request.
+    _DEFAULT_BULK_CONCURRENCY = 8
+    #: Default maximum number of observables combined into a single
+    #: multi-value request to TheHive server.
+    _DEFAULT_BULK_CHUNK_SIZE = 100
+    #: Default number of seconds after which an unused cursor for a paged
+    #: search expires (0 to disable paged searches).
+    _DEFAULT_PAGING_CURSOR_TTL = 300
+    #: Default maximum number of cursors for paged searches open at a time.
+    _DEFAULT_PAGING_MAX_CURSORS = 1000
+    #: Default maximum number of results in a page of a paged search.
+    _DEFAULT_PAGING_MAX_PAGE_SIZE = 1000
+    #: Default maximum number of partitions into which a partitioned search
+    #: may be split (0 to disable partitioned searches).
+    _DEFAULT_PARTITIONING_MAX_PARTITIONS = 32
+    #: Default maximum number of bytes in the payload of a DXL response (0
+    #: to disable chunking).
+    _DEFAULT_CHUNKING_MAX_MESSAGE_BYTES = 0
+    #: Default number of seconds for which the chunks of an oversized
+    #: response are held.
+    _DEFAULT_CHUNKING_TRANSFER_TTL = 60
+    #: Default maximum total size, in bytes, of the oversized responses held
+    #: for their chunks to be requested.
+    _DEFAULT_CHUNKING_TRANSFER_MAX_BYTES = 64 * 1024 * 1024
+    #: Default minimum number of bytes in the payload of a DXL response for
+    #: it to be compressed (0 to disable compression).
+    _DEFAULT_COMPRESSION_MIN_BYTES = 1024
+    #: Default encodings in which response payloads may be compressed, in
+    #: order of preference.
+    _DEFAULT_COMPRESSION_ENCODINGS = ["zstd", "gzip"]
+    #: Default value of the Accept-Encoding header sent to TheHive server.
+    _DEFAULT_HTTP_COMPRESSION_ACCEPT_ENCODING = "gzip, deflate"
+    #: Default minimum number of bytes in the body of a request to TheHive
+    #: server for it to be compressed (0 to disable request compression).
+    _DEFAULT_HTTP_COMPRESSION_REQUEST_MIN_BYTES = 0
 
     def __init__(self, config_dir):
         """
@@ -79,6 +330,37 @@ class TheHiveService(Application):
         self._api_password = None
         self._api_url = None
         self._verify_certificate = None
+        self._engine = None
+        self._async_worker_count = None
+        self._response_passthrough = None
+        self._coalesce_requests = None
+        self._stream_search_results = None
+        self._connection_pool_size = None
+        self._connection_pool_max_per_host = None
+        self._connection_pool_idle_timeout = None
+        self._request_timeouts = None
+        self._read_cache_ttl = None
+        self._read_cache_max_bytes = None
+        self._search_cache_ttls = None
+        self._search_cache_max_bytes = None
+        self._not_found_cache_ttl = None
+        self._not_found_cache_max_bytes = None
+        self._batching_max_wait = None
+        self._batching_max_size = None
+        self._bulk_concurrency = None
+        self._bulk_chunk_size = None
+        self._paging_cursor_ttl = None
+        self._paging_max_cursors = None
+        self._paging_max_page_size = None
+        self._partitioning_max_partitions = None
+        self._chunking_max_message_bytes = None
+        self._chunking_transfer_ttl = None
+        self._chunking_transfer_max_bytes = None
+        self._compression_min_bytes = None
+        self._compression_encodings = None
+        self._http_compression_accept_encoding = None
+        self._http_compression_request_min_bytes = None
+        self._thehive_client = None
 
     @property
     def client(self):
@@ -101,6 +383,18 @@ class TheHiveService(Application):
         """
         logger.info("On 'run' callback.")
 
+    def destroy(self):
+        """
+        Destroys the application, closing any connections held open to
+        TheHive server.
+        """
+        super(TheHiveService, self).destroy()
+        if self._thehive_client:
+            logger.info("TheHive client statistics: %s",
+                        self._thehive_client.stats)
+            self._thehive_client.close()
+            self._thehive_client = None
+
     def _get_setting_from_config(self, section, setting,
                                  default_value=None,
                                  return_type=str,
@@ -170,6 +464,82 @@ class TheHiveService(Application):
 
         return return_value
 
+    @classmethod
+    def _get_api_topic_path(cls, api_name):
+        """
+        Get the path, relative to the service type, of the request topic for
+        a TheHive API. For example, the path for the "get_case_task" API is
+        "case/task/get" and the path for the "get_alert_bulk" API is
+        "alert/get/bulk".
+
+        :param str api_name: Name of the API.
+        :return: The topic path.
+        :rtype: str
+        """
+        method, _, entity = api_name.partition("_")
+        modifier = ""
+        for api_name_modifier in cls._API_NAME_MODIFIERS:
+            suffix = "_" + api_name_modifier
+            if entity.endswith(suffix):
+                entity = entity[:-len(suffix)]
+                modifier = "/" + api_name_modifier
+        return "{}/{}{}".format(entity.replace("_", "/"), method, modifier)
+
+    def _get_request_timeouts(self, api_name):
+        """
+        Get the timeouts which apply to requests for a TheHive API from the
+        "Timeouts" section of the application configuration file.
+
+        :param str api_name: Name of the API.
+        :return: The timeouts.
+        :rtype: dxlthehiveservice.request_context.RequestTimeouts
+        """
+        timeouts = []
+        for setting, default_value in (
+                (self._TIMEOUTS_CONNECT_CONFIG_PROP,
+                 self._DEFAULT_CONNECT_TIMEOUT),
+                (self._TIMEOUTS_READ_CONFIG_PROP,
+                 self._DEFAULT_READ_TIMEOUT),
+                (self._TIMEOUTS_DEADLINE_CONFIG_PROP,
+                 self._DEFAULT_DEADLINE),
+                (self._TIMEOUTS_MAX_QUEUE_AGE_CONFIG_PROP,
+                 self._DEFAULT_MAX_QUEUE_AGE)):
+            value = self._get_setting_from_config(
+                self._TIMEOUTS_CONFIG_SECTION,
+                "{}.{}".format(api_name, setting),
+                return_type=float,
+                default_value=self._get_setting_from_config(
+                    self._TIMEOUTS_CONFIG_SECTION,
+                    setting,
+                    return_type=float,
+                    default_value=default_value))
+            # A value of 0 disables the timeout
+            timeouts.append(value or None)
+        return RequestTimeouts(*timeouts)
+
+    def _load_engine_configuration(self):
+        """
+        Load the settings for the engine through which requests are sent to
+        TheHive server from the application configuration.
+        """
+        self._engine = self._get_setting_from_config(
+            self._GENERAL_CONFIG_SECTION,
+            self._GENERAL_ENGINE_CONFIG_PROP,
+            default_value=TheHiveClient.ENGINE_THREADED)
+        if self._engine not in (TheHiveClient.ENGINE_THREADED,
+                                TheHiveClient.ENGINE_ASYNC):
+            raise ValueError(
+                "Unexpected value for setting {} in section {}: {}".format(
+                    self._GENERAL_ENGINE_CONFIG_PROP,
+                    self._GENERAL_CONFIG_SECTION,
+                    self._engine))
+
+        self._async_worker_count = self._get_setting_from_config(
+            self._GENERAL_CONFIG_SECTION,
+            self._GENERAL_ASYNC_WORKER_COUNT_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_ASYNC_WORKER_COUNT)
+
     def on_load_configuration(self, config):
         """
         Invoked after the application-specific configuration has been loaded
@@ -239,6 +609,190 @@ class TheHiveService(Application):
                 verify_certificate = verify_cert_bundle
         self._verify_certificate = verify_certificate
 
+        self._load_engine_configuration()
+
+        self._response_passthrough = self._get_setting_from_config(
+            self._GENERAL_CONFIG_SECTION,
+            self._GENERAL_RESPONSE_PASSTHROUGH_CONFIG_PROP,
+            return_type=bool,
+            default_value=True)
+
+        self._coalesce_requests = self._get_setting_from_config(
+            self._GENERAL_CONFIG_SECTION,
+            self._GENERAL_COALESCE_REQUESTS_CONFIG_PROP,
+            return_type=bool,
+            default_value=True)
+
+        self._stream_search_results = self._get_setting_from_config(
+            self._GENERAL_CONFIG_SECTION,
+            self._GENERAL_STREAM_SEARCH_RESULTS_CONFIG_PROP,
+            return_type=bool,
+            default_value=False)
+
+        json_codec.set_codec(self._get_setting_from_config(
+            self._GENERAL_CONFIG_SECTION,
+            self._GENERAL_JSON_CODEC_CONFIG_PROP,
+            default_value=json_codec.CODEC_AUTO))
+        logger.info("Using JSON codec: %s", json_codec.codec_name())
+
+        self._connection_pool_size = self._get_setting_from_config(
+            self._CONNECTION_POOL_CONFIG_SECTION,
+            self._CONNECTION_POOL_SIZE_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_CONNECTION_POOL_SIZE)
+
+        self._connection_pool_max_per_host = self._get_setting_from_config(
+            self._CONNECTION_POOL_CONFIG_SECTION,
+            self._CONNECTION_POOL_MAX_PER_HOST_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_CONNECTION_POOL_MAX_PER_HOST)
+
+        self._connection_pool_idle_timeout = self._get_setting_from_config(
+            self._CONNECTION_POOL_CONFIG_SECTION,
+            self._CONNECTION_POOL_IDLE_TIMEOUT_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_CONNECTION_POOL_IDLE_TIMEOUT)
+
+        self._request_timeouts = {
+            api_name: self._get_request_timeouts(api_name)
+            for api_name in self._api_names}
+
+        self._read_cache_ttl = self._get_setting_from_config(
+            self._CACHE_CONFIG_SECTION,
+            self._CACHE_READ_TTL_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_READ_CACHE_TTL)
+
+        self._read_cache_max_bytes = self._get_setting_from_config(
+            self._CACHE_CONFIG_SECTION,
+            self._CACHE_READ_MAX_BYTES_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_READ_CACHE_MAX_BYTES)
+
+        search_cache_ttl = self._get_setting_from_config(
+            self._CACHE_CONFIG_SECTION,
+            self._CACHE_SEARCH_TTL_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_SEARCH_CACHE_TTL)
+        # The search cache TTLs are keyed by the type of entity searched
+        # for, which is the part of the API name after "search_".
+        self._search_cache_ttls = {
+            api_name.partition("_")[2]: self._get_setting_from_config(
+                self._CACHE_CONFIG_SECTION,
+                "{}.{}".format(api_name, self._CACHE_SEARCH_TTL_CONFIG_PROP),
+                return_type=float,
+                default_value=search_cache_ttl)
+            for api_name in self._api_names if api_name.startswith("search_")}
+
+        self._search_cache_max_bytes = self._get_setting_from_config(
+            self._CACHE_CONFIG_SECTION,
+            self._CACHE_SEARCH_MAX_BYTES_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_SEARCH_CACHE_MAX_BYTES)
+
+        self._not_found_cache_ttl = self._get_setting_from_config(
+            self._CACHE_CONFIG_SECTION,
+            self._CACHE_NOT_FOUND_TTL_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_NOT_FOUND_CACHE_TTL)
+
+        self._not_found_cache_max_bytes = self._get_setting_from_config(
+            self._CACHE_CONFIG_SECTION,
+            self._CACHE_NOT_FOUND_MAX_BYTES_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_NOT_FOUND_CACHE_MAX_BYTES)
+
+        self._batching_max_wait = self._get_setting_from_config(
+            self._BATCHING_CONFIG_SECTION,
+            self._BATCHING_MAX_WAIT_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_BATCHING_MAX_WAIT)
+
+        self._batching_max_size = self._get_setting_from_config(
+            self._BATCHING_CONFIG_SECTION,
+            self._BATCHING_MAX_SIZE_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_BATCHING_MAX_SIZE)
+
+        self._bulk_concurrency = self._get_setting_from_config(
+            self._BULK_CONFIG_SECTION,
+            self._BULK_CONCURRENCY_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_BULK_CONCURRENCY)
+
+        self._bulk_chunk_size = self._get_setting_from_config(
+            self._BULK_CONFIG_SECTION,
+            self._BULK_CHUNK_SIZE_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_BULK_CHUNK_SIZE)
+
+        self._paging_cursor_ttl = self._get_setting_from_config(
+            self._PAGING_CONFIG_SECTION,
+            self._PAGING_CURSOR_TTL_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_PAGING_CURSOR_TTL)
+
+        self._paging_max_cursors = self._get_setting_from_config(
+            self._PAGING_CONFIG_SECTION,
+            self._PAGING_MAX_CURSORS_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_PAGING_MAX_CURSORS)
+
+        self._paging_max_page_size = self._get_setting_from_config(
+            self._PAGING_CONFIG_SECTION,
+            self._PAGING_MAX_PAGE_SIZE_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_PAGING_MAX_PAGE_SIZE)
+
+        self._partitioning_max_partitions = self._get_setting_from_config(
+            self._PARTITIONING_CONFIG_SECTION,
+            self._PARTITIONING_MAX_PARTITIONS_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_PARTITIONING_MAX_PARTITIONS)
+
+        self._chunking_max_message_bytes = self._get_setting_from_config(
+            self._CHUNKING_CONFIG_SECTION,
+            self._CHUNKING_MAX_MESSAGE_BYTES_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_CHUNKING_MAX_MESSAGE_BYTES)
+
+        self._chunking_transfer_ttl = self._get_setting_from_config(
+            self._CHUNKING_CONFIG_SECTION,
+            self._CHUNKING_TRANSFER_TTL_CONFIG_PROP,
+            return_type=float,
+            default_value=self._DEFAULT_CHUNKING_TRANSFER_TTL)
+
+        self._chunking_transfer_max_bytes = self._get_setting_from_config(
+            self._CHUNKING_CONFIG_SECTION,
+            self._CHUNKING_TRANSFER_MAX_BYTES_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_CHUNKING_TRANSFER_MAX_BYTES)
+
+        self._compression_min_bytes = self._get_setting_from_config(
+            self._COMPRESSION_CONFIG_SECTION,
+            self._COMPRESSION_MIN_BYTES_CONFIG_PROP,
+            return_type=int,
+            default_value=self._DEFAULT_COMPRESSION_MIN_BYTES)
+
+        self._compression_encodings = self._get_setting_from_config(
+            self._COMPRESSION_CONFIG_SECTION,
+            self._COMPRESSION_ENCODINGS_CONFIG_PROP,
+            return_type=list,
+            default_value=self._DEFAULT_COMPRESSION_ENCODINGS)
+
+        self._http_compression_accept_encoding = \
+            self._get_setting_from_config(
+                self._HTTP_COMPRESSION_CONFIG_SECTION,
+                self._HTTP_COMPRESSION_ACCEPT_ENCODING_CONFIG_PROP,
+                default_value=self._DEFAULT_HTTP_COMPRESSION_ACCEPT_ENCODING)
+
+        self._http_compression_request_min_bytes = \
+            self._get_setting_from_config(
+                self._HTTP_COMPRESSION_CONFIG_SECTION,
+                self._HTTP_COMPRESSION_REQUEST_MIN_BYTES_CONFIG_PROP,
+                return_type=int,
+                default_value=self._DEFAULT_HTTP_COMPRESSION_REQUEST_MIN_BYTES)
+
     def on_dxl_connect(self):
         """
         Invoked after the client associated with the application has connected
@@ -262,36 +816,78 @@ class TheHiveService(Application):
             "search_case_observable": TheHiveSearchCaseObservableRequestCallback,
             "create_alert": TheHiveCreateAlertRequestCallback,
             "get_alert": TheHiveGetAlertRequestCallback,
-            "search_alert": TheHiveSearchAlertRequestCallback
+            "search_alert": TheHiveSearchAlertRequestCallback,
+            "get_case_bulk": TheHiveBulkGetCaseRequestCallback,
+            "get_case_task_bulk": TheHiveBulkGetCaseTaskRequestCallback,
+            "get_case_observable_bulk":
+                TheHiveBulkGetCaseObservableRequestCallback,
+            "get_alert_bulk": TheHiveBulkGetAlertRequestCallback,
+            "create_alert_bulk": TheHiveBulkCreateAlertRequestCallback,
+            "create_case_observable_bulk":
+                TheHiveBulkCreateCaseObservableRequestCallback,
+            "create_case_full": TheHiveCreateFullCaseRequestCallback,
+            "get_case_full": TheHiveGetFullCaseRequestCallback,
+            "get_chunk": TheHiveGetChunkRequestCallback
         }
 
         # Register service 'thehive_service'
         logger.info("Registering service: %s", "thehive_service")
         service = ServiceRegistrationInfo(self._dxl_client, self._SERVICE_TYPE)
 
-        logger.info("Connecting to API URL: %s", self._api_url)
-        thehive_client = TheHiveClient(self._dxl_client,
-                                       self._api_url,
-                                       self._api_principal,
-                                       self._api_password,
-                                       self._verify_certificate)
+        logger.info("Connecting to API URL: %s (engine: %s)", self._api_url,
+                    self._engine)
+        settings = ClientSettings(
+            api_url=self._api_url,
+            api_principal=self._api_principal,
+            api_password=self._api_password,
+            verify_certificate=self._verify_certificate,
+            pool_size=self._connection_pool_size,
+            max_connections_per_host=self._connection_pool_max_per_host,
+            idle_timeout=self._connection_pool_idle_timeout,
+            engine=self._engine,
+            async_worker_count=self._async_worker_count,
+            passthrough=self._response_passthrough,
+            coalesce=self._coalesce_requests,
+            read_cache_ttl=self._read_cache_ttl,
+            read_cache_max_bytes=self._read_cache_max_bytes,
+            search_cache_ttls=self._search_cache_ttls,
+            search_cache_max_bytes=self._search_cache_max_bytes,
+            not_found_cache_ttl=self._not_found_cache_ttl,
+            not_found_cache_max_bytes=self._not_found_cache_max_bytes,
+            batch_max_wait=self._batching_max_wait,
+            batch_max_size=self._batching_max_size,
+            bulk_concurrency=self._bulk_concurrency,
+            bulk_chunk_size=self._bulk_chunk_size,
+            cursor_ttl=self._paging_cursor_ttl,
+            max_cursors=self._paging_max_cursors,
+            max_page_size=self._paging_max_page_size,
+            max_partitions=self._partitioning_max_partitions,
+            stream_results=self._stream_search_results,
+            max_message_bytes=self._chunking_max_message_bytes,
+            transfer_ttl=self._chunking_transfer_ttl,
+            transfer_max_bytes=self._chunking_transfer_max_bytes,
+            compression_min_bytes=self._compression_min_bytes,
+            compression_encodings=self._compression_encodings,
+            http_accept_encoding=self._http_compression_accept_encoding,
+            http_request_min_bytes=self._http_compression_request_min_bytes)
+        thehive_client = TheHiveClient(self._dxl_client, settings)
+        self._thehive_client = thehive_client
 
         for api_name in self._api_names:
             api_method = callbacks.get(api_name, None)
             if api_method:
-                topic_name_end, _, topic_name_start = api_name.partition("_")
-                topic_name = "{}{}/{}/{}".format(
+                topic_name = "{}{}/{}".format(
                     self._SERVICE_TYPE,
                     "/{}".format(self._service_unique_id) \
                     if self._service_unique_id else "",
-                    topic_name_start.replace("_", "/"),
-                    topic_name_end)
+                    self._get_api_topic_path(api_name))
                 logger.info(
                     "Registering request callback: thehive_%s_requesthandler",
                     api_name)
                 self.add_request_callback(
                     service, topic_name,
-                    api_method(self._dxl_client, thehive_client),
+                    api_method(self._dxl_client, thehive_client,
+                               self._request_timeouts[api_name]),
                     False)
             else:
                 logger.warning("API name is invalid: %s", api_name)
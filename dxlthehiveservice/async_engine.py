@@ -0,0 +1,246 @@
+from __future__ import absolute_import
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import ssl
+import threading
+import time
+
+import aiohttp
+
+from .fanout import copy_future
+from .json_stream import STREAM_CHUNK_SIZE
+from .request_context import RequestExpiredError
+from .thehive_response import TheHiveResponse
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncEngine(object):
+    """
+    Engine which sends requests to TheHive server from a single asyncio event
+    loop running in a dedicated thread.
+
+    Requests are submitted from the DXL request callback threads and the
+    callback threads are released immediately, so the number of requests in
+    flight to TheHive server is not bounded by the number of callback
+    threads. This engine requires Python 3.5+ and the ``aiohttp`` package.
+
+    The futures returned by the engine are completed from a pool of worker
+    threads rather than from the event loop, so that the callbacks added to
+    them, which decode, combine and compress responses, do not stall the
+    event loop.
+    """
+
+    #: Name of the field under which the counters for the engine are
+    #: reported in the client stats.
+    STATS_FIELD = "asyncEngine"
+
+    def __init__(self, request_headers, request_auth, verify_certificate,
+                 max_per_host=0, idle_timeout=0, worker_count=10):
+        """
+        Constructor parameters:
+
+        :param dict request_headers: HTTP headers to include in each request.
+        :param tuple request_auth: Tuple of the username and password to use
+            for basic authentication, or None to not use basic
+            authentication.
+        :param verify_certificate: For a value of False, do not verify the
+            server certificate in requests. For a value of True, verify the
+            server certificate using the default trust store. For a string
+            value, read the associated file name contents and use as a
+            certificate trust store.
+        :param int max_per_host: Maximum number of connections which may be
+            open to TheHive server concurrently. A value of 0 means no limit.
+        :param float idle_timeout: Number of seconds after which an idle
+            connection is closed. A value of 0 means idle connections are
+            never closed by the engine.
+        :param int worker_count: Number of worker threads which parse
+            streamed bodies and complete the futures returned by the engine.
+        """
+        self._request_headers = request_headers
+        self._request_auth = aiohttp.BasicAuth(*request_auth) \
+            if request_auth else None
+        if verify_certificate is True:
+            self._ssl = None
+        elif verify_certificate:
+            self._ssl = ssl.create_default_context(cafile=verify_certificate)
+        else:
+            self._ssl = False
+        self._max_per_host = max_per_host
+        self._idle_timeout = idle_timeout
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._in_flight = 0
+        self._semaphore = None
+        # Workers for the CPU bound work on responses, which is kept off the
+        # event loop: parsing streamed bodies and completing futures.
+        self._executor = ThreadPoolExecutor(max_workers=worker_count)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop,
+                                        name="TheHiveAsyncEngine")
+        self._thread.daemon = True
+        self._thread.start()
+        self._session = asyncio.run_coroutine_threadsafe(
+            self._create_session(), self._loop).result()
+
+    def _run_loop(self):
+        """
+        Run the event loop until the engine is closed.
+        """
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _create_session(self):
+        """
+        Create the HTTP session, bound to the event loop, through which
+        requests are sent.
+
+        :rtype: aiohttp.ClientSession
+        """
+        if self._max_per_host:
+            # The number of concurrent connections is bounded with a
+            # semaphore rather than the connector limit so that a request
+            # can be checked for expiry once it is ready to be sent.
+            self._semaphore = asyncio.Semaphore(self._max_per_host)
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            keepalive_timeout=self._idle_timeout or None,
+            ssl=self._ssl)
+        return aiohttp.ClientSession(connector=connector,
+                                     headers=self._request_headers,
+                                     auth=self._request_auth)
+
+    async def _send(self, method, url, data, timeout, expires_at,
+                    collector, headers):
+        """
+        Send a request to TheHive server.
+
+        :param str method: HTTP method for the request.
+        :param str url: URL for the request.
+        :param bytes data: JSON encoded body to include in the request.
+        :param tuple timeout: Connect and read timeouts, in seconds, for the
+            request.
+        :param float expires_at: Time, in seconds since the epoch, after
+            which the request should not be sent, or None if the request
+            does not expire.
+        :param dxlthehiveservice.json_stream.HitCollector collector:
+            Collector to which the body of a successful response is fed as it
+            is received, or None to read the whole body.
+        :param dict headers: HTTP headers to include in the request in
+            addition to the headers included in each request.
+        :return: The response.
+        :rtype: dxlthehiveservice.thehive_response.TheHiveResponse
+        :raises dxlthehiveservice.request_context.RequestExpiredError: if the
+            request expired while waiting for a connection.
+        """
+        try:
+            if self._semaphore:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout[0])
+            try:
+                if expires_at is not None and time.time() >= expires_at:
+                    raise RequestExpiredError()
+                async with self._session.request(
+                        method, url, data=data, headers=headers,
+                        timeout=aiohttp.ClientTimeout(
+                            total=None, connect=timeout[0],
+                            sock_read=timeout[1])) as response:
+                    if collector and 200 <= response.status <= 299:
+                        # Parsing the body is CPU bound, so it is done by a
+                        # worker to keep the event loop free to serve other
+                        # requests. The chunks are fed one at a time, so the
+                        # collector is never used by two workers at once.
+                        async for chunk in response.content.iter_chunked(
+                                STREAM_CHUNK_SIZE):
+                            if await self._loop.run_in_executor(
+                                    self._executor, collector.feed, chunk):
+                                break
+                        return TheHiveResponse(
+                            response.status,
+                            await self._loop.run_in_executor(
+                                self._executor, collector.finish),
+                            response.headers)
+                    content = await response.read()
+                    # The body is decompressed as it is received, so the
+                    # number of bytes received is only known from the
+                    # Content-Length header.
+                    wire_bytes = response.headers.get("Content-Length")
+                    return TheHiveResponse(
+                        response.status, content, response.headers,
+                        int(wire_bytes) if wire_bytes else None)
+            finally:
+                if self._semaphore:
+                    self._semaphore.release()
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    def submit(self, method, url, data=None, timeout=(None, None),
+               expires_at=None, collector=None, headers=None,
+               background=False):  # pylint: disable=unused-argument
+        """
+        Submit a request to the event loop. This method is thread safe.
+
+        :param str method: HTTP method for the request.
+        :param str url: URL for the request.
+        :param bytes data: JSON encoded body to include in the request.
+        :param tuple timeout: Connect and read timeouts, in seconds, for the
+            request. The connect timeout also bounds the time spent waiting
+            for a pooled connection.
+        :param float expires_at: Time, in seconds since the epoch, after
+            which the request should not be sent, or None if the request
+            does not expire.
+        :param dxlthehiveservice.json_stream.HitCollector collector:
+            Collector to which the body of a successful response is fed as it
+            is received, or None to read the whole body.
+        :param dict headers: HTTP headers to include in the request in
+            addition to the headers included in each request.
+        :param bool background: Accepted for compatibility with the threaded
+            engine. Every request is sent from the event loop, so the calling
+            thread is never blocked.
+        :return: Future for the
+            :class:`dxlthehiveservice.thehive_response.TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        with self._stats_lock:
+            self._submitted += 1
+            self._in_flight += 1
+        future = Future()
+        loop_future = asyncio.run_coroutine_threadsafe(
+            self._send(method, url, data, timeout, expires_at, collector,
+                       headers),
+            self._loop)
+        # The done callback of the loop future runs on the event loop, so it
+        # only hands the completion of the returned future to a worker.
+        loop_future.add_done_callback(
+            lambda completed: self._executor.submit(
+                copy_future, completed, future))
+        return future
+
+    @property
+    def stats(self):
+        """
+        Counters for the engine: the number of requests ``submitted``, the
+        number ``completed`` and the number currently ``inFlight``.
+
+        :rtype: dict
+        """
+        with self._stats_lock:
+            return {"submitted": self._submitted,
+                    "completed": self._completed,
+                    "inFlight": self._in_flight}
+
+    def close(self):
+        """
+        Close the HTTP session and stop the event loop.
+        """
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(
+                self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
+        self._executor.shutdown()
@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+from concurrent.futures import Future
+import logging
+import threading
+import time
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher(object):
+    """
+    Collects items submitted within a short window into batches which are
+    handled together.
+
+    The first item submitted for a batch key starts a new batch. The thread
+    which submitted it waits until either the batch reaches its maximum size
+    or the maximum wait has elapsed, and then hands the batch to the flush
+    function. Items submitted for the same key while the batch is open join
+    the batch and their submitting threads return immediately.
+    """
+    def __init__(self, flush_fn, max_wait, max_size):
+        """
+        Constructor parameters:
+
+        :param function flush_fn: Function which handles a batch. The function
+            is invoked with the batch key and a list of tuples, each
+            containing an item and the :class:`concurrent.futures.Future` for
+            its result. The function must complete each of the futures,
+            possibly asynchronously.
+        :param float max_wait: Maximum number of seconds to wait for further
+            items to join a batch before it is flushed.
+        :param int max_size: Maximum number of items in a batch.
+        """
+        self._flush_fn = flush_fn
+        self._max_wait = max_wait
+        self._max_size = max_size
+        self._condition = threading.Condition()
+        self._batches = {}
+        self._batches_flushed = 0
+        self._items_batched = 0
+
+    def submit(self, batch_key, item):
+        """
+        Add an item to the open batch for a key, starting a new batch if none
+        is open.
+
+        :param batch_key: Hashable key for the batch.
+        :param item: The item.
+        :return: Future for the result of the item.
+        :rtype: concurrent.futures.Future
+        """
+        future = Future()
+        with self._condition:
+            self._items_batched += 1
+            batch = self._batches.get(batch_key)
+            if batch is not None:
+                batch.append((item, future))
+                if len(batch) >= self._max_size:
+                    # Close the batch and wake the thread which started it so
+                    # that it flushes the batch.
+                    del self._batches[batch_key]
+                    self._condition.notify_all()
+                return future
+            batch = [(item, future)]
+            if self._max_size > 1:
+                self._batches[batch_key] = batch
+                end_time = time.time() + self._max_wait
+                while self._batches.get(batch_key) is batch:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        del self._batches[batch_key]
+                        break
+                    self._condition.wait(remaining)
+            self._batches_flushed += 1
+        self._flush(batch_key, batch)
+        return future
+
+    def _flush(self, batch_key, batch):
+        """
+        Hand a closed batch to the flush function, failing any futures in the
+        batch if the flush function raises an exception.
+
+        :param batch_key: Key for the batch.
+        :param list batch: List of tuples of each item and its future.
+        """
+        try:
+            self._flush_fn(batch_key, batch)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.exception("Error flushing batch for %s", batch_key)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(ex)
+
+    @property
+    def stats(self):
+        """
+        Counters for the number of batches flushed (``batches``) and the
+        number of items submitted to them (``items``).
+
+        :rtype: dict
+        """
+        with self._condition:
+            return {"batches": self._batches_flushed,
+                    "items": self._items_batched}
@@ -0,0 +1,578 @@
+from __future__ import absolute_import
+from collections import namedtuple
+import functools
+import operator
+
+from . import json_codec
+from .cache import canonical_hash
+from .compat import STRING_TYPES
+from .fanout import chain, completed_future, fan_out, gather, transform
+from .request_context import RequestExpiredError
+from .thehive_response import TheHiveResponse
+
+#: Description of a list of child entities to create for a parent entity.
+#: ``field`` is the name of the field which holds the results for the
+#: children in the combined response, ``entity_type`` is the type of the
+#: children, ``path_format`` is a format string for the URL subpath to
+#: create a child into which the id of the parent is inserted, ``bodies``
+#: is the list of bodies for the children and ``multi_value_field`` is the
+#: name of the field by which children may be combined into multi-value
+#: requests, or None if they may not be combined.
+ChildEntities = namedtuple("ChildEntities",
+                           ["field", "entity_type", "path_format", "bodies",
+                            "multi_value_field"])
+
+
+#: Description of a search for the child entities of a parent entity.
+#: ``field`` is the name of the field which holds the search results in the
+#: combined response, ``entity_type`` is the type of the children, ``path``
+#: is the URL subpath for the search and ``body`` is the body for the search.
+ChildSearch = namedtuple("ChildSearch",
+                         ["field", "entity_type", "path", "body"])
+
+
+def _encode_bulk_result(fields, content=None):
+    """
+    Encode the result for one item of a bulk request as JSON.
+
+    :param dict fields: Fields which describe the item, for example its id
+        and status. Must not be empty.
+    :param bytes content: JSON encoded body of the HTTP response for the
+        item, spliced in as-is under the ``result`` field, or None.
+    :return: The encoded result.
+    :rtype: bytes
+    """
+    encoded = json_codec.dumps(fields)
+    if content is None:
+        return encoded
+    return encoded[:-1] + b',"result":' + content + b"}"
+
+
+class BulkMixin(object):
+    """
+    Bulk and composite requests, which combine the responses of several
+    requests to TheHive server into a single DXL response, for
+    :class:`dxlthehiveservice.thehive_client.TheHiveClient`.
+    """
+
+    #: Name of the field in the body of the response to a request to create
+    #: an entity with its children which identifies the children that could
+    #: not be created.
+    FAILED_FIELD = "failed"
+    #: Name of the field in the ``failed`` object which holds the id of the
+    #: parent entity.
+    PARENT_ID_FIELD = "parentId"
+
+    #: HTTP status of the response to a multi-value request for which some
+    #: of the values could not be created.
+    _MULTI_STATUS = 207
+    #: Status reported for a value of a multi-value request which could not
+    #: be created.
+    _MULTI_STATUS_ITEM_ERROR_CODE = 400
+
+    def _encode_bulk_results(self, context, key_field, keys, futures,
+                             failed=None):
+        """
+        Encode the responses for the items of a bulk request as a JSON array,
+        holding an object for each item in the same order as the items. Each
+        object holds the key of the item, the HTTP ``status`` for the item,
+        and either the body of the response from TheHive server for the
+        item, as ``result``, or an ``error`` message.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str key_field: Name of the field in each result which holds
+            the key of the item.
+        :param list keys: Keys of the items.
+        :param list futures: Completed futures for the
+            :class:`TheHiveResponse` for each of the items.
+        :param list failed: List to which the keys of the items which failed
+            are appended, if any.
+        :return: The encoded array.
+        :rtype: bytes
+        """
+        results = []
+        for key, future in zip(keys, futures):
+            fields = {key_field: key}
+            result_fields, content = self._describe_result(context, future)
+            fields.update(result_fields)
+            if failed is not None and \
+                    not 200 <= result_fields["status"] <= 299:
+                failed.append(key)
+            results.append(_encode_bulk_result(fields, content))
+        return b"[" + b",".join(results) + b"]"
+
+    def _describe_result(self, context, future):
+        """
+        Describe the outcome of one of the requests made to TheHive server
+        for a DXL request which combines the responses of several requests.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param concurrent.futures.Future future: Completed future for the
+            :class:`TheHiveResponse` to the request.
+        :return: A tuple of a dict, holding the HTTP ``status`` for the
+            request and, if it failed, an ``error`` message, and the body of
+            the response if the request succeeded or None if it failed.
+        :rtype: tuple
+        """
+        try:
+            response = future.result()
+        except RequestExpiredError:
+            # The DXL request has been admitted, so a response is delivered
+            # for it even if one of its requests was dropped.
+            return {"status": self.DEADLINE_EXCEEDED_ERROR_CODE,
+                    "error": "Request expired before it was sent"}, None
+        except Exception as ex:  # pylint: disable=broad-except
+            status = self.DEADLINE_EXCEEDED_ERROR_CODE \
+                if context.deadline_exceeded() else 500
+            return {"status": status, "error": str(ex)}, None
+        if 200 <= response.status_code <= 299:
+            return {"status": response.status_code}, response.content
+        try:
+            response_dict = response.json()
+        except ValueError:
+            # The body of an error response, for example one from a proxy in
+            # front of TheHive server, may not be JSON. The other results of
+            # the request are still delivered.
+            response_dict = None
+        error_message = self._parse_error_message(response_dict) \
+            if isinstance(response_dict, dict) else None
+        return {"status": response.status_code,
+                "error": error_message or "Error handling request"}, None
+
+    def _combine_bulk_results(self, context, key_field, keys, futures):
+        """
+        Combine the responses for the items of a bulk request into a single
+        response. The response body is a JSON object with a ``results``
+        array, as described for :meth:`_encode_bulk_results`.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str key_field: Name of the field in each result which holds
+            the key of the item.
+        :param list keys: Keys of the items.
+        :param list futures: Completed futures for the
+            :class:`TheHiveResponse` for each of the items.
+        :return: The combined response.
+        :rtype: TheHiveResponse
+        """
+        return TheHiveResponse(200, b'{"results":' + self._encode_bulk_results(
+            context, key_field, keys, futures) + b"}")
+
+    def get_bulk(self, context, path_format, entity_ids):
+        """
+        Get a list of entities of the same type from TheHive server,
+        delivering a single combined response to the DXL fabric. The
+        requests for the entities are sent concurrently, up to the bulk
+        concurrency limit, and make use of the read and not found caches.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request. The type of the entities is taken
+            from the context.
+        :param str path_format: Format string for the URL subpath for the
+            request to get an entity, into which the entity id is inserted.
+        :param list entity_ids: Ids of the entities to get.
+        """
+        if not self._admit(context):
+            return
+        futures = fan_out(
+            [functools.partial(self._fetch_entity, context,
+                               context.entity_type, entity_id,
+                               path_format.format(entity_id))
+             for entity_id in entity_ids],
+            self._bulk_concurrency)
+        self._deliver(context, transform(
+            gather(futures),
+            lambda completed: self._combine_bulk_results(
+                context, "id", entity_ids, completed)))
+
+    def _create_entity(self, context, entity_type, case_id, path, body):
+        """
+        Create an entity on TheHive server without delivering the response
+        to the DXL fabric. Any cached entries which may be made stale by the
+        request are invalidated once it has completed.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of the entity.
+        :param str case_id: Id of the case for which the entity is created,
+            if any.
+        :param str path: URL subpath for the request to send to TheHive server.
+        :param dict body: Body to include in the HTTP request.
+        :return: Future for the :class:`TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        # The DXL request was checked for expiry when it was admitted. Once
+        # some of its entities may have been created, a response must be
+        # delivered for it, so the request is not dropped if it expires.
+        future = self._submit(context, "POST", path, json_codec.dumps(body),
+                              expires=False, background=True)
+        future.add_done_callback(
+            lambda completed: self._invalidate_for_create(
+                entity_type, case_id,
+                None if completed.exception() else completed.result()))
+        return future
+
+    def _start_creates(self, context, entity_type, case_id, path, bodies):
+        """
+        Start creating a list of entities on TheHive server, sending the
+        requests concurrently up to the bulk concurrency limit.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of the entities.
+        :param str case_id: Id of the case for which the entities are
+            created, if any.
+        :param str path: URL subpath for the requests to send to TheHive
+            server.
+        :param list bodies: Bodies to include in the HTTP requests.
+        :return: Futures for the :class:`TheHiveResponse` for each body.
+        :rtype: list
+        """
+        return fan_out(
+            [functools.partial(self._create_entity, context, entity_type,
+                               case_id, path, body)
+             for body in bodies],
+            self._bulk_concurrency)
+
+    def post_bulk(self, context, path, bodies):
+        """
+        Perform an HTTP POST request to TheHive server for each of a list of
+        bodies, delivering a single combined response to the DXL fabric. The
+        requests are sent concurrently, up to the bulk concurrency limit. The
+        failure of any of the requests does not prevent the others from being
+        sent. The result for each body is identified by its ``index`` in the
+        list.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str path: URL subpath for the requests to send to TheHive
+            server.
+        :param list bodies: Bodies to include in the HTTP requests.
+        """
+        if not self._admit(context):
+            return
+        futures = self._start_creates(context, context.entity_type,
+                                      context.case_id, path, bodies)
+        self._deliver(context, transform(
+            gather(futures),
+            lambda completed: self._combine_bulk_results(
+                context, "index", range(len(bodies)), completed)))
+
+    def _create_children(self, context, parent_field, children, response):
+        """
+        Start creating the child entities for a parent entity once the
+        parent has been created.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str parent_field: Name of the field which holds the parent in
+            the combined response.
+        :param list children: List of :class:`ChildEntities` to create.
+        :param TheHiveResponse response: Response to the request to create
+            the parent.
+        :return: Future for the combined :class:`TheHiveResponse`. If the
+            parent could not be created, the future is for the response to
+            the request to create the parent.
+        :rtype: concurrent.futures.Future
+        """
+        if not 200 <= response.status_code <= 299:
+            return completed_future(response)
+        parent_id = response.json()["id"]
+        child_futures = []
+        for child in children:
+            path = child.path_format.format(parent_id)
+            if child.multi_value_field:
+                child_futures.append(self._start_multi_value_creates(
+                    context, child.entity_type, parent_id, path, child.bodies,
+                    child.multi_value_field))
+            else:
+                child_futures.append(self._start_creates(
+                    context, child.entity_type, parent_id, path,
+                    child.bodies))
+
+        def _combine(_):
+            parts = [b"{", json_codec.dumps(parent_field), b":",
+                     response.content]
+            failed = {}
+            for child, futures in zip(children, child_futures):
+                failed_indexes = []
+                parts.extend([b",", json_codec.dumps(child.field), b":",
+                              self._encode_bulk_results(
+                                  context, "index", range(len(futures)),
+                                  futures, failed_indexes)])
+                if failed_indexes:
+                    failed[child.field] = failed_indexes
+            if failed:
+                failed[self.PARENT_ID_FIELD] = parent_id
+                parts.extend([b",", json_codec.dumps(self.FAILED_FIELD), b":",
+                              json_codec.dumps(failed)])
+            parts.append(b"}")
+            return TheHiveResponse(response.status_code, b"".join(parts))
+
+        return transform(
+            gather([future for futures in child_futures
+                    for future in futures]),
+            _combine)
+
+    def post_with_children(self, context, path, parent_field, children):
+        """
+        Perform an HTTP POST request to TheHive server to create a parent
+        entity and then, once it has been created, requests to create its
+        child entities, delivering a single combined response to the DXL
+        fabric. The children are created concurrently, up to the bulk
+        concurrency limit for each list of children. The failure of any of
+        the children does not prevent the others from being created.
+
+        The combined response body is a JSON object which holds the parent
+        entity, under the parent field, and an array of results for each
+        list of children, under the field for the list, as described for
+        :meth:`_encode_bulk_results`. The result for each child is
+        identified by its ``index`` in its list. If any of the children could
+        not be created, the response body also holds a ``failed`` object,
+        which holds the id of the parent, as ``parentId``, and the indexes of
+        the children which failed, under the field for each list, so that the
+        caller can retry just those children against the existing parent::
+
+            {"failed": {"parentId": "AWx1", "observables": [2, 5]}}
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request. The decoded body of the DXL request
+            is used as the body for the parent.
+        :param str path: URL subpath for the request to create the parent.
+        :param str parent_field: Name of the field which holds the parent in
+            the combined response.
+        :param list children: List of :class:`ChildEntities` to create.
+        """
+        if not self._admit(context):
+            return
+        self._deliver(context, chain(
+            self._create_entity(context, context.entity_type, None, path,
+                                context.body),
+            functools.partial(self._create_children, context, parent_field,
+                              children)))
+
+    @staticmethod
+    def _chunk_multi_value_bodies(bodies, field, chunk_size):
+        """
+        Group a list of bodies into chunks which can each be sent in a single
+        multi-value request. Bodies whose fields, other than the multi-value
+        field, are identical and whose multi-value field holds a single
+        string are grouped together. Any other body is placed in a chunk of
+        its own.
+
+        :param list bodies: The bodies.
+        :param str field: Name of the multi-value field.
+        :param int chunk_size: Maximum number of bodies in a chunk.
+        :return: List of chunks, each of which is a list of the indexes of
+            its bodies.
+        :rtype: list
+        """
+        chunks = []
+        open_chunks = {}
+        for index, body in enumerate(bodies):
+            value = body.get(field) if isinstance(body, dict) else None
+            if chunk_size <= 1 or not isinstance(value, STRING_TYPES):
+                chunks.append([index])
+                continue
+            template = dict(body)
+            del template[field]
+            key = canonical_hash(template)
+            chunk = open_chunks.get(key)
+            if chunk is None or len(chunk) >= chunk_size:
+                chunk = open_chunks[key] = []
+                chunks.append(chunk)
+            chunk.append(index)
+        return chunks
+
+    def _post_multi_value_chunk(self, context, entity_type, case_id, path,
+                                bodies, field):
+        """
+        Send a chunk of bodies to TheHive server in a single multi-value
+        request.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of the entities.
+        :param str case_id: Id of the case for which the entities are
+            created, if any.
+        :param str path: URL subpath for the request to send to TheHive server.
+        :param list bodies: Bodies in the chunk.
+        :param str field: Name of the multi-value field.
+        :return: Future for a list of the :class:`TheHiveResponse` for each
+            body in the chunk.
+        :rtype: concurrent.futures.Future
+        """
+        if len(bodies) == 1:
+            return transform(
+                self._create_entity(context, entity_type, case_id, path,
+                                    bodies[0]),
+                lambda response: [response])
+        body = dict(bodies[0])
+        body[field] = [chunk_body[field] for chunk_body in bodies]
+        return transform(
+            self._create_entity(context, entity_type, case_id, path, body),
+            lambda response: self._split_multi_value_response(
+                bodies, field, response))
+
+    def _split_multi_value_response(self, bodies, field, response):
+        """
+        Split the response to a multi-value request into a response for each
+        of the bodies combined into the request. The entities in the response
+        are matched to the bodies by the value of the multi-value field.
+
+        :param list bodies: Bodies combined into the request.
+        :param str field: Name of the multi-value field.
+        :param TheHiveResponse response: Response to the request.
+        :return: List of the response for each body.
+        :rtype: list
+        """
+        if response.status_code not in (200, 201, self._MULTI_STATUS):
+            return [response] * len(bodies)
+        responses = {}
+        for item in response.json():
+            if item.get("id"):
+                responses[item.get(field)] = TheHiveResponse(
+                    201, json_codec.dumps(item))
+            else:
+                # An item which could not be created is described by an error
+                # type and message, along with the attempted object.
+                responses[(item.get("object") or {}).get(field)] = \
+                    TheHiveResponse(self._MULTI_STATUS_ITEM_ERROR_CODE,
+                                    json_codec.dumps(item))
+        missing = TheHiveResponse(500, json_codec.dumps(
+            {"message": "No result was returned for the item"}))
+        return [responses.get(body[field], missing) for body in bodies]
+
+    def _start_multi_value_creates(self, context, entity_type, case_id, path,
+                                   bodies, field):
+        """
+        Start creating a list of entities on TheHive server, combining bodies
+        which differ only in the value of a multi-value field into chunks.
+        Each chunk is sent in a single request with a list of the values in
+        the field. The chunks are sent concurrently, up to the bulk
+        concurrency limit.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of the entities.
+        :param str case_id: Id of the case for which the entities are
+            created, if any.
+        :param str path: URL subpath for the requests to send to TheHive
+            server.
+        :param list bodies: Bodies to include in the HTTP requests.
+        :param str field: Name of the multi-value field.
+        :return: Futures for the :class:`TheHiveResponse` for each body.
+        :rtype: list
+        """
+        chunks = self._chunk_multi_value_bodies(bodies, field,
+                                                self._bulk_chunk_size)
+        chunk_futures = fan_out(
+            [functools.partial(self._post_multi_value_chunk, context,
+                               entity_type, case_id, path,
+                               [bodies[index] for index in chunk], field)
+             for chunk in chunks],
+            self._bulk_concurrency)
+        futures = [None] * len(bodies)
+        for chunk, chunk_future in zip(chunks, chunk_futures):
+            for position, index in enumerate(chunk):
+                futures[index] = transform(chunk_future,
+                                           operator.itemgetter(position))
+        return futures
+
+    def post_multi_value_bulk(self, context, path, bodies, field):
+        """
+        Perform HTTP POST requests to TheHive server for a list of bodies,
+        delivering a single combined response to the DXL fabric. Bodies
+        which differ only in the value of a multi-value field are combined
+        into chunks, as described for :meth:`_start_multi_value_creates`.
+        The result for each body is identified by its ``index`` in the list.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str path: URL subpath for the requests to send to TheHive
+            server.
+        :param list bodies: Bodies to include in the HTTP requests.
+        :param str field: Name of the multi-value field.
+        """
+        if not self._admit(context):
+            return
+        futures = self._start_multi_value_creates(
+            context, context.entity_type, context.case_id, path, bodies, field)
+        self._deliver(context, transform(
+            gather(futures),
+            lambda completed: self._combine_bulk_results(
+                context, "index", range(len(bodies)), completed)))
+
+    def _combine_children(self, context, parent_field, children, futures):
+        """
+        Combine the response for a parent entity with the responses to the
+        searches for its children.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str parent_field: Name of the field which holds the parent in
+            the combined response.
+        :param list children: List of :class:`ChildSearch` for the children.
+        :param list futures: Completed futures for the
+            :class:`TheHiveResponse` for the parent followed by those for
+            each search.
+        :return: The combined response, or the response for the parent if
+            the parent could not be retrieved.
+        :rtype: TheHiveResponse
+        :raises dxlthehiveservice.request_context.RequestExpiredError: if the
+            request for the parent was dropped because the DXL request
+            expired.
+        """
+        parent = futures[0].result()
+        if not 200 <= parent.status_code <= 299:
+            return parent
+        parts = [b"{", json_codec.dumps(parent_field), b":", parent.content]
+        errors = {}
+        for child, future in zip(children, futures[1:]):
+            result_fields, content = self._describe_result(context, future)
+            if content is None:
+                errors[child.field] = result_fields
+                content = b"null"
+            parts.extend([b",", json_codec.dumps(child.field), b":", content])
+        if errors:
+            parts.extend([b',"errors":', json_codec.dumps(errors)])
+        parts.append(b"}")
+        return TheHiveResponse(parent.status_code, b"".join(parts))
+
+    def get_with_children(self, context, path, parent_field, children):
+        """
+        Get a parent entity from TheHive server along with the results of
+        searches for its children, delivering a single combined response to
+        the DXL fabric. The request for the parent and the searches are sent
+        concurrently, and make use of the read and search caches.
+
+        The combined response body is a JSON object which holds the parent
+        entity, under the parent field, and the results of each search,
+        under the field for the search. If any of the searches fail, their
+        results are null and an ``errors`` object holds the HTTP ``status``
+        and ``error`` message for each failed search, under the field for the
+        search. If the parent cannot be retrieved, the response for the
+        parent is delivered instead.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request. The type and id of the parent are
+            taken from the context.
+        :param str path: URL subpath for the request to get the parent.
+        :param str parent_field: Name of the field which holds the parent in
+            the combined response.
+        :param list children: List of :class:`ChildSearch` for the children.
+        """
+        if not self._admit(context):
+            return
+        futures = [self._fetch_entity(context, context.entity_type,
+                                      context.entity_id, path)]
+        futures.extend(
+            self._fetch_search(context, child.entity_type, child.path,
+                               child.body)
+            for child in children)
+        self._deliver(context, transform(
+            gather(futures),
+            lambda completed: self._combine_children(
+                context, parent_field, children, completed)))
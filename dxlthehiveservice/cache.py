@@ -0,0 +1,172 @@
+from __future__ import absolute_import
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+from . import json_codec
+
+
+def canonical_hash(obj):
+    """
+    Compute a hash of an object which is encodable as JSON. Objects which are
+    equal produce the same hash regardless of the order of their keys.
+
+    :param obj: The object.
+    :return: Hex digest of the hash.
+    :rtype: str
+    """
+    return hashlib.sha256(json_codec.dumps_canonical(obj)).hexdigest()
+
+
+class _CacheEntry(object):
+    """
+    Value stored in a :class:`TtlCache`, along with its bookkeeping.
+    """
+    __slots__ = ("value", "size", "expires_at", "tags")
+
+    def __init__(self, value, size, expires_at, tags):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class TtlCache(object):
+    """
+    Thread-safe least recently used cache whose entries expire after a time
+    to live and whose total size is bounded by a number of bytes.
+
+    Each entry may be associated with a set of tags so that all of the
+    entries for a tag can be invalidated together.
+    """
+    #: Approximate number of bytes of overhead per entry, added to the size
+    #: of each entry when enforcing the bound on the size of the cache.
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes, ttl):
+        """
+        Constructor parameters:
+
+        :param int max_bytes: Maximum total size, in bytes, of the entries in
+            the cache.
+        :param float ttl: Default number of seconds after which an entry
+            expires.
+        """
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _remove(self, key):
+        """
+        Remove an entry. Must be called with the cache lock held.
+
+        :param key: Key of the entry.
+        """
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def get(self, key):
+        """
+        Get the value for a key.
+
+        :param key: Key of the entry.
+        :return: The value, or None if the cache has no unexpired entry for
+            the key.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.time():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            # Move the entry to the end of the order, making it the most
+            # recently used.
+            del self._entries[key]
+            self._entries[key] = entry
+            self._hits += 1
+            return entry.value
+
+    def put(self, key, value, size, ttl=None, tags=()):
+        """
+        Store a value for a key, evicting the least recently used entries if
+        needed to keep the cache within its maximum size.
+
+        :param key: Key of the entry.
+        :param value: Value to store.
+        :param int size: Size, in bytes, of the value.
+        :param float ttl: Number of seconds after which the entry expires.
+            If not specified, the default for the cache is used.
+        :param tags: Tags to associate with the entry.
+        :return: True if the value was stored, False if it is too large to
+            be held in the cache.
+        :rtype: bool
+        """
+        size += self.ENTRY_OVERHEAD
+        if size > self._max_bytes:
+            return False
+        expires_at = time.time() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, size, expires_at,
+                                             frozenset(tags))
+            self._size += size
+            while self._size > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+        return True
+
+    def invalidate(self, key):
+        """
+        Remove the entry for a key, if present.
+
+        :param key: Key of the entry.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._invalidations += 1
+
+    def invalidate_tag(self, tag):
+        """
+        Remove all of the entries associated with a tag.
+
+        :param tag: The tag.
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items()
+                    if tag in entry.tags]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+
+    @property
+    def stats(self):
+        """
+        Counters for the cache: ``hits``, ``misses``, entries evicted to keep
+        the cache within its maximum size (``evictions``), entries which
+        were found to have expired (``expirations``), entries removed by
+        invalidation (``invalidations``), and the current number of
+        ``entries`` and their total size in ``bytes``.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {"hits": self._hits,
+                    "misses": self._misses,
+                    "evictions": self._evictions,
+                    "expirations": self._expirations,
+                    "invalidations": self._invalidations,
+                    "entries": len(self._entries),
+                    "bytes": self._size}
@@ -0,0 +1,159 @@
+from __future__ import absolute_import
+from collections import namedtuple
+
+_ClientSettingsBase = namedtuple(
+    "ClientSettings",
+    ["api_url", "api_principal", "api_password", "verify_certificate",
+     "pool_size", "max_connections_per_host", "idle_timeout", "engine",
+     "async_worker_count", "passthrough", "coalesce", "read_cache_ttl", "read_cache_max_bytes",
+     "search_cache_ttls", "search_cache_max_bytes", "not_found_cache_ttl",
+     "not_found_cache_max_bytes", "batch_max_wait", "batch_max_size",
+     "bulk_concurrency", "bulk_chunk_size", "cursor_ttl", "max_cursors",
+     "max_page_size", "max_partitions", "stream_results", "max_message_bytes",
+     "transfer_ttl", "transfer_max_bytes", "compression_min_bytes",
+     "compression_encodings", "http_accept_encoding",
+     "http_request_min_bytes"])
+
+
+class ClientSettings(_ClientSettingsBase):
+    """
+    Settings for a :class:`dxlthehiveservice.thehive_client.TheHiveClient`,
+    read from the application configuration. Only the settings for TheHive
+    server and its credentials are required, every other setting has a
+    default.
+
+    :ivar str api_url: URL of TheHive API server.
+    :ivar str api_principal: API key or username to use for requests made
+        to TheHive server. The value is treated as a username only if
+        a non-empty value is specified for the api_password field.
+    :ivar str api_password: API password to use for requests made to
+        TheHive server.
+    :ivar verify_certificate: For a value of False, do not verify the
+        server certificate in requests. For a value of True, verify the
+        server certificate using the default trust store. For a string
+        value, read the associated file name contents and use as a
+        certificate trust store.
+    :ivar int pool_size: Maximum number of idle keep-alive connections
+        to retain for reuse by later requests to TheHive server.
+    :ivar int max_connections_per_host: Maximum number of connections
+        which may be open to TheHive server concurrently. A value of 0
+        means no limit.
+    :ivar float idle_timeout: Number of seconds after which an idle
+        connection is closed. A value of 0 means idle connections are
+        never closed by the client.
+    :ivar str engine: Engine through which requests are sent to
+        TheHive server, either ``threaded`` or ``async``, as named by the
+        ``ENGINE_*`` constants of
+        :class:`dxlthehiveservice.thehive_client.TheHiveClient`.
+    :ivar int async_worker_count: Number of worker threads used by the
+        ``async`` engine to parse streamed responses and to complete the
+        futures for requests.
+    :ivar bool passthrough: Whether to copy the raw body of responses
+        received from TheHive server straight into the payload of the
+        DXL response. If False, the body is decoded and re-encoded as
+        JSON.
+    :ivar bool coalesce: Whether concurrent identical read-only requests
+        should share a single request to TheHive server.
+    :ivar float read_cache_ttl: Number of seconds for which responses to
+        get requests for cases, tasks, observables and alerts are cached.
+        A value of 0 disables the read cache.
+    :ivar int read_cache_max_bytes: Maximum total size, in bytes, of the
+        responses held in the read cache.
+    :ivar dict search_cache_ttls: Number of seconds for which the
+        responses to searches are cached, keyed by the type of entity
+        searched for ("case", "case_task", "case_observable" or "alert").
+        Searches for entity types which are not present, or which have a
+        value of 0, are not cached.
+    :ivar int search_cache_max_bytes: Maximum total size, in bytes, of
+        the responses held in the search cache.
+    :ivar float not_found_cache_ttl: Number of seconds for which "not
+        found" responses to get requests for cases, tasks, observables
+        and alerts are cached. A value of 0 disables the not found cache.
+    :ivar int not_found_cache_max_bytes: Maximum total size, in bytes,
+        of the responses held in the not found cache.
+    :ivar float batch_max_wait: Maximum number of seconds to wait for
+        concurrent get requests for cases or alerts to be batched into a
+        single search. A value of 0 disables batching.
+    :ivar int batch_max_size: Maximum number of get requests in a batch.
+    :ivar int bulk_concurrency: Maximum number of requests to TheHive
+        server which may be in flight at a time for a single bulk DXL
+        request. With the threaded engine, this is also the number of
+        threads from which the requests for bulk DXL requests are sent.
+    :ivar int bulk_chunk_size: Maximum number of items of a bulk DXL
+        request which may be combined into a single multi-value request
+        to TheHive server.
+    :ivar float cursor_ttl: Number of seconds after which an unused
+        cursor for a paged search expires. A value of 0 disables paged
+        searches.
+    :ivar int max_cursors: Maximum number of cursors for paged searches
+        which may be open at a time.
+    :ivar int max_page_size: Maximum number of results in a page of a
+        paged search. A value of 0 means no limit.
+    :ivar int max_partitions: Maximum number of partitions into which a
+        partitioned search may be split. A value of 0 disables
+        partitioned searches.
+    :ivar bool stream_results: Whether the results of searches which
+        are projected to a subset of their fields or paged through are
+        parsed incrementally as the search response is received, rather
+        than once the whole response has been received. Responses which
+        are parsed incrementally are not held in the search cache, nor
+        shared with identical searches in flight.
+    :ivar int max_message_bytes: Maximum number of bytes in the payload
+        of a DXL response. A larger payload is split into chunks, the
+        first of which is delivered in the response. A value of 0
+        disables chunking.
+    :ivar float transfer_ttl: Number of seconds for which the chunks of
+        an oversized response are held for the caller to request.
+    :ivar int transfer_max_bytes: Maximum total size, in bytes, of the
+        oversized responses held for their chunks to be requested.
+    :ivar int compression_min_bytes: Minimum number of bytes in the
+        payload of a DXL response for it to be compressed, if the caller
+        accepts a compressed payload. A value of 0 disables compression.
+    :ivar list compression_encodings: Names of the encodings in which
+        response payloads may be compressed, in order of preference.
+        Encodings whose packages are not installed are skipped.
+    :ivar str http_accept_encoding: Value of the ``Accept-Encoding``
+        header sent to TheHive server, for example ``gzip, deflate``, or
+        None to leave the header to the HTTP library. Compressed
+        responses are decompressed as they are received.
+    :ivar int http_request_min_bytes: Minimum number of bytes in the
+        body of a request to TheHive server for it to be compressed with
+        gzip. If TheHive server rejects a compressed body which it then
+        accepts uncompressed, request compression is disabled. A value
+        of 0 disables request compression.
+    """
+    __slots__ = ()
+
+
+# Defaults for the optional settings, in the order of their fields.
+_ClientSettingsBase.__new__.__defaults__ = (
+    10,  # pool_size
+    0,  # max_connections_per_host
+    60,  # idle_timeout
+    "threaded",  # engine
+    10,  # async_worker_count
+    True,  # passthrough
+    True,  # coalesce
+    0,  # read_cache_ttl
+    0,  # read_cache_max_bytes
+    None,  # search_cache_ttls
+    0,  # search_cache_max_bytes
+    0,  # not_found_cache_ttl
+    0,  # not_found_cache_max_bytes
+    0,  # batch_max_wait
+    0,  # batch_max_size
+    8,  # bulk_concurrency
+    100,  # bulk_chunk_size
+    0,  # cursor_ttl
+    0,  # max_cursors
+    0,  # max_page_size
+    0,  # max_partitions
+    False,  # stream_results
+    0,  # max_message_bytes
+    0,  # transfer_ttl
+    0,  # transfer_max_bytes
+    0,  # compression_min_bytes
+    None,  # compression_encodings
+    None,  # http_accept_encoding
+    0,  # http_request_min_bytes
+)
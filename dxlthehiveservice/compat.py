@@ -0,0 +1,14 @@
+from __future__ import absolute_import
+
+try:
+    #: Types of string values, including ``unicode`` on Python 2.
+    STRING_TYPES = (str, unicode)  # pylint: disable=undefined-variable
+except NameError:
+    STRING_TYPES = (str,)
+
+try:
+    #: Types of integer values, including ``long`` on Python 2. Note that
+    #: ``bool`` is a subclass of ``int``, so it must be excluded separately.
+    INTEGER_TYPES = (int, long)  # pylint: disable=undefined-variable
+except NameError:
+    INTEGER_TYPES = (int,)
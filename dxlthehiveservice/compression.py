@@ -0,0 +1,103 @@
+from __future__ import absolute_import
+import zlib
+
+#: Name of the gzip encoding.
+ENCODING_GZIP = "gzip"
+#: Name of the Zstandard encoding, which requires the ``zstandard`` package.
+ENCODING_ZSTD = "zstd"
+
+#: Compression level used for the gzip encoding. Level 6 is the zlib default,
+#: trading a little compression for considerably less CPU than level 9.
+_GZIP_LEVEL = 6
+#: Compression level used for the Zstandard encoding.
+_ZSTD_LEVEL = 3
+#: Value for the zlib ``wbits`` parameter which selects the gzip format.
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _gzip_compress(data):
+    """
+    Compress data in the gzip format.
+
+    :param bytes data: The data.
+    :return: The compressed data.
+    :rtype: bytes
+    """
+    compressor = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _create_zstd_compress():
+    """
+    Create the function which compresses data in the Zstandard format.
+
+    :return: The function, or None if the ``zstandard`` package is not
+        installed.
+    :rtype: function
+    """
+    try:
+        import zstandard  # pylint: disable=import-error
+    except ImportError:
+        return None
+
+    def _zstd_compress(data):
+        # A ZstdCompressor may not be used from several threads at once, so a
+        # compressor is created for each call.
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+
+    return _zstd_compress
+
+
+#: Functions which compress data, keyed by the name of their encoding. Only
+#: the encodings whose packages are installed are present.
+_COMPRESSORS = {ENCODING_GZIP: _gzip_compress}
+_ZSTD_COMPRESS = _create_zstd_compress()
+if _ZSTD_COMPRESS:
+    _COMPRESSORS[ENCODING_ZSTD] = _ZSTD_COMPRESS
+
+
+def available_encodings(encodings):
+    """
+    Filter a list of encodings to those which are supported and whose
+    packages are installed.
+
+    :param list encodings: Names of the encodings.
+    :return: Names of the available encodings, in the same order.
+    :rtype: list
+    :raises ValueError: if any of the encodings is not recognized.
+    """
+    for encoding in encodings:
+        if encoding not in (ENCODING_GZIP, ENCODING_ZSTD):
+            raise ValueError("Unknown encoding: {}".format(encoding))
+    return [encoding for encoding in encodings if encoding in _COMPRESSORS]
+
+
+def choose_encoding(accepted, encodings):
+    """
+    Choose the encoding in which to compress a payload for a caller.
+
+    :param str accepted: Comma-separated names of the encodings which the
+        caller accepts.
+    :param list encodings: Names of the encodings which may be used, in order
+        of preference.
+    :return: Name of the most preferred encoding which the caller accepts,
+        or None if the caller accepts none of them.
+    :rtype: str
+    """
+    accepted = {encoding.strip().lower() for encoding in accepted.split(",")}
+    for encoding in encodings:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    """
+    Compress data.
+
+    :param bytes data: The data.
+    :param str encoding: Name of the encoding, which must be available.
+    :return: The compressed data.
+    :rtype: bytes
+    """
+    return _COMPRESSORS[encoding](data)
@@ -0,0 +1,182 @@
+from __future__ import absolute_import
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when a session cannot be checked out of a :class:`SessionPool`
+    before the timeout for the checkout expires.
+    """
+
+
+class SessionPool(object):
+    """
+    Pool of keep-alive HTTP sessions through which requests to TheHive server
+    are sent.
+
+    Each session is checked out by a single thread at a time, so the
+    persistent connection that a session holds to TheHive server can be
+    safely reused across the threads which invoke the DXL request callbacks.
+    """
+    def __init__(self, pool_size, max_per_host=0, idle_timeout=0):
+        """
+        Constructor parameters:
+
+        :param int pool_size: Maximum number of idle sessions to retain in the
+            pool for reuse by later requests.
+        :param int max_per_host: Maximum number of sessions which may be
+            checked out from the pool concurrently. Since each checked out
+            session holds at most one connection to TheHive server, this
+            bounds the number of simultaneous connections to the host. A
+            value of 0 means no limit.
+        :param float idle_timeout: Number of seconds after which a session
+            which has not been used is closed and evicted from the pool. A
+            value of 0 means idle sessions are never evicted.
+        """
+        self._pool_size = pool_size
+        self._max_per_host = max_per_host
+        self._idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        # Idle sessions, ordered from least to most recently used. Each entry
+        # is a tuple of the session and the time at which it was released.
+        self._idle_sessions = []
+        self._sessions_in_use = 0
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _create_session():
+        """
+        Create a new HTTP session with a single-connection adapter.
+
+        :return: The new session.
+        :rtype: requests.Session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _evict_idle_sessions(self, now):
+        """
+        Close and remove any sessions which have been idle for longer than
+        the idle timeout. Must be called with the pool condition held.
+
+        :param float now: Current time, in seconds since the epoch.
+        :return: The list of sessions which were evicted.
+        :rtype: list
+        """
+        evicted = []
+        if self._idle_timeout:
+            while self._idle_sessions and \
+                    now - self._idle_sessions[0][1] > self._idle_timeout:
+                evicted.append(self._idle_sessions.pop(0)[0])
+            self._evictions += len(evicted)
+        return evicted
+
+    def acquire(self, timeout=None):
+        """
+        Check out a session from the pool, creating a new one if no idle
+        session is available. If the maximum number of sessions are already
+        checked out, block until one is released.
+
+        :param float timeout: Maximum number of seconds to wait for a session
+            to be released, or None to wait indefinitely.
+        :return: The session.
+        :rtype: requests.Session
+        :raises PoolTimeoutError: if no session is released before the
+            timeout expires.
+        """
+        session = None
+        end_time = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._max_per_host and \
+                    self._sessions_in_use >= self._max_per_host:
+                if end_time is None:
+                    self._condition.wait()
+                else:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            "Timed out waiting for a connection to TheHive "
+                            "server")
+                    self._condition.wait(remaining)
+            evicted = self._evict_idle_sessions(time.time())
+            self._sessions_in_use += 1
+            if self._idle_sessions:
+                # Reuse the most recently released session since its
+                # connection is the least likely to have been closed by the
+                # server.
+                session = self._idle_sessions.pop()[0]
+                self._hits += 1
+            else:
+                self._misses += 1
+        for evicted_session in evicted:
+            evicted_session.close()
+        if not session:
+            try:
+                session = self._create_session()
+            except Exception:
+                with self._condition:
+                    self._sessions_in_use -= 1
+                    self._condition.notify()
+                raise
+        return session
+
+    def release(self, session):
+        """
+        Return a session previously checked out via :meth:`acquire` to the
+        pool.
+
+        :param requests.Session session: The session to return.
+        """
+        with self._condition:
+            self._sessions_in_use -= 1
+            retain = not self._closed and \
+                len(self._idle_sessions) < self._pool_size
+            if retain:
+                self._idle_sessions.append((session, time.time()))
+            self._condition.notify()
+        if not retain:
+            session.close()
+
+    @property
+    def stats(self):
+        """
+        Counters for the pool: the number of requests which reused an idle
+        session (``hits``), the number which needed a new session
+        (``misses``), the number of sessions evicted for being idle
+        (``evictions``), and the current number of ``idle`` and ``inUse``
+        sessions.
+
+        :rtype: dict
+        """
+        with self._condition:
+            return {"hits": self._hits,
+                    "misses": self._misses,
+                    "evictions": self._evictions,
+                    "idle": len(self._idle_sessions),
+                    "inUse": self._sessions_in_use}
+
+    def close(self):
+        """
+        Close all idle sessions in the pool. Sessions which are currently
+        checked out are closed when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            idle_sessions = self._idle_sessions
+            self._idle_sessions = []
+        for session, _ in idle_sessions:
+            session.close()
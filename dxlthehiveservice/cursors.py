@@ -0,0 +1,116 @@
+from __future__ import absolute_import
+from collections import namedtuple, OrderedDict
+import threading
+import time
+import uuid
+
+#: State of a search which is paged through with a cursor. ``entity_type``
+#: is the type of entity searched for, ``path`` is the URL subpath for the
+#: search, ``body`` is the body for the search without a range,
+#: ``page_size`` is the number of results in each page, ``offset`` is the
+#: index of the first result in the next page and ``fields`` is the list of
+#: fields to which each result is projected, or None for all fields.
+SearchCursor = namedtuple("SearchCursor",
+                          ["entity_type", "path", "body", "page_size",
+                           "offset", "fields"])
+
+
+class CursorStore(object):
+    """
+    Thread-safe store for the state of the cursors through which searches are
+    paged, keyed by opaque cursor ids.
+
+    Each cursor id may only be used once: taking the state for a cursor
+    removes it from the store, and the state for the following page is
+    stored under a new id. Cursors which are not used within a time to live
+    expire. If the store is full, the least recently stored cursors are
+    evicted.
+    """
+    def __init__(self, max_cursors, ttl):
+        """
+        Constructor parameters:
+
+        :param int max_cursors: Maximum number of cursors held in the store.
+        :param float ttl: Number of seconds after which an unused cursor
+            expires.
+        """
+        self._max_cursors = max_cursors
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._cursors = OrderedDict()
+        self._created = 0
+        self._taken = 0
+        self._expirations = 0
+        self._evictions = 0
+
+    def _purge_expired(self, now):
+        """
+        Remove the cursors which have expired. Must be called with the store
+        lock held.
+
+        :param float now: The current time, in seconds since the epoch.
+        """
+        # Cursors are stored in the order in which they expire, so the
+        # oldest cursors are at the front.
+        while self._cursors:
+            cursor_id, (expires_at, _) = next(iter(self._cursors.items()))
+            if expires_at > now:
+                break
+            del self._cursors[cursor_id]
+            self._expirations += 1
+
+    def put(self, cursor, cursor_id=None):
+        """
+        Store the state for a cursor.
+
+        :param SearchCursor cursor: State for the cursor.
+        :param str cursor_id: Id under which to store the state. If not
+            specified, a new id is generated.
+        :return: The id of the cursor.
+        :rtype: str
+        """
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            if cursor_id is None:
+                cursor_id = uuid.uuid4().hex
+                self._created += 1
+            self._cursors[cursor_id] = (now + self._ttl, cursor)
+            while len(self._cursors) > self._max_cursors:
+                del self._cursors[next(iter(self._cursors))]
+                self._evictions += 1
+        return cursor_id
+
+    def take(self, cursor_id):
+        """
+        Remove the state for a cursor from the store.
+
+        :param str cursor_id: Id of the cursor.
+        :return: State for the cursor, or None if the store has no unexpired
+            cursor with the id.
+        :rtype: SearchCursor
+        """
+        with self._lock:
+            self._purge_expired(time.time())
+            entry = self._cursors.pop(cursor_id, None)
+            if entry is None:
+                return None
+            self._taken += 1
+            return entry[1]
+
+    @property
+    def stats(self):
+        """
+        Counters for the store: cursors ``created``, cursors ``taken`` to
+        fetch a page, cursors which expired unused (``expirations``), cursors
+        evicted to keep the store within its maximum size (``evictions``),
+        and the current number of ``open`` cursors.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {"created": self._created,
+                    "taken": self._taken,
+                    "expirations": self._expirations,
+                    "evictions": self._evictions,
+                    "open": len(self._cursors)}
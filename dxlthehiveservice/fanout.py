@@ -0,0 +1,204 @@
+from __future__ import absolute_import
+from concurrent.futures import Future
+import functools
+import threading
+
+
+def completed_future(result):
+    """
+    Create a future which has already completed with a result.
+
+    :param result: The result.
+    :rtype: concurrent.futures.Future
+    """
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def failed_future(exception):
+    """
+    Create a future which has already failed with an exception.
+
+    :param Exception exception: The exception.
+    :rtype: concurrent.futures.Future
+    """
+    future = Future()
+    future.set_exception(exception)
+    return future
+
+
+def copy_future(source, target):
+    """
+    Complete a future with the outcome of another, completed, future.
+
+    :param concurrent.futures.Future source: The completed future.
+    :param concurrent.futures.Future target: The future to complete.
+    """
+    try:
+        target.set_result(source.result())
+    except Exception as ex:  # pylint: disable=broad-except
+        target.set_exception(ex)
+
+
+class _FanOut(object):
+    """
+    Starts a list of tasks, keeping at most a fixed number of them in flight
+    at a time.
+    """
+    def __init__(self, tasks, concurrency):
+        """
+        Constructor parameters:
+
+        :param list tasks: Functions which each start a task, returning a
+            :class:`concurrent.futures.Future` for its result.
+        :param int concurrency: Maximum number of tasks in flight at a time.
+        """
+        self._tasks = tasks
+        self._concurrency = max(concurrency, 1)
+        self.futures = [Future() for _ in tasks]
+        self._lock = threading.Lock()
+        self._next_task = 0
+        self._in_flight = 0
+        self._starting = False
+
+    def start(self):
+        """
+        Start as many tasks as the concurrency allows. Tasks are started from
+        a loop rather than recursively from the completion of earlier tasks,
+        so a long list of tasks which complete immediately does not exhaust
+        the stack.
+        """
+        with self._lock:
+            if self._starting:
+                return
+            self._starting = True
+        while True:
+            with self._lock:
+                if self._next_task >= len(self._tasks) or \
+                        self._in_flight >= self._concurrency:
+                    self._starting = False
+                    return
+                index = self._next_task
+                self._next_task += 1
+                self._in_flight += 1
+            try:
+                future = self._tasks[index]()
+            except Exception as ex:  # pylint: disable=broad-except
+                future = Future()
+                future.set_exception(ex)
+            future.add_done_callback(
+                functools.partial(self._on_task_done, index))
+
+    def _on_task_done(self, index, future):
+        """
+        Record the outcome of a completed task and start the next one.
+
+        :param int index: Index of the task.
+        :param concurrent.futures.Future future: Completed future for the
+            task.
+        """
+        with self._lock:
+            self._in_flight -= 1
+        copy_future(future, self.futures[index])
+        self.start()
+
+
+def fan_out(tasks, concurrency):
+    """
+    Start a list of tasks, keeping at most a fixed number of them in flight
+    at a time.
+
+    :param list tasks: Functions which each start a task, returning a
+        :class:`concurrent.futures.Future` for its result.
+    :param int concurrency: Maximum number of tasks in flight at a time.
+    :return: Futures for the results of the tasks, in the same order as the
+        tasks.
+    :rtype: list
+    """
+    fan = _FanOut(list(tasks), concurrency)
+    fan.start()
+    return fan.futures
+
+
+def gather(futures):
+    """
+    Combine a list of futures into a single future which completes once all
+    of them have completed.
+
+    :param list futures: The futures.
+    :return: Future whose result is the list of futures, each of which has
+        completed.
+    :rtype: concurrent.futures.Future
+    """
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def _on_done(_):
+        with lock:
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            combined.set_result(futures)
+
+    if not futures:
+        combined.set_result(futures)
+    for future in futures:
+        future.add_done_callback(_on_done)
+    return combined
+
+
+def transform(future, fn):
+    """
+    Create a future for the result of applying a function to the result of
+    another future.
+
+    :param concurrent.futures.Future future: The future whose result the
+        function is applied to.
+    :param function fn: The function.
+    :return: Future for the result of the function. If either the original
+        future or the function raises an exception, the future completes
+        with that exception.
+    :rtype: concurrent.futures.Future
+    """
+    transformed = Future()
+
+    def _on_done(completed):
+        try:
+            transformed.set_result(fn(completed.result()))
+        except Exception as ex:  # pylint: disable=broad-except
+            transformed.set_exception(ex)
+
+    future.add_done_callback(_on_done)
+    return transformed
+
+
+def chain(future, fn):
+    """
+    Create a future for the result of the future returned by applying a
+    function to the result of another future.
+
+    :param concurrent.futures.Future future: The future whose result the
+        function is applied to.
+    :param function fn: The function, which returns a
+        :class:`concurrent.futures.Future`.
+    :return: Future for the result of the future returned by the function.
+        If the original future or the function raises an exception, or the
+        future returned by the function fails, the future completes with
+        that exception.
+    :rtype: concurrent.futures.Future
+    """
+    chained = Future()
+
+    def _on_done(completed):
+        try:
+            next_future = fn(completed.result())
+        except Exception as ex:  # pylint: disable=broad-except
+            chained.set_exception(ex)
+            return
+        next_future.add_done_callback(
+            functools.partial(copy_future, target=chained))
+
+    future.add_done_callback(_on_done)
+    return chained
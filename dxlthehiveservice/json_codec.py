@@ -0,0 +1,171 @@
+from __future__ import absolute_import
+import json
+
+#: Name of the codec which selects the fastest one that is installed.
+CODEC_AUTO = "auto"
+
+
+class JsonCodec(object):
+    """
+    A named set of functions for decoding and encoding JSON.
+    """
+    def __init__(self, name, loads_fn, dumps_fn, dumps_canonical_fn):
+        """
+        Constructor parameters:
+
+        :param str name: Name of the codec.
+        :param function loads_fn: Function which decodes JSON from bytes.
+        :param function dumps_fn: Function which encodes an object to JSON
+            bytes.
+        :param function dumps_canonical_fn: Function which encodes an object
+            to compact JSON bytes with the keys of each object sorted.
+        """
+        self.name = name
+        self.loads = loads_fn
+        self.dumps = dumps_fn
+        self.dumps_canonical = dumps_canonical_fn
+
+
+def _create_orjson_codec():  # pylint: disable=missing-docstring
+    import orjson  # pylint: disable=import-error
+
+    def _dumps_canonical(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+    return JsonCodec("orjson", orjson.loads, orjson.dumps, _dumps_canonical)
+
+
+def _create_ujson_codec():  # pylint: disable=missing-docstring
+    import ujson  # pylint: disable=import-error
+
+    def _dumps(obj):
+        return ujson.dumps(obj, escape_forward_slashes=False).encode("utf-8")
+
+    def _dumps_canonical(obj):
+        return ujson.dumps(obj, escape_forward_slashes=False,
+                           sort_keys=True).encode("utf-8")
+
+    return JsonCodec("ujson", ujson.loads, _dumps, _dumps_canonical)
+
+
+def _create_stdlib_codec():  # pylint: disable=missing-docstring
+    def _loads(data):
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return json.loads(data)
+
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def _dumps_canonical(obj):
+        return json.dumps(obj, sort_keys=True,
+                          separators=(",", ":")).encode("utf-8")
+
+    return JsonCodec("json", _loads, _dumps, _dumps_canonical)
+
+
+#: Factories for each supported codec, in order of preference.
+_CODEC_FACTORIES = (("orjson", _create_orjson_codec),
+                    ("ujson", _create_ujson_codec),
+                    ("json", _create_stdlib_codec))
+
+
+def create_codec(name=CODEC_AUTO):
+    """
+    Create a codec by name. For the ``auto`` name, the fastest codec which is
+    installed is used: ``orjson``, then ``ujson``, then the ``json`` module
+    from the standard library.
+
+    :param str name: Name of the codec, one of ``orjson``, ``ujson``,
+        ``json``, or ``auto`` to use the fastest one which is installed.
+    :return: The codec.
+    :rtype: JsonCodec
+    :raises ValueError: if the codec name is not recognized or the package
+        for the named codec is not installed.
+    """
+    for factory_name, factory in _CODEC_FACTORIES:
+        if name in (CODEC_AUTO, factory_name):
+            try:
+                return factory()
+            except ImportError as ex:
+                if name != CODEC_AUTO:
+                    raise ValueError(
+                        "JSON codec {} is not available: {}".format(name, ex))
+    raise ValueError("Unknown JSON codec: {}".format(name))
+
+
+_codec = create_codec()
+
+
+def set_codec(name):
+    """
+    Select the codec used by :func:`loads` and :func:`dumps`.
+
+    :param str name: Name of the codec. See :func:`create_codec`.
+    :raises ValueError: if the codec is not available.
+    """
+    global _codec  # pylint: disable=global-statement
+    _codec = create_codec(name)
+
+
+def codec_name():
+    """
+    Name of the codec used by :func:`loads` and :func:`dumps`.
+
+    :rtype: str
+    """
+    return _codec.name
+
+
+def loads(data):
+    """
+    Decode JSON.
+
+    :param bytes data: The JSON to decode.
+    :return: The decoded object.
+    """
+    return _codec.loads(data)
+
+
+def dumps(obj):
+    """
+    Encode an object as JSON.
+
+    :param obj: The object to encode.
+    :return: The encoded JSON.
+    :rtype: bytes
+    """
+    return _codec.dumps(obj)
+
+
+def dumps_canonical(obj):
+    """
+    Encode an object as compact JSON with the keys of each object sorted, so
+    that objects which are equal are encoded identically regardless of the
+    order of their keys.
+
+    :param obj: The object to encode.
+    :return: The encoded JSON.
+    :rtype: bytes
+    """
+    return _codec.dumps_canonical(obj)
+
+
+def payload_to_dict(message):
+    """
+    Decode the JSON payload of a DXL message.
+
+    :param dxlclient.message.Message message: The message.
+    :return: The decoded payload.
+    """
+    return loads(message.payload.rstrip(b"\0"))
+
+
+def dict_to_payload(message, obj):
+    """
+    Encode an object as JSON into the payload of a DXL message.
+
+    :param dxlclient.message.Message message: The message.
+    :param obj: The object to encode.
+    """
+    message.payload = dumps(obj)
@@ -0,0 +1,262 @@
+from __future__ import absolute_import
+import re
+
+from . import json_codec
+
+#: Number of bytes read from the network at a time when a response body is
+#: parsed as it is received.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+#: Characters which are significant when scanning JSON outside of a string.
+_STRUCTURAL_CHARS = re.compile(br'["{}\[\],]')
+#: Characters which are significant when scanning JSON inside of a string.
+_STRING_CHARS = re.compile(br'["\\]')
+#: Characters which may separate the elements of a JSON array.
+_SEPARATOR_CHARS = b" \t\r\n,"
+
+
+class ArrayStreamParser(object):
+    """
+    Incremental parser for a JSON array which is received in chunks, for
+    example the array of results in the body of a search response.
+
+    Each element of the array is decoded as soon as all of its bytes have
+    been received, and only the bytes of the element currently being
+    received are held by the parser, so the memory used by the parser grows
+    with the size of the largest element rather than with the size of the
+    whole array.
+    """
+    def __init__(self):
+        self._buffer = b""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._element_start = None
+        self._depth = 0
+        self._in_string = False
+
+    def _end_element(self, end, elements):
+        """
+        Decode the element which ends at an offset in the buffer.
+
+        :param int end: Offset in the buffer after the end of the element.
+        :param list elements: List to which the decoded element is appended.
+        """
+        elements.append(json_codec.loads(
+            self._buffer[self._element_start:end].strip()))
+        self._element_start = None
+
+    def _scan_top_level(self):
+        """
+        Scan the bytes in the buffer from the current offset which are
+        outside of any element: the start of the array, the separators
+        between its elements, the end of the array and anything after it.
+
+        :return: True if more bytes are needed to continue scanning.
+        :rtype: bool
+        :raises ValueError: if the bytes are not a valid JSON array.
+        """
+        buf = self._buffer
+        end = len(buf)
+        if self._finished:
+            if buf[self._pos:].strip():
+                raise ValueError("Unexpected data after JSON array")
+            self._pos = end
+            return True
+        if not self._started:
+            self._pos = end - len(buf[self._pos:].lstrip())
+            if self._pos == end:
+                return True
+            if buf[self._pos:self._pos + 1] != b"[":
+                raise ValueError("Expected a JSON array")
+            self._started = True
+            self._pos += 1
+            return False
+        while self._pos < end and \
+                buf[self._pos:self._pos + 1] in _SEPARATOR_CHARS:
+            self._pos += 1
+        if self._pos == end:
+            return True
+        if buf[self._pos:self._pos + 1] == b"]":
+            self._finished = True
+            self._pos += 1
+        else:
+            self._element_start = self._pos
+        return False
+
+    def _scan_string(self, elements):
+        """
+        Scan the bytes in the buffer from the current offset, which is inside
+        of a string.
+
+        :param list elements: List to which the element is appended if the
+            string completes it.
+        :return: True if more bytes are needed to continue scanning.
+        :rtype: bool
+        """
+        match = _STRING_CHARS.search(self._buffer, self._pos)
+        if not match:
+            self._pos = len(self._buffer)
+            return True
+        if match.group() == b"\\":
+            if match.end() == len(self._buffer):
+                # Wait for the escaped character to be received.
+                self._pos = match.start()
+                return True
+            self._pos = match.end() + 1
+            return False
+        self._in_string = False
+        self._pos = match.end()
+        if not self._depth:
+            self._end_element(self._pos, elements)
+        return False
+
+    def _scan_element(self, elements):
+        """
+        Scan the bytes in the buffer from the current offset, which is inside
+        of an element but outside of any string.
+
+        :param list elements: List to which the element is appended if the
+            scanned bytes complete it.
+        :return: True if more bytes are needed to continue scanning.
+        :rtype: bool
+        """
+        match = _STRUCTURAL_CHARS.search(self._buffer, self._pos)
+        if not match:
+            self._pos = len(self._buffer)
+            return True
+        char = match.group()
+        if char == b'"':
+            self._in_string = True
+            self._pos = match.end()
+        elif char in (b"{", b"["):
+            self._depth += 1
+            self._pos = match.end()
+        elif self._depth:
+            if char in (b"}", b"]"):
+                self._depth -= 1
+            self._pos = match.end()
+            if not self._depth:
+                self._end_element(self._pos, elements)
+        else:
+            # A "," or "]" outside of any nested value ends a number,
+            # boolean or null element, and is then scanned again as a
+            # separator or as the end of the array.
+            self._pos = match.start()
+            self._end_element(self._pos, elements)
+        return False
+
+    def _scan(self, elements):
+        """
+        Scan the bytes in the buffer which have not yet been scanned.
+
+        :param list elements: List to which each element which is completed
+            by the scanned bytes is appended.
+        :raises ValueError: if the bytes are not a valid JSON array.
+        """
+        while self._pos < len(self._buffer):
+            if self._element_start is None:
+                waiting = self._scan_top_level()
+            elif self._in_string:
+                waiting = self._scan_string(elements)
+            else:
+                waiting = self._scan_element(elements)
+            if waiting:
+                break
+
+    def feed(self, chunk):
+        """
+        Parse the next chunk of the array.
+
+        :param bytes chunk: The chunk.
+        :return: The elements of the array which were completed by the
+            chunk, decoded.
+        :rtype: list
+        :raises ValueError: if the chunk is not part of a valid JSON array.
+        """
+        self._buffer += chunk
+        elements = []
+        self._scan(elements)
+        # Release the bytes which are no longer needed.
+        keep_from = self._pos if self._element_start is None \
+            else self._element_start
+        if keep_from:
+            self._buffer = self._buffer[keep_from:]
+            self._pos -= keep_from
+            if self._element_start is not None:
+                self._element_start = 0
+        return elements
+
+    def close(self):
+        """
+        Check that the whole array has been parsed.
+
+        :raises ValueError: if the end of the array has not been received.
+        """
+        if not self._finished:
+            raise ValueError("Incomplete JSON array")
+
+
+class HitCollector(object):
+    """
+    Collects the results of a search from the body of the search response as
+    it is received, keeping only the requested fields of each result and
+    optionally stopping once a number of results has been collected.
+
+    Each result is re-encoded as soon as it has been parsed, so the memory
+    used by the collector grows with the size of the collected results
+    rather than with the size of the response body.
+    """
+    def __init__(self, fields=None, limit=None):
+        """
+        Constructor parameters:
+
+        :param list fields: Names of the fields to which each result is
+            projected, or None to keep all fields.
+        :param int limit: Maximum number of results to collect, or None to
+            collect all results.
+        """
+        self._fields = fields
+        self._limit = limit
+        self._parser = ArrayStreamParser()
+        self._hits = []
+
+    def _is_full(self):
+        """
+        Whether the collector has collected as many results as it needs.
+
+        :rtype: bool
+        """
+        return self._limit is not None and len(self._hits) >= self._limit
+
+    def feed(self, chunk):
+        """
+        Parse the next chunk of the response body.
+
+        :param bytes chunk: The chunk.
+        :return: True if the collector needs no more of the response body,
+            False if it does.
+        :rtype: bool
+        :raises ValueError: if the chunk is not part of a valid JSON array.
+        """
+        for hit in self._parser.feed(chunk):
+            if self._is_full():
+                break
+            if self._fields is not None:
+                hit = {field: hit[field] for field in self._fields
+                       if field in hit}
+            self._hits.append(json_codec.dumps(hit))
+        return self._is_full()
+
+    def finish(self):
+        """
+        Encode the collected results.
+
+        :return: The JSON array of the collected results.
+        :rtype: bytes
+        :raises ValueError: if the whole response body was needed but was not
+            a complete JSON array.
+        """
+        if not self._is_full():
+            self._parser.close()
+        return b"[" + b",".join(self._hits) + b"]"
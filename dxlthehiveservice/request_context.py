@@ -0,0 +1,227 @@
+from __future__ import absolute_import
+import logging
+import time
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class RequestExpiredError(Exception):
+    """
+    Raised when a request is found to have expired before any work to send
+    it to TheHive server has started. The caller is assumed to have given up
+    waiting for the response, so no response is delivered for the request.
+    """
+
+
+class RequestTimeouts(object):
+    """
+    Timeouts which apply to requests received for a TheHive API.
+    """
+    __slots__ = ("connect", "read", "deadline", "max_queue_age")
+
+    def __init__(self, connect=None, read=None, deadline=None,
+                 max_queue_age=None):
+        """
+        Constructor parameters:
+
+        :param float connect: Number of seconds to wait for a connection to
+            TheHive server to be established, or None to wait indefinitely.
+        :param float read: Number of seconds to wait for data to be received
+            from TheHive server, or None to wait indefinitely.
+        :param float deadline: Total number of seconds, from the time that a
+            DXL request is received, within which the request must be
+            handled, or None for no deadline.
+        :param float max_queue_age: Maximum number of seconds, from the time
+            that a DXL request is received, that the request may wait before
+            it is sent to TheHive server, or None for no limit.
+        """
+        self.connect = connect
+        self.read = read
+        self.deadline = deadline
+        self.max_queue_age = max_queue_age
+
+
+def _earliest(*times):
+    """
+    Return the earliest of the supplied times, ignoring any which are None.
+
+    :return: The earliest time, or None if all of the times are None.
+    :rtype: float
+    """
+    times = [value for value in times if value is not None]
+    return min(times) if times else None
+
+
+class RequestContext(object):
+    """
+    State for a single DXL request as it passes through a request callback
+    and :class:`dxlthehiveservice.thehive_client.TheHiveClient`.
+
+    The payload of the DXL request is decoded once, when the request is
+    received, and the decoded body is carried along with the context so that
+    it does not need to be decoded again.
+    """
+    __slots__ = ("request", "topic", "body", "received_at", "timings",
+                 "entity_type", "entity_id", "case_id", "hash_content",
+                 "if_none_match", "timeouts", "caller_deadline", "deadline",
+                 "expires_at")
+
+    #: Name of the field in the ``other_fields`` of a DXL request through
+    #: which the caller may supply the time, in seconds since the epoch,
+    #: after which it will no longer wait for the response. The deadline is
+    #: read from the clock of the caller, so the clocks of the caller and
+    #: the service must be kept in sync.
+    CALLER_DEADLINE_FIELD = "deadline"
+
+    def __init__(self, request, body=None, timeouts=None):
+        """
+        Constructor parameters:
+
+        :param dxlclient.message.Request request: The DXL request.
+        :param dict body: The decoded payload of the DXL request, if it has
+            already been decoded.
+        :param RequestTimeouts timeouts: Timeouts which apply to the request.
+        :raises ValueError: if the caller supplied deadline is not a number.
+        """
+        #: The DXL request.
+        self.request = request
+        #: The topic to which the DXL request was sent.
+        self.topic = request.destination_topic
+        #: The decoded payload of the DXL request.
+        self.body = body
+        #: The time, in seconds since the epoch, at which the request was
+        #: received by the service.
+        self.received_at = time.time()
+        #: Elapsed times, in seconds since the request was received, at
+        #: which each stage of the request was reached, keyed by stage name.
+        self.timings = {}
+        #: The type of the entity to which the request applies, if any: one
+        #: of "case", "case_task", "case_observable" or "alert".
+        self.entity_type = None
+        #: The id of the entity to which the request applies, if any.
+        self.entity_id = None
+        #: The id of the case to which the request applies, if any.
+        self.case_id = None
+        #: Whether a hash of the content of a successful response is included
+        #: in the response, so that the caller can supply it as
+        #: ``if_none_match`` when it repeats the request.
+        self.hash_content = False
+        #: Hash of the content of a previous response supplied by the caller.
+        #: If the content of the response has the same hash, a "not modified"
+        #: response is delivered in its place.
+        self.if_none_match = None
+        #: Timeouts which apply to the request.
+        self.timeouts = timeouts or RequestTimeouts()
+        caller_deadline = (request.other_fields or {}).get(
+            self.CALLER_DEADLINE_FIELD)
+        if caller_deadline:
+            try:
+                caller_deadline = float(caller_deadline)
+            except ValueError:
+                raise ValueError("Invalid value for {} field: {}".format(
+                    self.CALLER_DEADLINE_FIELD, caller_deadline))
+            # A deadline which had already passed, by more than the time for
+            # which a request may wait to be sent, when the request was
+            # received is taken to be read from a clock which is out of sync
+            # with that of the service. The caller may still be waiting for
+            # the response, so the deadline is ignored rather than the
+            # request being dropped.
+            if caller_deadline < \
+                    self.received_at - (self.timeouts.max_queue_age or 0):
+                logger.debug("Ignoring %s of %.3f for request on topic '%s' "
+                             "which had already passed at local time %.3f",
+                             self.CALLER_DEADLINE_FIELD, caller_deadline,
+                             self.topic, self.received_at)
+                caller_deadline = None
+        else:
+            caller_deadline = None
+        #: The time, in seconds since the epoch, supplied by the caller after
+        #: which it will no longer wait for the response, or None if the
+        #: caller did not supply a deadline or the deadline was ignored.
+        self.caller_deadline = caller_deadline
+        #: The time, in seconds since the epoch, by which the request must be
+        #: handled, or None for no deadline.
+        self.deadline = _earliest(
+            self.received_at + self.timeouts.deadline
+            if self.timeouts.deadline else None,
+            caller_deadline)
+        #: The time, in seconds since the epoch, after which the request
+        #: should be dropped if it has not yet been sent to TheHive server,
+        #: or None if the request does not expire.
+        self.expires_at = _earliest(
+            self.received_at + self.timeouts.max_queue_age
+            if self.timeouts.max_queue_age else None,
+            caller_deadline)
+
+    def mark(self, stage):
+        """
+        Record the time elapsed since the request was received at which the
+        named stage was reached.
+
+        :param str stage: Name of the stage.
+        """
+        self.timings[stage] = time.time() - self.received_at
+
+    def remaining(self):
+        """
+        Number of seconds remaining before the deadline for the request.
+
+        :return: The number of seconds remaining, or None if the request has
+            no deadline.
+        :rtype: float
+        """
+        return None if self.deadline is None else self.deadline - time.time()
+
+    def expired(self):
+        """
+        Whether the request has expired, either because the caller supplied
+        deadline has passed or because the request has waited longer than
+        the maximum queue age.
+
+        :rtype: bool
+        """
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def deadline_exceeded(self):
+        """
+        Whether the deadline for the request has passed.
+
+        :rtype: bool
+        """
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def http_timeouts(self):
+        """
+        Connect and read timeouts to use for the next HTTP request made for
+        the DXL request, each clamped to the time remaining before the
+        deadline.
+
+        :return: A tuple of the connect and read timeouts, in seconds. Either
+            value may be None for no timeout.
+        :rtype: tuple
+        """
+        connect, read = self.timeouts.connect, self.timeouts.read
+        remaining = self.remaining()
+        if remaining is not None:
+            remaining = max(remaining, 0)
+            connect = remaining if connect is None else min(connect, remaining)
+            read = remaining if read is None else min(read, remaining)
+        return connect, read
+
+    def pop_attribute(self, attr_name):
+        """
+        Pop the value for a named attribute from the request body.
+
+        :param str attr_name: Name of the attribute.
+        :return: The value associated with the attribute.
+        :raises ValueError: if the named attribute does not appear in the
+            request body.
+        """
+        if not isinstance(self.body, dict):
+            raise ValueError("Request payload must be a JSON object")
+        attr_value = self.body.pop(attr_name, None)
+        if not attr_value:
+            raise ValueError("Attribute {} is missing".format(attr_name))
+        return attr_value
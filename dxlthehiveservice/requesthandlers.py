@@ -1,16 +1,27 @@
 from __future__ import absolute_import
+from abc import ABCMeta, abstractmethod
 import logging
 
 from dxlclient.callbacks import RequestCallback
 from dxlclient.message import ErrorResponse
 from dxlbootstrap.util import MessageUtils
 
+from . import json_codec
+from .bulk import ChildEntities, ChildSearch
+from .compat import STRING_TYPES
+from .request_context import RequestContext, RequestTimeouts
+
 # Configure local logger
 logger = logging.getLogger(__name__)
 
+#: Base class for :class:`TheHiveApiRequestCallback` whose metaclass is
+#: :class:`abc.ABCMeta`, declared in a form which works on both Python 2 and 3.
+_AbstractRequestCallback = ABCMeta(str("_AbstractRequestCallback"),
+                                   (RequestCallback,), {})
+
 
-class TheHiveApiRequestCallback(RequestCallback):
-    def __init__(self, dxl_client, thehive_client):
+class TheHiveApiRequestCallback(_AbstractRequestCallback):
+    def __init__(self, dxl_client, thehive_client, timeouts=None):
         """
         Constructor parameters:
 
@@ -18,49 +29,69 @@ class TheHiveApiRequestCallback(RequestCallback):
             responses can be sent.
         :param dxlthehiveservice.thehive_client.TheHiveClient thehive_client:
             HTTP client through which requests to TheHive server should be sent.
+        :param dxlthehiveservice.request_context.RequestTimeouts timeouts:
+            Timeouts which apply to requests received by the callback.
         """
         super(TheHiveApiRequestCallback, self).__init__()
         self._dxl_client = dxl_client
         self._thehive_client = thehive_client
+        self._timeouts = timeouts or RequestTimeouts()
 
     def on_request(self, request):
         """
         Invoked when a request message is received.
 
-        :param dxlclient.message.Request request: The request message
-        """
-        logger.info("Request received on topic: '%s' with payload: '%s'",
-                    request.destination_topic,
-                    MessageUtils.decode_payload(request))
+        Decodes the request payload into a
+        :class:`dxlthehiveservice.request_context.RequestContext` and hands
+        the context to :meth:`_handle_request`. If the request has already
+        expired, it is dropped without a response. If the request cannot be
+        handled, an error response is delivered to the DXL fabric.
 
-    def _pop_attribute_from_request(self, request, attr_name):
-        """
-        Pop the value for a named attribute from the supplied request JSON
-        and return the remaining request body.
-        :param request:
-        :param attr_name:
-        :return:
-        :raises ValueError: if the named attribute does not appear in the
-            request.
-        :return: A tuple containing two elements: the value associated with
-            the attr_name parameter and the request body (minus the attr_name
-            attribute and its associated value), converted to a dict.
-        :rtype: tuple
+        :param dxlclient.message.Request request: The request message
         """
         try:
-            request_body = MessageUtils.json_payload_to_dict(request)
-            attr_value = request_body.pop(attr_name, None)
-            if not attr_name:
-                raise ValueError("Attribute {} is missing".format(attr_name))
-        except Exception as ex:
-            request_body = {}
-            attr_value = None
+            context = RequestContext(request, timeouts=self._timeouts)
+            if context.expired():
+                self._thehive_client.shed_request(context)
+                return
+            context.body = json_codec.payload_to_dict(request)
+            logger.info("Request received on topic: '%s' with payload: '%s'",
+                        context.topic, context.body)
+            self._handle_request(context)
+        except Exception as ex:  # pylint: disable=broad-except
             error_str = str(ex)
             logger.exception("Error handling request: %s", error_str)
             res = ErrorResponse(request,
                                 error_message=MessageUtils.encode(error_str))
             self._dxl_client.send_response(res)
-        return (attr_value, request_body)
+
+    @abstractmethod
+    def _handle_request(self, context):
+        """
+        Invoked to handle a request message once its payload has been
+        decoded. Implemented by each callback for the request it handles.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+
+    @staticmethod
+    def _request_content_hash(context):
+        """
+        Request that a hash of the content be included in the response,
+        taking the hash of the content of a previous response from the
+        optional ``ifNoneMatch`` attribute of the request body.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        :raises ValueError: if the ``ifNoneMatch`` attribute is not a string.
+        """
+        if_none_match = context.body.pop("ifNoneMatch", None)
+        if if_none_match is not None and \
+                not isinstance(if_none_match, STRING_TYPES):
+            raise ValueError("Attribute ifNoneMatch must be a string")
+        context.hash_content = True
+        context.if_none_match = if_none_match
 
 
 class TheHiveCreateCaseRequestCallback(TheHiveApiRequestCallback):
@@ -68,14 +99,63 @@ class TheHiveCreateCaseRequestCallback(TheHiveApiRequestCallback):
     Request callback used to invoke TheHive REST API for case/create
     DXL requests.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        context.entity_type = "case"
+        self._thehive_client.post(context, "/api/case")
+
+
+class TheHiveCreateFullCaseRequestCallback(TheHiveApiRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for case/create/full DXL
+    requests. The request payload holds the case to create, along with
+    optional ``tasks`` and ``observables`` lists of the tasks and observables
+    to create for the case once it has been created.
+    """
+    @staticmethod
+    def _pop_list(context, attr_name):
+        """
+        Pop an optional list attribute from the request body.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        :param str attr_name: Name of the attribute.
+        :return: The list, or an empty list if the attribute is not present.
+        :rtype: list
+        :raises ValueError: if the attribute is not a list.
+        """
+        value = context.body.pop(attr_name, None)
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            raise ValueError("Attribute {} must be a list".format(attr_name))
+        return value
+
+    def _handle_request(self, context):
         """
-        super(TheHiveCreateCaseRequestCallback, self).on_request(request)
-        self._thehive_client.post(request, "/api/case")
+        Invoked to handle a request message once its payload has been
+        decoded.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        if not isinstance(context.body, dict):
+            raise ValueError("Request payload must be a JSON object")
+        context.entity_type = "case"
+        children = [
+            ChildEntities("tasks", "case_task", "/api/case/{}/task",
+                          self._pop_list(context, "tasks"), None),
+            ChildEntities("observables", "case_observable",
+                          "/api/case/{}/artifact",
+                          self._pop_list(context, "observables"), "data")]
+        self._thehive_client.post_with_children(context, "/api/case", "case",
+                                                children)
 
 
 class TheHiveCreateCaseTaskRequestCallback(TheHiveApiRequestCallback):
@@ -83,18 +163,18 @@ class TheHiveCreateCaseTaskRequestCallback(TheHiveApiRequestCallback):
     Request callback used to invoke TheHive REST API for case/task/create
     DXL requests.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveCreateCaseTaskRequestCallback, self).on_request(request)
-        case_id, request_body = self._pop_attribute_from_request(request,
-                                                                 "caseId")
-        if case_id:
-            self._thehive_client.post(
-                request, "/api/case/{}/task".format(case_id), request_body)
+        context.entity_type = "case_task"
+        context.case_id = context.pop_attribute("caseId")
+        self._thehive_client.post(
+            context, "/api/case/{}/task".format(context.case_id))
 
 
 class TheHiveCreateCaseObservableRequestCallback(TheHiveApiRequestCallback):
@@ -102,35 +182,123 @@ class TheHiveCreateCaseObservableRequestCallback(TheHiveApiRequestCallback):
     Request callback used to invoke TheHive REST API for case/observable/create
     DXL requests.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveCreateCaseObservableRequestCallback, self).on_request(
-            request)
-        case_id, request_body = self._pop_attribute_from_request(request,
-                                                                 "caseId")
-        if case_id:
-            self._thehive_client.post(
-                request, "/api/case/{}/artifact".format(case_id), request_body)
+        context.entity_type = "case_observable"
+        context.case_id = context.pop_attribute("caseId")
+        self._thehive_client.post(
+            context, "/api/case/{}/artifact".format(context.case_id))
+
+
+class TheHiveBulkCreateCaseObservableRequestCallback(
+        TheHiveApiRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for
+    case/observable/create/bulk DXL requests. The request payload holds the
+    ``caseId`` of the case and an ``observables`` list of the observables to
+    create for it.
+    """
+    def _handle_request(self, context):
+        """
+        Invoked to handle a request message once its payload has been
+        decoded.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        context.entity_type = "case_observable"
+        context.case_id = context.pop_attribute("caseId")
+        observables = context.pop_attribute("observables")
+        if not isinstance(observables, list):
+            raise ValueError("Attribute observables must be a list")
+        self._thehive_client.post_multi_value_bulk(
+            context, "/api/case/{}/artifact".format(context.case_id),
+            observables, "data")
 
 
 class TheHiveGetCaseRequestCallback(TheHiveApiRequestCallback):
     """
     Request callback used to invoke TheHive REST API for case/get DXL requests.
+    The request payload holds the ``id`` of the case and, optionally, the
+    ``ifNoneMatch`` hash of the content of a previous response for the case.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveGetCaseRequestCallback, self).on_request(request)
-        case_id = self._pop_attribute_from_request(request, "id")[0]
-        if case_id:
-            self._thehive_client.get(request, "/api/case/{}".format(case_id))
+        context.entity_type = "case"
+        context.entity_id = context.pop_attribute("id")
+        self._request_content_hash(context)
+        self._thehive_client.get(context,
+                                 "/api/case/{}".format(context.entity_id))
+
+
+class TheHiveGetFullCaseRequestCallback(TheHiveApiRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for case/get/full DXL
+    requests. The request payload holds the ``id`` of the case and, to limit
+    the number of tasks and observables returned for the case, optional
+    ``taskLimit`` and ``observableLimit`` values.
+    """
+    @staticmethod
+    def _child_search(context, field, entity_type, path, limit_attr_name):
+        """
+        Create the search for the children of the case.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        :param str field: Name of the field which holds the search results in
+            the response.
+        :param str entity_type: Type of the children.
+        :param str path: URL subpath for the search.
+        :param str limit_attr_name: Name of the attribute in the request body
+            which holds the maximum number of children to return.
+        :return: The search.
+        :rtype: dxlthehiveservice.bulk.ChildSearch
+        :raises ValueError: if the limit is not a positive integer.
+        """
+        limit = context.body.pop(limit_attr_name, None)
+        if limit is None:
+            search_range = "all"
+        elif isinstance(limit, int) and limit > 0:
+            search_range = "0-{}".format(limit)
+        else:
+            raise ValueError("Attribute {} must be a positive integer".format(
+                limit_attr_name))
+        return ChildSearch(
+            field, entity_type, "{}?range={}".format(path, search_range),
+            {"query": {"_parent": {"_type": "case",
+                                   "_query": {"_id": context.entity_id}}}})
+
+    def _handle_request(self, context):
+        """
+        Invoked to handle a request message once its payload has been
+        decoded.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        context.entity_type = "case"
+        context.entity_id = context.pop_attribute("id")
+        children = [
+            self._child_search(context, "tasks", "case_task",
+                               "/api/case/task/_search", "taskLimit"),
+            self._child_search(context, "observables", "case_observable",
+                               "/api/case/artifact/_search",
+                               "observableLimit")]
+        self._thehive_client.get_with_children(
+            context, "/api/case/{}".format(context.entity_id), "case",
+            children)
 
 
 class TheHiveGetCaseTaskRequestCallback(TheHiveApiRequestCallback):
@@ -138,17 +306,18 @@ class TheHiveGetCaseTaskRequestCallback(TheHiveApiRequestCallback):
     Request callback used to invoke TheHive REST API for case/task/get DXL
     requests.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveGetCaseTaskRequestCallback, self).on_request(request)
-        task_id = self._pop_attribute_from_request(request, "id")[0]
-        if task_id:
-            self._thehive_client.get(request,
-                                     "/api/case/task/{}".format(task_id))
+        context.entity_type = "case_task"
+        context.entity_id = context.pop_attribute("id")
+        self._thehive_client.get(context,
+                                 "/api/case/task/{}".format(context.entity_id))
 
 
 class TheHiveGetCaseObservableRequestCallback(TheHiveApiRequestCallback):
@@ -156,62 +325,110 @@ class TheHiveGetCaseObservableRequestCallback(TheHiveApiRequestCallback):
     Request callback used to invoke TheHive REST API for case/observable/get
     DXL requests.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveGetCaseObservableRequestCallback, self).on_request(request)
-        observable_id = self._pop_attribute_from_request(request, "id")[0]
-        if observable_id:
-            self._thehive_client.get(request,
-                                     "/api/case/artifact/{}".format(
-                                         observable_id))
+        context.entity_type = "case_observable"
+        context.entity_id = context.pop_attribute("id")
+        self._thehive_client.get(context,
+                                 "/api/case/artifact/{}".format(
+                                     context.entity_id))
+
 
-class TheHiveSearchCaseRequestCallback(TheHiveApiRequestCallback):
+class TheHiveSearchRequestCallback(TheHiveApiRequestCallback):
     """
-    Request callback used to invoke TheHive REST API for case/search DXL
-    requests.
+    Base class for the request callbacks used to invoke TheHive REST API for
+    search DXL requests. The request payload holds the search to forward to
+    TheHive server. To page through the results of the search, the payload
+    may also hold a ``pageSize`` value, in which case the response holds
+    the first page of results and a ``cursor`` id. The next page is
+    requested with a payload which holds only that ``cursor`` id. To split
+    the search into partitions which are searched for concurrently, the
+    payload may instead hold a ``partitions`` object. A ``fields`` list
+    limits the fields returned for each result, and a ``countOnly`` value
+    of true returns only the number of results.
     """
-    def on_request(self, request):
+    #: Type of the entities to search for.
+    _ENTITY_TYPE = None
+    #: URL subpath for the search.
+    _PATH = None
+    #: URL subpath for statistics about the results of the search.
+    _STATS_PATH = None
+
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveSearchCaseRequestCallback, self).on_request(request)
-        self._thehive_client.post(request, "/api/case/_search")
+        context.entity_type = self._ENTITY_TYPE
+        cursor_id = context.body.pop("cursor", None)
+        page_size = context.body.pop("pageSize", None)
+        partitions = context.body.pop("partitions", None)
+        count_only = context.body.pop("countOnly", False)
+        fields = context.body.pop("fields", None)
+        if fields is not None and not isinstance(fields, list):
+            raise ValueError("Attribute fields must be a list")
+        if count_only:
+            if cursor_id is not None or page_size is not None or \
+                    partitions is not None or fields is not None:
+                raise ValueError("Attribute countOnly may not be combined "
+                                 "with paging, partitions or fields")
+            self._thehive_client.search_count(context, self._STATS_PATH)
+        elif partitions is not None:
+            if cursor_id is not None or page_size is not None:
+                raise ValueError("Attribute partitions may not be combined "
+                                 "with paging")
+            self._thehive_client.search_partitioned(context, self._PATH,
+                                                    partitions, fields)
+        elif cursor_id is not None:
+            # The fields for each page are those given for the first page.
+            self._thehive_client.search_next_page(context, cursor_id)
+        elif page_size is not None:
+            if not isinstance(page_size, int) or page_size <= 0:
+                raise ValueError("Attribute pageSize must be a positive "
+                                 "integer")
+            self._thehive_client.search_paged(context, self._PATH, page_size,
+                                              fields)
+        else:
+            self._thehive_client.search(context, self._PATH, fields=fields)
+
+
+class TheHiveSearchCaseRequestCallback(TheHiveSearchRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for case/search DXL
+    requests.
+    """
+    _ENTITY_TYPE = "case"
+    _PATH = "/api/case/_search"
+    _STATS_PATH = "/api/case/_stats"
 
 
-class TheHiveSearchCaseTaskRequestCallback(TheHiveApiRequestCallback):
+class TheHiveSearchCaseTaskRequestCallback(TheHiveSearchRequestCallback):
     """
     Request callback used to invoke TheHive REST API for case/task/search
     DXL requests.
     """
-    def on_request(self, request):
-        """
-        Invoked when a request message is received.
-
-        :param dxlclient.message.Request request: The request message
-        """
-        super(TheHiveSearchCaseTaskRequestCallback, self).on_request(request)
-        self._thehive_client.post(request, "/api/case/task/_search")
+    _ENTITY_TYPE = "case_task"
+    _PATH = "/api/case/task/_search"
+    _STATS_PATH = "/api/case/task/_stats"
 
 
-class TheHiveSearchCaseObservableRequestCallback(TheHiveApiRequestCallback):
+class TheHiveSearchCaseObservableRequestCallback(TheHiveSearchRequestCallback):
     """
     Request callback used to invoke TheHive REST API for case/observable/search
     DXL requests.
     """
-    def on_request(self, request):
-        """
-        Invoked when a request message is received.
-
-        :param dxlclient.message.Request request: The request message
-        """
-        super(TheHiveSearchCaseObservableRequestCallback, self).on_request(request)
-        self._thehive_client.post(request, "/api/case/artifact/_search")
+    _ENTITY_TYPE = "case_observable"
+    _PATH = "/api/case/artifact/_search"
+    _STATS_PATH = "/api/case/artifact/_stats"
 
 
 class TheHiveCreateAlertRequestCallback(TheHiveApiRequestCallback):
@@ -219,42 +436,149 @@ class TheHiveCreateAlertRequestCallback(TheHiveApiRequestCallback):
     Request callback used to invoke TheHive REST API for alert/create DXL
     requests.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        context.entity_type = "alert"
+        self._thehive_client.post(context, "/api/alert")
+
+
+class TheHiveBulkCreateAlertRequestCallback(TheHiveApiRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for alert/create/bulk
+    DXL requests. The request payload holds an ``alerts`` list of the alerts
+    to create.
+    """
+    def _handle_request(self, context):
         """
-        super(TheHiveCreateAlertRequestCallback, self).on_request(request)
-        self._thehive_client.post(request, "/api/alert")
+        Invoked to handle a request message once its payload has been
+        decoded.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        context.entity_type = "alert"
+        alerts = context.pop_attribute("alerts")
+        if not isinstance(alerts, list):
+            raise ValueError("Attribute alerts must be a list")
+        self._thehive_client.post_bulk(context, "/api/alert", alerts)
 
 
 class TheHiveGetAlertRequestCallback(TheHiveApiRequestCallback):
     """
     Request callback used to invoke TheHive REST API for alert/get DXL requests.
+    The request payload holds the ``id`` of the alert and, optionally, the
+    ``ifNoneMatch`` hash of the content of a previous response for the alert.
     """
-    def on_request(self, request):
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveGetAlertRequestCallback, self).on_request(request)
-        case_id = self._pop_attribute_from_request(request, "id")[0]
-        if case_id:
-            self._thehive_client.get(request, "/api/alert/{}".format(case_id))
+        context.entity_type = "alert"
+        context.entity_id = context.pop_attribute("id")
+        self._request_content_hash(context)
+        self._thehive_client.get(context,
+                                 "/api/alert/{}".format(context.entity_id))
 
 
-class TheHiveSearchAlertRequestCallback(TheHiveApiRequestCallback):
+class TheHiveSearchAlertRequestCallback(TheHiveSearchRequestCallback):
     """
     Request callback used to invoke TheHive REST API for alert/search DXL
     requests.
     """
-    def on_request(self, request):
+    _ENTITY_TYPE = "alert"
+    _PATH = "/api/alert/_search"
+    _STATS_PATH = "/api/alert/_stats"
+
+
+class TheHiveBulkGetRequestCallback(TheHiveApiRequestCallback):
+    """
+    Base class for the request callbacks used to invoke TheHive REST API for
+    bulk get DXL requests. The request payload holds an ``ids`` list of the
+    ids of the entities to get.
+    """
+    #: Type of the entities to get.
+    _ENTITY_TYPE = None
+    #: Format string for the URL subpath to get an entity by id.
+    _PATH_FORMAT = None
+
+    def _handle_request(self, context):
         """
-        Invoked when a request message is received.
+        Invoked to handle a request message once its payload has been
+        decoded.
 
-        :param dxlclient.message.Request request: The request message
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
+        """
+        context.entity_type = self._ENTITY_TYPE
+        entity_ids = context.pop_attribute("ids")
+        if not isinstance(entity_ids, list):
+            raise ValueError("Attribute ids must be a list")
+        self._thehive_client.get_bulk(context, self._PATH_FORMAT, entity_ids)
+
+
+class TheHiveBulkGetCaseRequestCallback(TheHiveBulkGetRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for case/get/bulk DXL
+    requests.
+    """
+    _ENTITY_TYPE = "case"
+    _PATH_FORMAT = "/api/case/{}"
+
+
+class TheHiveBulkGetCaseTaskRequestCallback(TheHiveBulkGetRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for case/task/get/bulk
+    DXL requests.
+    """
+    _ENTITY_TYPE = "case_task"
+    _PATH_FORMAT = "/api/case/task/{}"
+
+
+class TheHiveBulkGetCaseObservableRequestCallback(
+        TheHiveBulkGetRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for
+    case/observable/get/bulk DXL requests.
+    """
+    _ENTITY_TYPE = "case_observable"
+    _PATH_FORMAT = "/api/case/artifact/{}"
+
+
+class TheHiveBulkGetAlertRequestCallback(TheHiveBulkGetRequestCallback):
+    """
+    Request callback used to invoke TheHive REST API for alert/get/bulk DXL
+    requests.
+    """
+    _ENTITY_TYPE = "alert"
+    _PATH_FORMAT = "/api/alert/{}"
+
+
+class TheHiveGetChunkRequestCallback(TheHiveApiRequestCallback):
+    """
+    Request callback used to deliver a chunk of an oversized response for
+    chunk/get DXL requests. The request payload holds the ``transferId`` from
+    the ``other_fields`` of the response and the ``index`` of the chunk.
+    """
+    def _handle_request(self, context):
+        """
+        Invoked to handle a request message once its payload has been
+        decoded.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the request.
         """
-        super(TheHiveSearchAlertRequestCallback, self).on_request(request)
-        self._thehive_client.post(request, "/api/alert/_search")
+        # The index is not read with pop_attribute, since an index of 0
+        # would be treated as missing.
+        self._thehive_client.get_chunk(context,
+                                       context.pop_attribute("transferId"),
+                                       context.body.pop("index", None))
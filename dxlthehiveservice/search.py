@@ -0,0 +1,586 @@
+from __future__ import absolute_import
+import functools
+import numbers
+
+from . import json_codec
+from .cache import canonical_hash
+from .compat import STRING_TYPES
+from .cursors import SearchCursor
+from .fanout import completed_future, fan_out, gather, transform
+from .json_stream import HitCollector
+from .thehive_response import TheHiveResponse
+
+
+def _sort_key(value):
+    """
+    Get a key by which a value of a field of a search result can be sorted.
+    Values of different types cannot be compared with each other, so values
+    are ordered by type first: numbers, then strings, then any other value,
+    which is compared by its JSON encoding.
+
+    :param value: The value of the field.
+    :return: The key.
+    :rtype: tuple
+    """
+    if isinstance(value, numbers.Number):
+        return 0, value
+    if isinstance(value, STRING_TYPES):
+        return 1, value
+    return 2, json_codec.dumps_canonical(value)
+
+
+def _sort_hits(hits, sort):
+    """
+    Sort a list of search results in place, in the same order as TheHive
+    server sorts them for a search.
+
+    :param list hits: The search results.
+    :param list sort: The fields to sort by, most significant first, each
+        prefixed with "-" for a descending sort or optionally "+" for an
+        ascending sort. Results which are missing a field, or for which it
+        is null, sort after those which have it, for both ascending and
+        descending sorts.
+    """
+    # Sorts are stable, so sorting by each field in turn, least significant
+    # first, sorts by all of the fields.
+    for sort_field in reversed(sort):
+        name = sort_field.lstrip("+-")
+        present = [hit for hit in hits if hit.get(name) is not None]
+        missing = [hit for hit in hits if hit.get(name) is None]
+        present.sort(key=lambda hit, name=name: _sort_key(hit[name]),
+                     reverse=sort_field.startswith("-"))
+        hits[:] = present + missing
+
+
+def _project_hits(hits, fields):
+    """
+    Project a list of search results to a subset of their fields.
+
+    :param list hits: The search results.
+    :param list fields: Names of the fields to keep.
+    :return: The projected search results.
+    :rtype: list
+    """
+    return [{field: hit[field] for field in fields if field in hit}
+            for hit in hits]
+
+
+class SearchMixin(object):
+    """
+    Searches, including paged, partitioned, projected and counted searches,
+    and the search cache, for
+    :class:`dxlthehiveservice.thehive_client.TheHiveClient`.
+    """
+
+    def _cache_search(self, cache_key, ttl, entity_type, response):
+        """
+        Store a successful response for a search in the search cache.
+
+        :param tuple cache_key: Key for the search in the search cache.
+        :param float ttl: Number of seconds for which the response is cached.
+        :param str entity_type: Type of entity searched for.
+        :param TheHiveResponse response: The response, or None if the
+            request failed.
+        """
+        if response and response.status_code == 200:
+            self._search_cache.put(cache_key, response, len(response.content),
+                                   ttl=ttl, tags=(entity_type,))
+
+    def _search_cache_key(self, entity_type, path, body):
+        """
+        Get the key and time to live for a search in the search cache.
+
+        :param str entity_type: Type of entity searched for.
+        :param str path: URL subpath for the search.
+        :param dict body: Body for the search.
+        :return: A tuple of the key and the time to live, in seconds, or of
+            None and None if searches for the type of entity are not cached.
+        :rtype: tuple
+        """
+        ttl = self._search_cache_ttls.get(entity_type) \
+            if self._search_cache else None
+        if not ttl:
+            return None, None
+        return (path, canonical_hash(body)), ttl
+
+    def _fetch_search(self, context, entity_type, path, body,
+                      background=True):
+        """
+        Get the results of a search from the search cache or, if they are not
+        cached, from TheHive server, without delivering the response to the
+        DXL fabric.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of entity searched for.
+        :param str path: URL subpath for the search.
+        :param dict body: Body for the search.
+        :param bool background: Whether, with the threaded engine, the search
+            should be sent from one of the threads used for bulk requests
+            rather than from the calling thread.
+        :return: Future for the :class:`TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        cache_key, ttl = self._search_cache_key(entity_type, path, body)
+        if cache_key:
+            response = self._search_cache.get(cache_key)
+            if response:
+                return completed_future(response)
+        data = json_codec.dumps(body)
+        if self._single_flight:
+            future = self._single_flight.call(
+                ("POST", path, data),
+                lambda: self._submit(context, "POST", path, data,
+                                     expires=False, background=background))
+        else:
+            future = self._submit(context, "POST", path, data,
+                                  background=background)
+        if cache_key:
+            future.add_done_callback(
+                lambda completed: self._cache_search(
+                    cache_key, ttl, entity_type,
+                    None if completed.exception() else completed.result()))
+        return future
+
+    @staticmethod
+    def _collect_hits(response, fields, limit):
+        """
+        Collect the results in the response to a search which has been
+        received in full.
+
+        :param TheHiveResponse response: Response to the search.
+        :param list fields: Names of the fields to which each result is
+            projected, or None to keep all fields.
+        :param int limit: Maximum number of results to collect, or None to
+            collect all results.
+        :return: Response whose body holds the collected results, or the
+            response to the search if the search failed.
+        :rtype: TheHiveResponse
+        """
+        if not 200 <= response.status_code <= 299:
+            return response
+        hits = response.json()
+        if limit is not None:
+            hits = hits[:limit]
+        if fields is not None:
+            hits = _project_hits(hits, fields)
+        return TheHiveResponse(response.status_code, json_codec.dumps(hits))
+
+    def _fetch_hits(self, context, entity_type, path, body, fields=None,
+                    limit=None):
+        """
+        Get the results of a search, projected to a subset of their fields
+        and limited to a number of results, without delivering the response
+        to the DXL fabric.
+
+        If streaming of results is enabled and the search is not cached, the
+        results are collected as the search response is received, so that
+        the whole response is never held in memory. Otherwise, the results
+        are collected once the whole response has been received.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of entity searched for.
+        :param str path: URL subpath for the search.
+        :param dict body: Body for the search.
+        :param list fields: Names of the fields to which each result is
+            projected, or None to keep all fields.
+        :param int limit: Maximum number of results to collect, or None to
+            collect all results.
+        :return: Future for the :class:`TheHiveResponse` whose body holds the
+            collected results.
+        :rtype: concurrent.futures.Future
+        """
+        if self._stream_results:
+            cache_key, _ = self._search_cache_key(entity_type, path, body)
+            if not cache_key or not self._search_cache.get(cache_key):
+                return self._submit(context, "POST", path,
+                                    json_codec.dumps(body),
+                                    collector=HitCollector(fields, limit))
+        return transform(
+            self._fetch_search(context, entity_type, path, body,
+                               background=False),
+            lambda response: self._collect_hits(response, fields, limit))
+
+    def search(self, context, path, body=None, fields=None):
+        """
+        Perform an HTTP POST request for a search to TheHive server,
+        delivering the response to the DXL fabric. Since a search only reads
+        data, concurrent identical searches may share a single request to
+        TheHive server.
+
+        If the search cache is enabled for the type of entity searched for,
+        a cached response for an identical search is delivered without
+        making a request to TheHive server.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str path: URL subpath for the request to send to TheHive server.
+        :param dict body: Body to include in the HTTP request. If not
+            specified, the decoded body of the DXL request is used.
+        :param list fields: Names of the fields to which each result is
+            projected before the response is delivered, or None to deliver
+            the response as received from TheHive server.
+        """
+        if body is None:
+            body = context.body
+        if fields is not None:
+            if not self._admit(context):
+                return
+            self._deliver(context, self._fetch_hits(
+                context, context.entity_type, path, body, fields))
+            return
+        cache_key, ttl = self._search_cache_key(context.entity_type, path,
+                                                body)
+        if cache_key:
+            response = self._search_cache.get(cache_key)
+            if response:
+                self._send_response(context, completed_future(response))
+                return
+        self._request(context, "POST", path, body, read_only=True,
+                      on_response=functools.partial(
+                          self._cache_search, cache_key, ttl,
+                          context.entity_type) if cache_key else None)
+
+    def _build_page(self, cursor, cursor_id, response):
+        """
+        Build the response for a page of a paged search from the results
+        collected for the page, storing the cursor for the following page.
+
+        The search for a page asks for one more result than the size of the
+        page, so that whether any results follow the page is known without
+        a further search.
+
+        :param dxlthehiveservice.cursors.SearchCursor cursor: Cursor for the
+            page.
+        :param str cursor_id: Id of the cursor for the page, or None for the
+            first page.
+        :param TheHiveResponse response: Response whose body holds the
+            results collected for the page, projected to the fields of the
+            cursor.
+        :return: The response for the page, or the response to the search if
+            the search failed.
+        :rtype: TheHiveResponse
+        """
+        if not 200 <= response.status_code <= 299:
+            if cursor_id:
+                # Restore the cursor so that the page can be requested again.
+                self._cursors.put(cursor, cursor_id)
+            return response
+        results = response.json()
+        next_cursor_id = None
+        if len(results) > cursor.page_size:
+            results = results[:cursor.page_size]
+            next_cursor_id = self._cursors.put(cursor._replace(
+                offset=cursor.offset + cursor.page_size))
+        return TheHiveResponse(
+            response.status_code,
+            json_codec.dumps({"results": results, "cursor": next_cursor_id}))
+
+    def _search_page(self, context, cursor, cursor_id=None):
+        """
+        Search for a page of the results of a paged search, delivering the
+        page to the DXL fabric.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param dxlthehiveservice.cursors.SearchCursor cursor: Cursor for the
+            page.
+        :param str cursor_id: Id of the cursor for the page, or None for the
+            first page.
+        """
+        body = dict(cursor.body, range="{}-{}".format(
+            cursor.offset, cursor.offset + cursor.page_size + 1))
+        future = self._fetch_hits(context, cursor.entity_type, cursor.path,
+                                  body, cursor.fields, cursor.page_size + 1)
+        if cursor_id:
+            def _restore_cursor(completed):
+                if completed.exception():
+                    # Restore the cursor so that the page can be requested
+                    # again.
+                    self._cursors.put(cursor, cursor_id)
+            future.add_done_callback(_restore_cursor)
+        self._deliver(context, transform(
+            future, lambda response: self._build_page(cursor, cursor_id,
+                                                      response)))
+
+    def search_paged(self, context, path, page_size, fields=None):
+        """
+        Start a paged search, delivering the first page of results to the
+        DXL fabric.
+
+        The response body is a JSON object which holds the ``results`` in the
+        page and a ``cursor`` id through which the next page can be
+        requested with :meth:`search_next_page`, or null if there are no
+        further results. Pages are fetched from TheHive server with the
+        ``range`` of the search, so any ``range`` in the body of the DXL
+        request is ignored. Unless the body specifies a ``sort``, results are
+        sorted by descending creation time so that they are paged in a
+        stable order.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request. The body for the search is taken
+            from the context.
+        :param str path: URL subpath for the search.
+        :param int page_size: Number of results in each page.
+        :param list fields: Names of the fields to which each result is
+            projected, or None to return all fields.
+        :raises ValueError: if paged searches are disabled or the page size
+            exceeds the maximum.
+        """
+        if not self._cursors:
+            raise ValueError("Paged searches are not enabled")
+        if self._max_page_size and page_size > self._max_page_size:
+            raise ValueError("Page size must not exceed {}".format(
+                self._max_page_size))
+        if not self._admit(context):
+            return
+        body = dict(context.body)
+        body.pop("range", None)
+        body.setdefault("sort", ["-createdAt"])
+        self._search_page(context, SearchCursor(
+            context.entity_type, path, body, page_size, 0, fields))
+
+    def search_next_page(self, context, cursor_id):
+        """
+        Continue a paged search started with :meth:`search_paged`,
+        delivering the next page of results to the DXL fabric.
+
+        Each cursor id may only be used once. If the search for the page
+        fails, the cursor id may be used again to retry it.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str cursor_id: Id of the cursor for the page.
+        :raises ValueError: if paged searches are disabled or no unexpired
+            cursor exists for the id and the type of entity searched for.
+        """
+        if not self._cursors:
+            raise ValueError("Paged searches are not enabled")
+        if not self._admit(context):
+            return
+        cursor = self._cursors.take(cursor_id)
+        if cursor and cursor.entity_type != context.entity_type:
+            self._cursors.put(cursor, cursor_id)
+            cursor = None
+        if not cursor:
+            raise ValueError("Unknown or expired cursor: {}".format(
+                cursor_id))
+        self._search_page(context, cursor, cursor_id)
+
+    @staticmethod
+    def _parse_search_range(body):
+        """
+        Read the range of results requested by the body of a search.
+
+        :param dict body: Body for the search.
+        :return: A tuple of the index of the first result and the index after
+            the last result, or None if all results are requested.
+        :rtype: tuple
+        :raises ValueError: if the range is not valid.
+        """
+        search_range = body.get("range", "all")
+        if search_range == "all":
+            return None
+        try:
+            start, end = (int(index) for index in
+                          str(search_range).split("-"))
+        except ValueError:
+            raise ValueError("Invalid range: {}".format(search_range))
+        if not 0 <= start <= end:
+            raise ValueError("Invalid range: {}".format(search_range))
+        return start, end
+
+    def _partition_by_window(self, body, search_range, window_size):
+        """
+        Split a search into searches for consecutive windows of its range.
+
+        :param dict body: Body for the search.
+        :param tuple search_range: Range of results requested by the search.
+        :param int window_size: Number of results in each window.
+        :return: Bodies for the searches, in the order of their windows.
+        :rtype: list
+        :raises ValueError: if the range is not bounded or would be split
+            into too many windows.
+        """
+        if not search_range:
+            raise ValueError("A range is required to partition a search "
+                             "by windowSize")
+        start, end = search_range
+        if (end - start + window_size - 1) // window_size > \
+                self._max_partitions:
+            raise ValueError("Search may not be split into more than {} "
+                             "partitions".format(self._max_partitions))
+        return [dict(body, range="{}-{}".format(
+            window_start, min(window_start + window_size, end)))
+                for window_start in range(start, end, window_size)]
+
+    def _partition_by_field(self, body, search_range, field, lower, upper,
+                            count):
+        """
+        Split a search into searches for consecutive intervals of the values
+        of a numeric field, for example ``createdAt``.
+
+        :param dict body: Body for the search.
+        :param tuple search_range: Range of results requested by the search.
+        :param str field: Name of the field.
+        :param int lower: Lowest value of the field to search for.
+        :param int upper: Value of the field above the highest value to
+            search for.
+        :param int count: Number of intervals.
+        :return: Bodies for the searches, one per non-empty interval.
+        :rtype: list
+        :raises ValueError: if the search would be split into too many
+            intervals.
+        """
+        if count > self._max_partitions:
+            raise ValueError("Search may not be split into more than {} "
+                             "partitions".format(self._max_partitions))
+        # Each interval may hold any of the results up to the end of the
+        # range, so each search asks for all of them and the range is applied
+        # once the results have been merged.
+        partition_range = "0-{}".format(search_range[1]) \
+            if search_range else "all"
+        bounds = [lower + (upper - lower) * index // count
+                  for index in range(count + 1)]
+        bodies = []
+        for interval_lower, interval_upper in zip(bounds, bounds[1:]):
+            if interval_lower == interval_upper:
+                continue
+            interval_query = {"_between": {"_field": field,
+                                           "_from": interval_lower,
+                                           "_to": interval_upper}}
+            query = body.get("query")
+            bodies.append(dict(
+                body, range=partition_range,
+                query={"_and": [query, interval_query]}
+                if query else interval_query))
+        return bodies
+
+    def _merge_partitions(self, search_range, sort, fields, futures):
+        """
+        Merge the results of the searches for the partitions of a search.
+
+        :param tuple search_range: Range of results requested by the search,
+            or None if the results of the partitions are not sorted and
+            limited once they have been merged.
+        :param list sort: The fields by which the results are sorted.
+        :param list fields: Names of the fields to which each result is
+            projected, or None to return all fields.
+        :param list futures: Completed futures for the
+            :class:`TheHiveResponse` to the search for each partition.
+        :return: Response whose body holds the merged results, or the
+            response for the first partition whose search failed.
+        :rtype: TheHiveResponse
+        """
+        merged = []
+        seen_ids = set()
+        for future in futures:
+            response = future.result()
+            if not 200 <= response.status_code <= 299:
+                return response
+            for hit in response.json():
+                # Discard any result which lies on the boundary between two
+                # intervals and so is returned for both of them.
+                hit_id = hit.get("id")
+                if hit_id is not None:
+                    if hit_id in seen_ids:
+                        continue
+                    seen_ids.add(hit_id)
+                merged.append(hit)
+        if search_range:
+            _sort_hits(merged, sort)
+            merged = merged[search_range[0]:search_range[1]]
+        if fields is not None:
+            merged = _project_hits(merged, fields)
+        return TheHiveResponse(200, json_codec.dumps(merged))
+
+    def search_partitioned(self, context, path, partitions, fields=None):
+        """
+        Split a search into partitions which are searched for concurrently,
+        delivering the merged results to the DXL fabric.
+
+        A search may be split either into consecutive windows of its
+        ``range``, by specifying a ``windowSize`` in the partitions, or into
+        intervals of the values of a numeric field, by specifying the
+        ``field``, the ``from`` value at the start of the first interval,
+        the ``to`` value at the end of the last interval and the ``count`` of
+        intervals. The merged results are sorted in the order requested by
+        the ``sort`` of the search, and limited to its ``range``. Unless the
+        search specifies a ``sort``, results are sorted by descending value
+        of the field by which the search is split, or by descending creation
+        time for windows.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request. The body for the search is taken
+            from the context.
+        :param str path: URL subpath for the search.
+        :param dict partitions: How to split the search.
+        :param list fields: Names of the fields to which each result is
+            projected, or None to return all fields.
+        :raises ValueError: if partitioned searches are disabled or the
+            partitions are not valid.
+        """
+        if not self._max_partitions:
+            raise ValueError("Partitioned searches are not enabled")
+        if not isinstance(partitions, dict):
+            raise ValueError("Attribute partitions must be an object")
+        body = dict(context.body)
+        search_range = self._parse_search_range(body)
+        window_size = partitions.get("windowSize")
+        field = partitions.get("field")
+        if window_size is not None:
+            if not isinstance(window_size, int) or window_size <= 0:
+                raise ValueError("Partition windowSize must be a positive "
+                                 "integer")
+            body.setdefault("sort", ["-createdAt"])
+            bodies = self._partition_by_window(body, search_range,
+                                               window_size)
+            # The windows are consecutive ranges of the same sorted results,
+            # so they only need to be concatenated in order.
+            search_range = None
+        elif field is not None:
+            lower = partitions.get("from")
+            upper = partitions.get("to")
+            count = partitions.get("count")
+            if not all(isinstance(value, int) for value in
+                       (lower, upper, count)) or lower >= upper or count <= 0:
+                raise ValueError("Partitions by field require integer from "
+                                 "and to values, with from below to, and a "
+                                 "positive integer count")
+            body.setdefault("sort", ["-{}".format(field)])
+            bodies = self._partition_by_field(body, search_range, field,
+                                              lower, upper, count)
+        else:
+            raise ValueError("Partitions require either a windowSize or a "
+                             "field")
+        sort = body["sort"]
+        if isinstance(sort, STRING_TYPES):
+            sort = [sort]
+        if not self._admit(context):
+            return
+        futures = fan_out(
+            [functools.partial(self._fetch_search, context,
+                               context.entity_type, path, partition_body)
+             for partition_body in bodies],
+            self._bulk_concurrency)
+        self._deliver(context, transform(
+            gather(futures),
+            lambda completed: self._merge_partitions(search_range, sort,
+                                                     fields, completed)))
+
+    def search_count(self, context, path):
+        """
+        Count the results of a search with TheHive server's statistics API,
+        delivering the response to the DXL fabric. The response body is a
+        JSON object which holds the ``count`` of results, so the results
+        themselves are not sent by TheHive server.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request. The ``query`` for the search is
+            taken from the body of the DXL request.
+        :param str path: URL subpath for the statistics request.
+        """
+        self.search(context, path,
+                    {"query": context.body.get("query", {}),
+                     "stats": [{"_agg": "count"}]})
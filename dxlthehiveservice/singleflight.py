@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+from concurrent.futures import Future
+import threading
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent identical calls so that only one of them is made.
+
+    While a call for a key is in flight, later calls for the same key are
+    not made. Instead, they are given the future for the call already in
+    flight, so the result of the one call is shared with every caller.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._calls_made = 0
+        self._calls_coalesced = 0
+
+    def call(self, key, fn):
+        """
+        Make a call for a key unless a call for the same key is already in
+        flight.
+
+        :param key: Hashable key which identifies the call.
+        :param function fn: Function which makes the call, returning a
+            :class:`concurrent.futures.Future` for its result.
+        :return: Future for the result of the call.
+        :rtype: concurrent.futures.Future
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._calls_coalesced += 1
+                return future
+            future = Future()
+            self._calls[key] = future
+            self._calls_made += 1
+
+        def _on_done(call_future):
+            with self._lock:
+                del self._calls[key]
+            try:
+                future.set_result(call_future.result())
+            except Exception as ex:  # pylint: disable=broad-except
+                future.set_exception(ex)
+
+        try:
+            call_future = fn()
+        except Exception as ex:  # pylint: disable=broad-except
+            call_future = Future()
+            call_future.set_exception(ex)
+        call_future.add_done_callback(_on_done)
+        return future
+
+    @property
+    def stats(self):
+        """
+        Counters for the calls which were made (``calls``) and the calls
+        which shared the result of a call already in flight (``coalesced``).
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {"calls": self._calls_made,
+                    "coalesced": self._calls_coalesced,
+                    "inFlight": len(self._calls)}
@@ -1,59 +1,274 @@
 from __future__ import absolute_import
+from collections import OrderedDict
+import functools
 import logging
-
-import requests
+import sys
+import threading
+import time
 
 from dxlclient.message import Response, ErrorResponse
 from dxlbootstrap.util import MessageUtils
 
+from . import compression, json_codec
+from .batcher import MicroBatcher
+from .bulk import BulkMixin
+from .cache import TtlCache
+from .cursors import CursorStore
+from .fanout import completed_future, copy_future
+from .request_context import RequestExpiredError
+from .search import SearchMixin
+from .singleflight import SingleFlight
+from .thehive_response import TheHiveResponse
+from .threaded_engine import ThreadedEngine
+from .transfer import TransferMixin
+
 # Configure local logger
 logger = logging.getLogger(__name__)
 
 
-class TheHiveClient(object):
+class TheHiveClient(BulkMixin, SearchMixin, TransferMixin):
     """
     HTTP client through which requests to TheHive server should be sent.
+
+    The bulk and composite requests, the searches and the compression and
+    transfer of responses are implemented by the mixins from which the
+    client is composed.
     """
-    def __init__(self, dxl_client, api_url, api_principal,
-                 api_password, verify_certificate):
+
+    #: Error code set on the DXL error response for a request which could not
+    #: be completed before its deadline.
+    DEADLINE_EXCEEDED_ERROR_CODE = 504
+
+    #: Name of the field in the ``other_fields`` of a DXL response which
+    #: holds the hash of the content of the response, which the caller may
+    #: supply as ``ifNoneMatch`` when it repeats the request.
+    CONTENT_HASH_FIELD = "contentHash"
+    #: Name of the field in the ``other_fields`` of a DXL response which is
+    #: set to ``true`` if the content of the response is unchanged from the
+    #: content whose hash the caller supplied, in which case the payload of
+    #: the response does not hold the content.
+    NOT_MODIFIED_FIELD = "notModified"
+
+    #: Engine which sends each request to TheHive server from the thread
+    #: which invoked the DXL request callback.
+    ENGINE_THREADED = "threaded"
+    #: Engine which sends requests to TheHive server from a single asyncio
+    #: event loop, releasing the DXL request callback thread immediately.
+    ENGINE_ASYNC = "async"
+
+    #: Search paths through which batched get requests are sent, keyed by
+    #: the type of entity to get.
+    _BATCH_SEARCH_PATHS = {"case": "/api/case/_search",
+                           "alert": "/api/alert/_search"}
+
+    def __init__(self, dxl_client, settings):
         """
         Constructor parameters:
 
         :param dxlclient.client.DxlClient dxl_client: DXL client through which
             responses can be sent.
-        :param str api_url: URL of TheHive API server.
-        :param str api_principal: API key or username to use for requests made
-            to TheHive server. The value is treated as a username only if
-            a non-empty value is specified for the api_password parameter.
-        :param str api_password: API password to use for requests made to
-            TheHive server.
-        :param verify_certificate: For a value of False, do not verify the
-            server certificate in requests. For a value of True, verify the
-            server certificate using the default trust store. For a string
-            value, read the associated file name contents and use as a
-            certificate trust store.
+        :param dxlthehiveservice.client_settings.ClientSettings settings:
+            Settings for the client.
+        :raises ValueError: if the engine or one of the compression encodings
+            is not recognized, or the dependencies of the engine are not
+            installed.
         """
         self._dxl_client = dxl_client
-        self._api_url = api_url
-        self._request_headers = {} if api_password else \
-            {"Authorization": "Bearer {}".format(api_principal)}
-        self._request_auth = (api_principal, api_password) \
-            if api_password else None
-        self._verify_certificate = verify_certificate
+        self._api_url = settings.api_url
+        self._request_headers = {"Content-Type": "application/json"}
+        if not settings.api_password:
+            self._request_headers["Authorization"] = "Bearer {}".format(
+                settings.api_principal)
+        if settings.http_accept_encoding:
+            self._request_headers["Accept-Encoding"] = \
+                settings.http_accept_encoding
+        self._request_auth = (settings.api_principal, settings.api_password) \
+            if settings.api_password else None
+        self._passthrough = settings.passthrough
+        self._single_flight = SingleFlight() if settings.coalesce else None
+        self._read_cache = TtlCache(settings.read_cache_max_bytes,
+                                    settings.read_cache_ttl) \
+            if settings.read_cache_ttl and settings.read_cache_max_bytes \
+            else None
+        self._search_cache_ttls = {
+            entity_type: ttl for entity_type, ttl in
+            (settings.search_cache_ttls or {}).items() if ttl}
+        self._search_cache = TtlCache(settings.search_cache_max_bytes, 0) \
+            if self._search_cache_ttls and settings.search_cache_max_bytes \
+            else None
+        self._not_found_cache = TtlCache(settings.not_found_cache_max_bytes,
+                                         settings.not_found_cache_ttl) \
+            if settings.not_found_cache_ttl and \
+            settings.not_found_cache_max_bytes else None
+        self._get_batcher = MicroBatcher(self._flush_get_batch,
+                                         settings.batch_max_wait,
+                                         settings.batch_max_size) \
+            if settings.batch_max_wait and settings.batch_max_size else None
+        self._bulk_concurrency = settings.bulk_concurrency
+        self._bulk_chunk_size = settings.bulk_chunk_size
+        self._cursors = CursorStore(settings.max_cursors, settings.cursor_ttl) \
+            if settings.cursor_ttl and settings.max_cursors else None
+        self._max_page_size = settings.max_page_size
+        self._max_partitions = settings.max_partitions
+        self._stream_results = settings.stream_results
+        self._max_message_bytes = settings.max_message_bytes
+        self._transfers = TtlCache(settings.transfer_max_bytes,
+                                   settings.transfer_ttl) \
+            if settings.max_message_bytes and settings.transfer_ttl and \
+            settings.transfer_max_bytes else None
+        self._compression_min_bytes = settings.compression_min_bytes
+        self._compression_encodings = compression.available_encodings(
+            settings.compression_encodings or [])
+        for encoding in settings.compression_encodings or []:
+            if encoding not in self._compression_encodings:
+                logger.info("Compression encoding %s is not available, "
+                            "its package is not installed", encoding)
+        self._http_request_min_bytes = settings.http_request_min_bytes
+        # Set once TheHive server has rejected a compressed request body,
+        # after which request bodies are no longer compressed.
+        self._compressed_requests_rejected = threading.Event()
+        # Set once TheHive server has accepted a compressed request body,
+        # after which a "bad request" response to a compressed body is taken
+        # to reject its content rather than its encoding.
+        self._compressed_requests_accepted = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._shed_requests = 0
+        self._not_modified_responses = 0
+        self._compression = {"responses": 0, "bytesIn": 0, "bytesOut": 0}
+        self._http_compression = {"requests": 0,
+                                  "requestBytes": 0,
+                                  "requestWireBytes": 0,
+                                  "responses": 0,
+                                  "responseBytes": 0,
+                                  "responseWireBytes": 0}
+        self._engine = self._create_engine(settings)
+
+    def _create_engine(self, settings):
+        """
+        Create the engine through which requests are sent to TheHive server.
+
+        :param dxlthehiveservice.client_settings.ClientSettings settings:
+            Settings for the client.
+        :return: The engine.
+        :raises ValueError: if the engine is not recognized or its
+            dependencies are not installed.
+        """
+        if settings.engine == self.ENGINE_THREADED:
+            return ThreadedEngine(
+                self._request_headers, self._request_auth,
+                settings.verify_certificate, settings.pool_size,
+                settings.max_connections_per_host, settings.idle_timeout,
+                settings.bulk_concurrency)
+        if settings.engine == self.ENGINE_ASYNC:
+            # The async engine module uses syntax which is only valid on
+            # Python 3.5+, so it is only imported on a version which can
+            # compile it.
+            if sys.version_info < (3, 5):
+                raise ValueError("The {} engine requires Python 3.5+".format(
+                    settings.engine))
+            try:
+                from .async_engine import AsyncEngine
+            except ImportError as ex:
+                raise ValueError(
+                    "The {} engine requires the aiohttp package: {}".format(
+                        settings.engine, ex))
+            return AsyncEngine(
+                self._request_headers, self._request_auth,
+                settings.verify_certificate,
+                settings.max_connections_per_host, settings.idle_timeout,
+                settings.async_worker_count)
+        raise ValueError("Unknown engine: {}".format(settings.engine))
+
+    @property
+    def stats(self):
+        """
+        Counters for the engine used by the client, for the coalescing of
+        read-only requests, for the read, search and not found caches, for the
+        batching of get requests, for the cursors of paged searches, for the
+        transfers of oversized responses, for the compression of response
+        payloads, for the compression of the bodies of HTTP requests to and
+        responses from TheHive server (``httpCompression``), and the number
+        of expired requests which were dropped (``shedRequests``) and of "not
+        modified" responses delivered in place of unchanged content
+        (``notModifiedResponses``).
+
+        :rtype: dict
+        """
+        with self._stats_lock:
+            stats = {"shedRequests": self._shed_requests,
+                     "notModifiedResponses": self._not_modified_responses,
+                     "httpCompression": dict(self._http_compression)}
+            if self._compression_min_bytes and self._compression_encodings:
+                stats["compression"] = dict(self._compression)
+        if self._single_flight:
+            stats["singleFlight"] = self._single_flight.stats
+        if self._read_cache:
+            stats["readCache"] = self._read_cache.stats
+        if self._search_cache:
+            stats["searchCache"] = self._search_cache.stats
+        if self._not_found_cache:
+            stats["notFoundCache"] = self._not_found_cache.stats
+        if self._get_batcher:
+            stats["getBatcher"] = self._get_batcher.stats
+        if self._cursors:
+            stats["cursors"] = self._cursors.stats
+        if self._transfers:
+            stats["transfers"] = self._transfers.stats
+        stats[self._engine.STATS_FIELD] = self._engine.stats
+        return stats
+
+    def shed_request(self, context):
+        """
+        Drop an expired request without delivering a response for it.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        """
+        with self._stats_lock:
+            self._shed_requests += 1
+        now = time.time()
+        logger.warning("Dropping expired request on topic '%s' after %.3f "
+                       "seconds", context.topic, now - context.received_at)
+        logger.debug("Expired request on topic '%s': caller %s %s, expiry "
+                     "%.3f, local time %.3f", context.topic,
+                     context.CALLER_DEADLINE_FIELD, context.caller_deadline,
+                     context.expires_at, now)
+
+    def close(self):
+        """
+        Close any connections held open to TheHive server.
+        """
+        self._engine.close()
+
+    def _set_response_payload(self, res, response, response_dict=None):
+        """
+        Set the payload for a DXL response from the body of an HTTP response
+        received from TheHive server.
+
+        :param dxlclient.message.Response res: The DXL response.
+        :param TheHiveResponse response: HTTP response received from TheHive.
+        :param dict response_dict: The body of the HTTP response, if it has
+            already been decoded.
+        """
+        if self._passthrough:
+            # Copy the raw body through as-is to avoid decoding and then
+            # re-encoding the JSON.
+            res.payload = response.content
+        else:
+            json_codec.dict_to_payload(
+                res,
+                response.json() if response_dict is None else response_dict)
 
     @staticmethod
-    def _build_http_error_response(dxl_request, response):
+    def _parse_error_message(response_dict):
         """
-        Create a DXL ErrorResponse from the contents of an HTTP response
-        for a request sent to TheHive.
+        Read the short error message from the decoded body of an HTTP error
+        response received from TheHive server.
 
-        :param dxlclient.message.Request dxl_request: DXL request containing
-            parameters to forward along in a request to TheHive server.
-        :param requests.Response response: HTTP response received from TheHive.
-        :return: The error response to deliver to the DXL fabric.
-        :rtype: dxlclient.message.ErrorResponse
+        :param dict response_dict: The decoded body of the response.
+        :return: The error message, or None if no message could be read.
+        :rtype: str
         """
-        response_dict = response.json()
         error_message = response_dict.get("message")
         if not error_message:
             errors = response_dict.get("errors")
@@ -66,6 +281,21 @@ class TheHiveClient(object):
                     if isinstance(first_suberror, dict):
                         error_message = first_suberror.get(
                             "message")
+        return error_message
+
+    def _build_http_error_response(self, dxl_request, response):
+        """
+        Create a DXL ErrorResponse from the contents of an HTTP response
+        for a request sent to TheHive.
+
+        :param dxlclient.message.Request dxl_request: DXL request containing
+            parameters to forward along in a request to TheHive server.
+        :param TheHiveResponse response: HTTP response received from TheHive.
+        :return: The error response to deliver to the DXL fabric.
+        :rtype: dxlclient.message.ErrorResponse
+        """
+        response_dict = response.json()
+        error_message = self._parse_error_message(response_dict)
         if error_message:
             log_message = "Error handling request: {}".format(
                 error_message
@@ -83,74 +313,470 @@ class TheHiveClient(object):
                 if error_message else "Error handling request",
             error_code=response.status_code
         )
-        MessageUtils.dict_to_json_payload(res, response_dict)
+        self._set_response_payload(res, response, response_dict)
         return res
 
-    def _request(self, dxl_request, path, request_fn, body=None):
+    def _build_deadline_exceeded_response(self, context):
         """
-        Make a request to TheHive server, delivering the response to the
-        DXL fabric.
+        Create a DXL ErrorResponse for a request whose deadline passed before
+        it could be completed.
 
-        :param dxlclient.message.Request dxl_request: DXL request containing
-            parameters to forward along in a request to TheHive server.
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :return: The error response to deliver to the DXL fabric.
+        :rtype: dxlclient.message.ErrorResponse
+        """
+        error_message = "Deadline exceeded for request"
+        logger.error("Error handling request on topic '%s': %s",
+                     context.topic, error_message)
+        return ErrorResponse(context.request,
+                             error_code=self.DEADLINE_EXCEEDED_ERROR_CODE,
+                             error_message=error_message)
+
+    def _build_not_modified_response(self, context, response):
+        """
+        Create a DXL Response for a request whose content is unchanged from
+        the content whose hash the caller supplied.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param TheHiveResponse response: HTTP response received from TheHive.
+        :return: The response to deliver to the DXL fabric.
+        :rtype: dxlclient.message.Response
+        """
+        with self._stats_lock:
+            self._not_modified_responses += 1
+        res = Response(context.request)
+        json_codec.dict_to_payload(res, {self.NOT_MODIFIED_FIELD: True})
+        res.other_fields = {self.CONTENT_HASH_FIELD: response.content_hash(),
+                            self.NOT_MODIFIED_FIELD: "true"}
+        return res
+
+    def _submit(self, context, method, path, data=None, expires=True,
+                background=False, collector=None):
+        """
+        Submit a request to TheHive server through the configured engine.
+
+        With the threaded engine, the request is sent from the calling thread
+        and the returned future has already completed, unless the request is
+        sent in the background. With the async engine, the request is handed
+        off to the event loop and the returned future completes once the
+        response has been received.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request, from which the timeouts for the
+            request are taken.
+        :param str method: HTTP method for the request.
+        :param str path: URL subpath for the request to send to TheHive server.
+        :param bytes data: JSON encoded body to include in the request.
+        :param bool expires: Whether the request should be dropped if the
+            DXL request expires before the request can be sent.
+        :param bool background: Whether, with the threaded engine, the request
+            should be sent from one of the threads used for bulk requests
+            rather than from the calling thread.
+        :param dxlthehiveservice.json_stream.HitCollector collector:
+            Collector to which the body of a successful response is fed as it
+            is received, or None to read the whole body.
+        :return: Future for the :class:`TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        timeout = context.http_timeouts()
+        expires_at = context.expires_at if expires else None
+        future = self._submit_body(
+            functools.partial(self._submit_to_engine, method, path,
+                              timeout=timeout, expires_at=expires_at,
+                              background=background, collector=collector),
+            data)
+        if collector is None:
+            future.add_done_callback(self._record_response_bytes)
+        return future
+
+    def _submit_to_engine(self, method, path, data=None, headers=None,
+                          timeout=(None, None), expires_at=None,
+                          background=False, collector=None):
+        """
+        Submit a request to TheHive server through the configured engine.
+
+        :param str method: HTTP method for the request.
         :param str path: URL subpath for the request to send to TheHive server.
-        :param function request_fn: Callback which is invoked to make
-            TheHive request.
-        :param str body: Request body to include in the request.
+        :param bytes data: Body to include in the request.
+        :param dict headers: HTTP headers to include in the request in
+            addition to the headers included in each request.
+        :param tuple timeout: Connect and read timeouts, in seconds, for the
+            request.
+        :param float expires_at: Time, in seconds since the epoch, after
+            which the request should not be sent, or None if the request
+            does not expire.
+        :param bool background: Whether, with the threaded engine, the request
+            should be sent from one of the threads used for bulk requests
+            rather than from the calling thread.
+        :param dxlthehiveservice.json_stream.HitCollector collector:
+            Collector to which the body of a successful response is fed as it
+            is received, or None to read the whole body.
+        :return: Future for the :class:`TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        return self._engine.submit(method, self._api_url + path, data,
+                                   timeout, expires_at, collector, headers,
+                                   background)
+
+    def _send_response(self, context, future):
         """
+        Deliver the result of a request to TheHive server to the DXL fabric.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param concurrent.futures.Future future: Completed future for the
+            :class:`TheHiveResponse`.
+        """
+        dxl_request = context.request
+        context.mark("completed")
         try:
-            request_url = self._api_url + path
-            response = request_fn(request_url, body)
+            response = future.result()
             if 200 <= response.status_code <= 299:
                 # TheHive request was successful so forward the response
-                # along as-is to the DXL fabric.
-                res = Response(dxl_request)
-                MessageUtils.dict_to_json_payload(res, response.json())
+                # along as-is to the DXL fabric. Unless passthrough has been
+                # disabled, the body is not decoded.
+                if context.hash_content and \
+                        context.if_none_match == response.content_hash():
+                    res = self._build_not_modified_response(context,
+                                                            response)
+                else:
+                    res = Response(dxl_request)
+                    self._set_response_payload(res, response)
+                    if context.hash_content:
+                        res.other_fields[self.CONTENT_HASH_FIELD] = \
+                            response.content_hash()
+                    self._compress_payload(dxl_request, res)
+                    if self._transfers and \
+                            len(res.payload) > self._max_message_bytes:
+                        self._start_transfer(res)
             else:
                 # TheHive request encountered an error. Attempt to decode
                 # an error message from the response body.
                 res = self._build_http_error_response(dxl_request, response)
-        except Exception as ex:
-            error_str = str(ex)
-            logger.exception("Error handling request: %s", error_str)
-            res = ErrorResponse(dxl_request,
-                                error_message=MessageUtils.encode(error_str))
+        except RequestExpiredError:
+            self.shed_request(context)
+            return
+        except Exception as ex:  # pylint: disable=broad-except
+            if context.deadline_exceeded():
+                res = self._build_deadline_exceeded_response(context)
+            else:
+                error_str = str(ex)
+                logger.exception("Error handling request: %s", error_str)
+                res = ErrorResponse(
+                    dxl_request, error_message=MessageUtils.encode(error_str))
         self._dxl_client.send_response(res)
+        context.mark("responded")
+        logger.debug("Response sent for request on topic '%s', timings: %s",
+                     context.topic, context.timings)
 
-    def get(self, dxl_request, path):
+    def _request(self, context, method, path, body=None, read_only=False,
+                 on_response=None):
         """
-        Perform an HTTP GET request to TheHive server, delivering the response
-        to the DXL fabric.
+        Make a request to TheHive server, delivering the response to the
+        DXL fabric once it has been received.
 
-        :param dxlclient.message.Request dxl_request: DXL request containing
-            parameters to forward along in a request to TheHive server.
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str method: HTTP method for the request.
         :param str path: URL subpath for the request to send to TheHive server.
+        :param body: Body to include as JSON in the request.
+        :param bool read_only: Whether the request only reads data from
+            TheHive server, in which case it may share the response of an
+            identical request which is already in flight.
+        :param function on_response: Function to invoke with the
+            :class:`TheHiveResponse` once the request has completed, before
+            the response is delivered to the DXL fabric. The function is
+            invoked with None if the request failed.
         """
-        def _handle_request(request_url, _):
-            return requests.get(request_url,
-                                headers=self._request_headers,
-                                auth=self._request_auth,
-                                verify=self._verify_certificate)
-        self._request(dxl_request, path, _handle_request)
+        if not self._admit(context):
+            return
+        data = None if body is None else json_codec.dumps(body)
+        if read_only and self._single_flight:
+            # The request may be shared with other DXL requests, so it is not
+            # dropped if this DXL request expires while it is waiting to be
+            # sent.
+            future = self._single_flight.call(
+                (method, path, data),
+                lambda: self._submit(context, method, path, data,
+                                     expires=False))
+        else:
+            future = self._submit(context, method, path, data)
+        self._deliver(context, future, on_response)
 
-    def post(self, dxl_request, path, body=None):
+    def _admit(self, context):
         """
-        Perform an HTTP POST request to TheHive server, delivering the response
+        Check whether a DXL request may still be sent to TheHive server. An
+        expired request is dropped and a request whose deadline has passed
+        is answered with an error.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :return: True if the request may be sent, False if it has been
+            handled.
+        :rtype: bool
+        """
+        if context.expired():
+            self.shed_request(context)
+            return False
+        if context.deadline_exceeded():
+            self._dxl_client.send_response(
+                self._build_deadline_exceeded_response(context))
+            return False
+        context.mark("submitted")
+        return True
+
+    def _deliver(self, context, future, on_response=None):
+        """
+        Deliver the response for a request to TheHive server to the DXL
+        fabric once the request has completed.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param concurrent.futures.Future future: Future for the
+            :class:`TheHiveResponse`.
+        :param function on_response: Function to invoke with the
+            :class:`TheHiveResponse` once the request has completed, before
+            the response is delivered to the DXL fabric. The function is
+            invoked with None if the request failed.
+        """
+        def _on_done(completed):
+            if on_response:
+                try:
+                    on_response(None if completed.exception() else
+                                completed.result())
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Error processing response for request "
+                                     "on topic '%s'", context.topic)
+            self._send_response(context, completed)
+
+        future.add_done_callback(_on_done)
+
+    def _flush_get_batch(self, entity_type, batch):
+        """
+        Send a batch of get requests to TheHive server as a single search for
+        the ids of the requested entities. A batch which only requests a
+        single entity is sent as a plain get request for the entity, which
+        is cheaper for TheHive server to handle than a search.
+
+        :param str entity_type: Type of the entities to get.
+        :param list batch: List of tuples of a tuple of the context and URL
+            subpath for each DXL get request and the future for its
+            :class:`TheHiveResponse`.
+        """
+        entity_ids = list(OrderedDict.fromkeys(
+            context.entity_id for (context, _), _ in batch))
+        context, path = batch[0][0]
+        # The request is shared by every request in the batch, so it is not
+        # dropped if the request which started the batch expires.
+        if len(entity_ids) == 1:
+            future = self._submit(context, "GET", path, expires=False)
+            future.add_done_callback(
+                lambda completed: self._complete_get_batch(batch, completed))
+            return
+        data = json_codec.dumps(
+            {"query": {"_in": {"_field": "_id", "_values": entity_ids}}})
+        future = self._submit(
+            context, "POST", "{}?range=0-{}".format(
+                self._BATCH_SEARCH_PATHS[entity_type], len(entity_ids)),
+            data, expires=False)
+        future.add_done_callback(
+            lambda completed: self._demultiplex_get_batch(entity_type, batch,
+                                                          completed))
+
+    @staticmethod
+    def _complete_get_batch(batch, future):
+        """
+        Complete the futures for a batch of get requests for a single entity
+        from the response to the get request sent for the batch.
+
+        :param list batch: List of tuples of a tuple of the context and URL
+            subpath for each DXL get request and the future for its
+            :class:`TheHiveResponse`.
+        :param concurrent.futures.Future future: Completed future for the
+            :class:`TheHiveResponse` to the get request.
+        """
+        for _, entity_future in batch:
+            copy_future(future, entity_future)
+
+    @staticmethod
+    def _demultiplex_get_batch(entity_type, batch, future):
+        """
+        Complete the futures for a batch of get requests from the response
+        to the search sent for the batch. Each request for an entity which is
+        not present in the search results is given a "not found" response.
+
+        :param str entity_type: Type of the entities to get.
+        :param list batch: List of tuples of a tuple of the context and URL
+            subpath for each DXL get request and the future for its
+            :class:`TheHiveResponse`.
+        :param concurrent.futures.Future future: Completed future for the
+            :class:`TheHiveResponse` to the search.
+        """
+        try:
+            response = future.result()
+            if response.status_code == 200:
+                documents = {}
+                for document in response.json():
+                    documents[document.get("id") or document.get("_id")] = \
+                        TheHiveResponse(200, json_codec.dumps(document))
+            for (context, _), entity_future in batch:
+                if response.status_code != 200:
+                    entity_future.set_result(response)
+                elif context.entity_id in documents:
+                    entity_future.set_result(documents[context.entity_id])
+                else:
+                    entity_future.set_result(TheHiveResponse(
+                        404, json_codec.dumps({
+                            "type": "NotFoundError",
+                            "message": "{} {} not found".format(
+                                entity_type, context.entity_id)})))
+        except Exception as ex:  # pylint: disable=broad-except
+            for _, entity_future in batch:
+                if not entity_future.done():
+                    entity_future.set_exception(ex)
+
+    def _cache_entity(self, cache_key, response):
+        """
+        Store the response for a get request in the read cache, if the entity
+        was found, or in the not found cache, if it was not.
+
+        :param tuple cache_key: Key for the entity in the caches.
+        :param TheHiveResponse response: The response, or None if the
+            request failed.
+        """
+        if not response:
+            return
+        if response.status_code == 200 and self._read_cache:
+            self._read_cache.put(cache_key, response, len(response.content))
+        elif response.status_code == 404 and self._not_found_cache:
+            self._not_found_cache.put(cache_key, response,
+                                      len(response.content))
+
+    def _cached_entity(self, cache_key):
+        """
+        Get the cached response for a get request from the read cache or the
+        not found cache.
+
+        :param tuple cache_key: Key for the entity in the caches.
+        :return: The cached response, or None if the entity is not cached.
+        :rtype: TheHiveResponse
+        """
+        for cache in (self._read_cache, self._not_found_cache):
+            response = cache.get(cache_key) if cache else None
+            if response:
+                return response
+        return None
+
+    def _fetch_entity(self, context, entity_type, entity_id, path):
+        """
+        Get an entity from the caches or, if it is not cached, from TheHive
+        server, without delivering the response to the DXL fabric.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str entity_type: Type of the entity.
+        :param str entity_id: Id of the entity.
+        :param str path: URL subpath for the request to send to TheHive server.
+        :return: Future for the :class:`TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        cache_key = (entity_type, entity_id)
+        response = self._cached_entity(cache_key)
+        if response:
+            return completed_future(response)
+        if self._single_flight:
+            future = self._single_flight.call(
+                ("GET", path, None),
+                lambda: self._submit(context, "GET", path, expires=False,
+                                     background=True))
+        else:
+            future = self._submit(context, "GET", path, background=True)
+        future.add_done_callback(
+            lambda completed: self._cache_entity(
+                cache_key,
+                None if completed.exception() else completed.result()))
+        return future
+
+    def _invalidate_for_create(self, entity_type, case_id, response):
+        """
+        Invalidate any cached entries which may be made stale by a create
+        request.
+
+        :param str entity_type: Type of the entity created.
+        :param str case_id: Id of the case for which the entity was created,
+            if any.
+        :param TheHiveResponse response: The response, or None if the
+            request failed.
+        """
+        if self._not_found_cache and response and \
+                200 <= response.status_code < 300:
+            created = response.json()
+            # A multi-value create responds with a list of the entities
+            for entity in created if isinstance(created, list) else [created]:
+                if isinstance(entity, dict) and entity.get("id"):
+                    self._not_found_cache.invalidate((entity_type,
+                                                      entity["id"]))
+        if self._read_cache and case_id:
+            self._read_cache.invalidate(("case", case_id))
+        if self._search_cache and entity_type:
+            self._search_cache.invalidate_tag(entity_type)
+
+    def get(self, context, path):
+        """
+        Perform an HTTP GET request to TheHive server, delivering the response
         to the DXL fabric.
 
-        :param dxlclient.message.Request dxl_request: DXL request containing
-            parameters to forward along in a request to TheHive server.
+        If the read cache or not found cache is enabled and the context
+        identifies the type and id of the entity to get, a cached response
+        for the entity is delivered without making a request to TheHive
+        server. If batching is enabled, concurrent get requests for cases or
+        alerts are sent to TheHive server as a single search. If the context
+        requests a hash of the content, the hash is included in the response,
+        and if it matches the hash supplied by the caller, a "not modified"
+        response is delivered in place of the content.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
         :param str path: URL subpath for the request to send to TheHive server.
-        :param str body: Body to include in the HTTP request.
         """
-        if body is None:
-            body = MessageUtils.json_payload_to_dict(dxl_request)
+        cache_key = (context.entity_type, context.entity_id) \
+            if (self._read_cache or self._not_found_cache) and \
+            context.entity_type else None
+        if cache_key:
+            response = self._cached_entity(cache_key)
+            if response:
+                self._send_response(context, completed_future(response))
+                return
+        on_response = functools.partial(self._cache_entity, cache_key) \
+            if cache_key else None
+        if self._get_batcher and \
+                context.entity_type in self._BATCH_SEARCH_PATHS:
+            if self._admit(context):
+                self._deliver(
+                    context,
+                    self._get_batcher.submit(context.entity_type,
+                                            (context, path)),
+                    on_response)
+            return
+        self._request(context, "GET", path, read_only=True,
+                      on_response=on_response)
 
-        def _handle_request(request_url, body):
-            return requests.post(request_url,
-                                 headers=self._request_headers,
-                                 json=body,
-                                 auth=self._request_auth,
-                                 verify=self._verify_certificate)
+    def post(self, context, path, body=None):
+        """
+        Perform an HTTP POST request to TheHive server, delivering the response
+        to the DXL fabric. Any cached entries which may be made stale by the
+        request are invalidated.
 
-        self._request(dxl_request, path, _handle_request, body)
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str path: URL subpath for the request to send to TheHive server.
+        :param dict body: Body to include in the HTTP request. If not
+            specified, the decoded body of the DXL request is used.
+        """
+        self._request(context, "POST", path,
+                      context.body if body is None else body,
+                      on_response=functools.partial(
+                          self._invalidate_for_create, context.entity_type,
+                          context.case_id))
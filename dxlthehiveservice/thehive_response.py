@@ -0,0 +1,54 @@
+from __future__ import absolute_import
+from . import json_codec
+from .cache import canonical_hash
+
+
+class TheHiveResponse(object):
+    """
+    HTTP response received from TheHive server, independent of the engine
+    through which the request was sent.
+    """
+    def __init__(self, status_code, content, headers=None, wire_bytes=None):
+        """
+        Constructor parameters:
+
+        :param int status_code: HTTP status code of the response.
+        :param bytes content: Raw body of the response.
+        :param dict headers: HTTP headers of the response.
+        :param int wire_bytes: Number of bytes in the body of the response as
+            it was received, before it was decompressed, or None if unknown.
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.wire_bytes = wire_bytes
+        self._decoded = None
+        self._content_hash = None
+
+    def json(self):
+        """
+        Decode the body of the response as JSON. The decoded body is retained
+        so that a response which is delivered more than once, for example
+        from a cache, is only decoded once. The caller must not modify it.
+
+        :return: The decoded body.
+        """
+        if self._decoded is None:
+            self._decoded = json_codec.loads(self.content)
+        return self._decoded
+
+    def content_hash(self):
+        """
+        Compute a hash of the decoded body of the response. The hash does not
+        depend on the order of the keys or the whitespace in the body, so
+        an entity has the same hash whether it was got directly or was
+        extracted from the results of a batched search. The hash is retained
+        so that a response which is delivered more than once, for example
+        from a cache, is only hashed once.
+
+        :return: Hex digest of the hash.
+        :rtype: str
+        """
+        if self._content_hash is None:
+            self._content_hash = canonical_hash(self.json())
+        return self._content_hash
@@ -0,0 +1,164 @@
+from __future__ import absolute_import
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from .connection_pool import SessionPool
+from .fanout import completed_future, failed_future
+from .json_stream import STREAM_CHUNK_SIZE
+from .request_context import RequestExpiredError
+from .thehive_response import TheHiveResponse
+
+
+class ThreadedEngine(object):
+    """
+    Engine which sends each request to TheHive server through a pooled
+    session, from the thread which submits the request or, for the requests
+    of bulk DXL requests, from a pool of worker threads.
+    """
+
+    #: Name of the field under which the counters for the engine are
+    #: reported in the client stats.
+    STATS_FIELD = "connectionPool"
+
+    def __init__(self, request_headers, request_auth, verify_certificate,
+                 pool_size=10, max_per_host=0, idle_timeout=60,
+                 background_threads=8):
+        """
+        Constructor parameters:
+
+        :param dict request_headers: HTTP headers to include in each request.
+        :param tuple request_auth: Tuple of the username and password to use
+            for basic authentication, or None to not use basic
+            authentication.
+        :param verify_certificate: For a value of False, do not verify the
+            server certificate in requests. For a value of True, verify the
+            server certificate using the default trust store. For a string
+            value, read the associated file name contents and use as a
+            certificate trust store.
+        :param int pool_size: Maximum number of idle keep-alive connections
+            to retain for reuse by later requests.
+        :param int max_per_host: Maximum number of connections which may be
+            open to TheHive server concurrently. A value of 0 means no limit.
+        :param float idle_timeout: Number of seconds after which an idle
+            connection is closed. A value of 0 means idle connections are
+            never closed by the engine.
+        :param int background_threads: Number of threads from which requests
+            submitted in the background are sent.
+        """
+        self._request_headers = request_headers
+        self._request_auth = request_auth
+        self._verify_certificate = verify_certificate
+        self._session_pool = SessionPool(pool_size, max_per_host,
+                                         idle_timeout)
+        # Threads are only started by the executor as they are needed.
+        self._background_executor = ThreadPoolExecutor(
+            max_workers=max(background_threads, 1))
+
+    def _send(self, method, url, data, timeout, expires_at, collector,
+              headers):
+        """
+        Send a request to TheHive server through a pooled session, blocking
+        until the response has been received.
+
+        :param str method: HTTP method for the request.
+        :param str url: URL for the request.
+        :param bytes data: JSON encoded body to include in the request.
+        :param tuple timeout: Connect and read timeouts, in seconds, for the
+            request. The connect timeout also bounds the time spent waiting
+            for a pooled connection.
+        :param float expires_at: Time, in seconds since the epoch, after
+            which the request should not be sent, or None if the request
+            does not expire.
+        :param dxlthehiveservice.json_stream.HitCollector collector:
+            Collector to which the body of a successful response is fed as it
+            is received, or None to read the whole body.
+        :param dict headers: HTTP headers to include in the request in
+            addition to the headers included in each request.
+        :return: The response.
+        :rtype: dxlthehiveservice.thehive_response.TheHiveResponse
+        :raises dxlthehiveservice.request_context.RequestExpiredError: if the
+            request expired while waiting for a pooled connection.
+        """
+        if headers:
+            headers = dict(self._request_headers, **headers)
+        session = self._session_pool.acquire(timeout[0])
+        try:
+            if expires_at is not None and time.time() >= expires_at:
+                raise RequestExpiredError()
+            response = session.request(method,
+                                       url,
+                                       headers=headers or
+                                       self._request_headers,
+                                       data=data,
+                                       auth=self._request_auth,
+                                       verify=self._verify_certificate,
+                                       timeout=timeout,
+                                       stream=collector is not None)
+            if collector and 200 <= response.status_code <= 299:
+                try:
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        if collector.feed(chunk):
+                            break
+                finally:
+                    response.close()
+                return TheHiveResponse(response.status_code,
+                                       collector.finish(), response.headers)
+            content = response.content
+        finally:
+            self._session_pool.release(session)
+        return TheHiveResponse(response.status_code, content,
+                               response.headers, response.raw.tell())
+
+    def submit(self, method, url, data=None, timeout=(None, None),
+               expires_at=None, collector=None, headers=None,
+               background=False):
+        """
+        Submit a request to TheHive server. Unless the request is sent in the
+        background, it is sent from the calling thread and the returned
+        future has already completed.
+
+        :param str method: HTTP method for the request.
+        :param str url: URL for the request.
+        :param bytes data: JSON encoded body to include in the request.
+        :param tuple timeout: Connect and read timeouts, in seconds, for the
+            request.
+        :param float expires_at: Time, in seconds since the epoch, after
+            which the request should not be sent, or None if the request
+            does not expire.
+        :param dxlthehiveservice.json_stream.HitCollector collector:
+            Collector to which the body of a successful response is fed as it
+            is received, or None to read the whole body.
+        :param dict headers: HTTP headers to include in the request in
+            addition to the headers included in each request.
+        :param bool background: Whether the request should be sent from one
+            of the background threads rather than from the calling thread.
+        :return: Future for the
+            :class:`dxlthehiveservice.thehive_response.TheHiveResponse`.
+        :rtype: concurrent.futures.Future
+        """
+        if background:
+            return self._background_executor.submit(
+                self._send, method, url, data, timeout, expires_at, collector,
+                headers)
+        try:
+            return completed_future(self._send(method, url, data, timeout,
+                                               expires_at, collector,
+                                               headers))
+        except Exception as ex:  # pylint: disable=broad-except
+            return failed_future(ex)
+
+    @property
+    def stats(self):
+        """
+        Counters for the pool of sessions through which requests are sent.
+
+        :rtype: dict
+        """
+        return self._session_pool.stats
+
+    def close(self):
+        """
+        Close any connections held open to TheHive server.
+        """
+        self._background_executor.shutdown(wait=False)
+        self._session_pool.close()
@@ -0,0 +1,253 @@
+from __future__ import absolute_import
+import functools
+import logging
+import uuid
+
+from dxlclient.message import Response
+
+from . import compression
+from .compat import INTEGER_TYPES
+from .fanout import chain, completed_future, transform
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class TransferMixin(object):
+    """
+    Compression of the bodies of requests to TheHive server and of the
+    payloads of DXL responses, and the transfer of oversized DXL responses
+    in chunks, for :class:`dxlthehiveservice.thehive_client.TheHiveClient`.
+    """
+
+    #: Name of the field in the ``other_fields`` of a DXL response which
+    #: holds the id of the transfer through which the remaining chunks of an
+    #: oversized response can be requested.
+    TRANSFER_ID_FIELD = "transferId"
+    #: Name of the field in the ``other_fields`` of a DXL response which
+    #: holds the index of the chunk in the payload.
+    CHUNK_INDEX_FIELD = "chunkIndex"
+    #: Name of the field in the ``other_fields`` of a DXL response which
+    #: holds the number of chunks in the transfer.
+    CHUNK_COUNT_FIELD = "chunkCount"
+    #: Name of the field in the ``other_fields`` of a DXL response which
+    #: holds the total number of bytes in the transfer.
+    TOTAL_BYTES_FIELD = "totalBytes"
+    #: Name of the field in the ``other_fields`` of a DXL request which
+    #: holds the comma-separated names of the encodings in which the caller
+    #: accepts a compressed response payload, for example ``zstd,gzip``.
+    ACCEPT_ENCODING_FIELD = "acceptEncoding"
+    #: Name of the field in the ``other_fields`` of a DXL response which
+    #: holds the name of the encoding in which the payload is compressed.
+    #: The field is not set if the payload is not compressed.
+    ENCODING_FIELD = "encoding"
+
+    #: HTTP status with which TheHive server rejects a request whose body is
+    #: in an encoding which it does not support.
+    _UNSUPPORTED_MEDIA_TYPE = 415
+
+    def _submit_body(self, send, data):
+        """
+        Submit a request whose body is compressed with gzip if it is large
+        enough.
+
+        :param function send: Function which submits the request with a body
+            and additional headers, returning a future for the response.
+        :param bytes data: The uncompressed body of the request, or None.
+        :return: Future for the response to the request.
+        :rtype: concurrent.futures.Future
+        """
+        if not self._http_request_min_bytes or data is None or \
+                len(data) < self._http_request_min_bytes or \
+                self._compressed_requests_rejected.is_set():
+            return send(data)
+        compressed = compression.compress(data, compression.ENCODING_GZIP)
+        with self._stats_lock:
+            self._http_compression["requests"] += 1
+            self._http_compression["requestBytes"] += len(data)
+            self._http_compression["requestWireBytes"] += len(compressed)
+        return chain(
+            send(compressed, {"Content-Encoding": compression.ENCODING_GZIP}),
+            functools.partial(self._on_compressed_request_response, send,
+                              data))
+
+    def _may_reject_encoding(self, response):
+        """
+        Check whether the response to a request whose body was compressed
+        may reject the encoding of the body. A server which does not decode
+        the body typically fails to parse it, so any "bad request" response
+        may reject the encoding until TheHive server has accepted a
+        compressed body, after which it is taken to reject the content of
+        the body so that a request whose content is invalid is not sent
+        twice.
+
+        :param TheHiveResponse response: The response to the compressed
+            request.
+        :rtype: bool
+        """
+        if response.status_code == self._UNSUPPORTED_MEDIA_TYPE:
+            return True
+        return response.status_code == 400 and \
+            not self._compressed_requests_accepted.is_set()
+
+    def _on_compressed_request_response(self, send, data, response):
+        """
+        Handle the response to a request whose body was compressed. If TheHive
+        server may have rejected the encoding of the body, the request is sent
+        again uncompressed, and if the uncompressed request is accepted,
+        request compression is disabled. If the compressed request is
+        accepted, TheHive server is known to accept compressed bodies.
+
+        :param function send: Function which submits the request with a body
+            and additional headers, returning a future for the response.
+        :param bytes data: The uncompressed body of the request.
+        :param TheHiveResponse response: The response to the compressed
+            request.
+        :return: Future for the response to the request.
+        :rtype: concurrent.futures.Future
+        """
+        if 200 <= response.status_code <= 299:
+            self._compressed_requests_accepted.set()
+        if not self._may_reject_encoding(response):
+            return completed_future(response)
+
+        def _on_retry_response(retry_response):
+            if 200 <= retry_response.status_code <= 299:
+                # Responses to several compressed requests may arrive at
+                # once, so the check and set are made under the lock for the
+                # warning to only be logged once.
+                with self._stats_lock:
+                    disable = not self._compressed_requests_rejected.is_set()
+                    self._compressed_requests_rejected.set()
+                if disable:
+                    logger.warning("TheHive server rejected a compressed "
+                                   "request body with status %d, disabling "
+                                   "request compression",
+                                   response.status_code)
+            return retry_response
+
+        return transform(send(data), _on_retry_response)
+
+    def _record_response_bytes(self, future):
+        """
+        Record the size of the body of a compressed response from TheHive
+        server before and after it was decompressed.
+
+        :param concurrent.futures.Future future: Completed future for the
+            :class:`TheHiveResponse`.
+        """
+        if future.exception():
+            return
+        response = future.result()
+        if response.wire_bytes is None or \
+                not response.headers.get("Content-Encoding"):
+            return
+        with self._stats_lock:
+            self._http_compression["responses"] += 1
+            self._http_compression["responseBytes"] += len(response.content)
+            self._http_compression["responseWireBytes"] += \
+                response.wire_bytes
+
+    def _compress_payload(self, dxl_request, res):
+        """
+        Compress the payload of a DXL response if it is large enough and the
+        caller accepts one of the enabled encodings.
+
+        :param dxlclient.message.Request dxl_request: The DXL request.
+        :param dxlclient.message.Response res: The DXL response.
+        """
+        if not self._compression_min_bytes or \
+                len(res.payload) < self._compression_min_bytes:
+            return
+        accepted = (dxl_request.other_fields or {}).get(
+            self.ACCEPT_ENCODING_FIELD)
+        encoding = compression.choose_encoding(
+            accepted, self._compression_encodings) if accepted else None
+        if not encoding:
+            return
+        payload = res.payload
+        compressed = compression.compress(payload, encoding)
+        if len(compressed) >= len(payload):
+            # The payload does not compress, so sending it as-is saves the
+            # caller from having to decompress it.
+            return
+        with self._stats_lock:
+            self._compression["responses"] += 1
+            self._compression["bytesIn"] += len(payload)
+            self._compression["bytesOut"] += len(compressed)
+        res.payload = compressed
+        res.other_fields[self.ENCODING_FIELD] = encoding
+
+    def _set_chunk(self, res, transfer_id, payload, index, other_fields):
+        """
+        Set a chunk of an oversized payload as the payload of a DXL response.
+
+        :param dxlclient.message.Response res: The DXL response.
+        :param str transfer_id: Id of the transfer.
+        :param bytes payload: The oversized payload.
+        :param int index: Index of the chunk.
+        :param dict other_fields: The ``other_fields`` of the original
+            response, for example the encoding of a compressed payload,
+            which are set on each chunk.
+        """
+        chunk_size = self._max_message_bytes
+        res.payload = payload[index * chunk_size:(index + 1) * chunk_size]
+        res.other_fields = dict(other_fields)
+        res.other_fields.update({
+            self.TRANSFER_ID_FIELD: transfer_id,
+            self.CHUNK_INDEX_FIELD: str(index),
+            self.CHUNK_COUNT_FIELD: str(
+                (len(payload) + chunk_size - 1) // chunk_size),
+            self.TOTAL_BYTES_FIELD: str(len(payload))})
+
+    def _start_transfer(self, res):
+        """
+        Hold the oversized payload of a DXL response so that its chunks can
+        be requested with :meth:`get_chunk`, replacing the payload of the
+        response with the first chunk. A compressed payload is split after
+        it has been compressed, so the chunks must be joined before the
+        payload is decompressed.
+
+        :param dxlclient.message.Response res: The DXL response.
+        """
+        payload = res.payload
+        other_fields = dict(res.other_fields)
+        transfer_id = uuid.uuid4().hex
+        if not self._transfers.put(transfer_id, (payload, other_fields),
+                                   len(payload)):
+            logger.warning("Response of %d bytes is too large to be split "
+                           "into chunks, sending it whole", len(payload))
+            return
+        self._set_chunk(res, transfer_id, payload, 0, other_fields)
+
+    def get_chunk(self, context, transfer_id, index):
+        """
+        Deliver a chunk of an oversized response to the DXL fabric. Once the
+        last chunk of a transfer has been delivered, the transfer is
+        discarded.
+
+        :param dxlthehiveservice.request_context.RequestContext context:
+            Context for the DXL request.
+        :param str transfer_id: Id of the transfer.
+        :param int index: Index of the chunk.
+        :raises ValueError: if no unexpired transfer exists for the id or the
+            transfer has no chunk with the index.
+        """
+        transfer = self._transfers.get(transfer_id) \
+            if self._transfers else None
+        if transfer is None:
+            raise ValueError("Unknown or expired transfer: {}".format(
+                transfer_id))
+        payload, other_fields = transfer
+        chunk_count = (len(payload) + self._max_message_bytes - 1) // \
+            self._max_message_bytes
+        if not isinstance(index, INTEGER_TYPES) or isinstance(index, bool) or \
+                not 0 <= index < chunk_count:
+            raise ValueError("Chunk index must be an integer from 0 to "
+                             "{}".format(chunk_count - 1))
+        res = Response(context.request)
+        self._set_chunk(res, transfer_id, payload, index, other_fields)
+        if index == chunk_count - 1:
+            self._transfers.invalidate(transfer_id)
+        self._dxl_client.send_response(res)
+        context.mark("responded")
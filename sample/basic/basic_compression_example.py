@@ -0,0 +1,86 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import zlib
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# The "zstd" encoding is only accepted if the "zstandard" package is installed
+try:
+    import zstandard
+    ACCEPT_ENCODING = "zstd,gzip"
+except ImportError:
+    zstandard = None
+    ACCEPT_ENCODING = "gzip"
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the search alert request
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/search"
+    req = Request(request_topic)
+
+    # Set the payload for the search alert request. The request matches the
+    # ten most recent alerts created by running the
+    # 'basic_create_alert_example.py' example.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "query": {"_string": "title:(OpenDXL AND Alert)"},
+            "range": "0-10",
+            "sort": ["-createdAt"]
+        })
+
+    # Ask for the response payload to be compressed. The service compresses
+    # the payload, in the first of the encodings which it supports, if the
+    # payload is larger than the "minBytes" setting in the [Compression]
+    # section of the service configuration.
+    req.other_fields = {"acceptEncoding": ACCEPT_ENCODING}
+
+    # Send the search alert request
+    search_alert_response = client.sync_request(req, timeout=30)
+
+    if search_alert_response.message_type is Message.MESSAGE_TYPE_ERROR:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, search_alert_response.error_message,
+            search_alert_response.error_code))
+        exit(1)
+
+    # The "encoding" field in the "other_fields" of the response is only set
+    # if the payload was compressed. The payload must be decompressed before
+    # it is decoded.
+    encoding = search_alert_response.other_fields.get("encoding")
+    print("Encoding of the response: {0}".format(encoding or "none"))
+    if encoding == "gzip":
+        search_alert_response.payload = zlib.decompress(
+            search_alert_response.payload, 16 + zlib.MAX_WBITS)
+    elif encoding == "zstd":
+        search_alert_response.payload = zstandard.ZstdDecompressor() \
+            .decompress(search_alert_response.payload)
+
+    # Display results for the search alert request
+    search_alert_response_dict = MessageUtils.json_payload_to_dict(
+        search_alert_response)
+    print("Response for the search alert request: '{0}'".format(
+        MessageUtils.dict_to_json(search_alert_response_dict,
+                                  pretty_print=True)))
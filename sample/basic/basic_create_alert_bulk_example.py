@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import uuid
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the bulk new alert request
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/create/bulk"
+    req = Request(request_topic)
+
+    # Generate unique ids for the alert sourceRefs. A unique combination of
+    # type, source, and sourceRef needs to be supplied for each new alert
+    # to be created.
+    alerts = [
+        {
+            "title": "OpenDXL Alert Example",
+            "description": "Created by the OpenDXL Bulk Alert Example",
+            "severity": 3,
+            "source": "OpenDXL",
+            "sourceRef": uuid.uuid4().hex[0:16],
+            "type": "external"
+        } for _ in range(3)
+    ]
+
+    # Remove the title from the last alert to show how an alert which cannot
+    # be created is reported.
+    del alerts[-1]["title"]
+
+    # Set the payload for the bulk new alert request. The alerts are created
+    # on TheHive server concurrently.
+    MessageUtils.dict_to_json_payload(req, {"alerts": alerts})
+
+    # Send the bulk new alert request
+    create_alert_bulk_response = client.sync_request(req, timeout=30)
+
+    if create_alert_bulk_response.message_type is not \
+            Message.MESSAGE_TYPE_ERROR:
+        # Display results for the bulk new alert request. The response holds
+        # a result for each alert, identified by the index of the alert in
+        # the request, with the HTTP status for the alert and either the new
+        # alert or an error message.
+        create_alert_bulk_response_dict = MessageUtils.json_payload_to_dict(
+            create_alert_bulk_response)
+        print("Response for the bulk create alert request: '{0}'".format(
+            MessageUtils.dict_to_json(create_alert_bulk_response_dict,
+                                      pretty_print=True)))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, create_alert_bulk_response.error_message,
+            create_alert_bulk_response.error_code))
@@ -0,0 +1,92 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the new full case request
+    request_topic = "/opendxl-thehive/service/thehive-api/case/create/full"
+    req = Request(request_topic)
+
+    # Set the payload for the new full case request. The tasks and
+    # observables are created for the case once the case has been created.
+    # The last observable is missing its dataType to show how a child which
+    # cannot be created is reported.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "title": "OpenDXL Case Full Example",
+            "description": "Created by the OpenDXL Case Full Example",
+            "severity": 3,
+            "tasks": [
+                {
+                    "title": "OpenDXL Case Full Example Task {0}".format(index),
+                    "description": "Created by the OpenDXL Case Full Example",
+                    "status": "InProgress"
+                } for index in range(1, 3)
+            ],
+            "observables": [
+                {
+                    "data": "192.168.1.1",
+                    "message": "Created by the OpenDXL Case Full Example",
+                    "dataType": "ip"
+                },
+                {
+                    "data": "192.168.1.2",
+                    "message": "Created by the OpenDXL Case Full Example",
+                    "dataType": "ip"
+                },
+                {
+                    "data": "OpenDXL",
+                    "message": "Created by the OpenDXL Case Full Example"
+                }
+            ]
+        })
+
+    # Send the new full case request
+    create_case_full_response = client.sync_request(req, timeout=30)
+
+    if create_case_full_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        # Display results for the new full case request. The response holds
+        # the new case, along with a result for each task and observable.
+        create_case_full_response_dict = MessageUtils.json_payload_to_dict(
+            create_case_full_response)
+        print("Response for the create full case request: '{0}'".format(
+            MessageUtils.dict_to_json(create_case_full_response_dict,
+                                      pretty_print=True)))
+
+        # The "failed" object identifies the children which could not be
+        # created, so that they can be created again for the existing case,
+        # for example with the case/observable/create/bulk topic.
+        if "failed" in create_case_full_response_dict:
+            failed = create_case_full_response_dict["failed"]
+            print("Indexes of the observables which could not be created "
+                  "for case '{0}': {1}".format(failed["parentId"],
+                                               failed.get("observables", [])))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, create_case_full_response.error_message,
+            create_case_full_response.error_code))
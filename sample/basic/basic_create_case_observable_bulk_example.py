@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the new case request
+    request_topic = "/opendxl-thehive/service/thehive-api/case/create"
+    req = Request(request_topic)
+
+    # Set the payload for the new case request
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "title": "OpenDXL Case Observable Bulk Example",
+            "description": "Created by the OpenDXL Case Observable Bulk Example",
+            "severity": 3
+        })
+
+    # Send the new case request
+    create_case_response = client.sync_request(req, timeout=30)
+
+    if create_case_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        # Display results for the new case request
+        create_case_response_dict = MessageUtils.json_payload_to_dict(
+            create_case_response)
+        print("Response for the create case request: '{0}'".format(
+            MessageUtils.dict_to_json(create_case_response_dict,
+                                      pretty_print=True)))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, create_case_response.error_message,
+            create_case_response.error_code))
+        exit(1)
+
+    # Create the bulk new case observable request
+    request_topic = \
+        "/opendxl-thehive/service/thehive-api/case/observable/create/bulk"
+    req = Request(request_topic)
+
+    # Set the payload for the bulk new case observable request. The ip
+    # observables differ only in their data, so they are sent to TheHive
+    # server in a single request. The domain observable is sent in a request
+    # of its own.
+    observables = [
+        {
+            "data": data,
+            "message": "Created by the OpenDXL Case Observable Bulk Example",
+            "dataType": "ip"
+        } for data in ("192.168.1.1", "192.168.1.2", "192.168.1.3")
+    ]
+    observables.append({
+        "data": "opendxl.com",
+        "message": "Created by the OpenDXL Case Observable Bulk Example",
+        "dataType": "domain"
+    })
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "caseId": create_case_response_dict["id"],
+            "observables": observables
+        })
+
+    # Send the bulk new case observable request
+    create_case_observable_bulk_response = client.sync_request(req, timeout=30)
+
+    if create_case_observable_bulk_response.message_type is not \
+            Message.MESSAGE_TYPE_ERROR:
+        # Display results for the bulk new case observable request. The
+        # response holds a result for each observable, identified by the
+        # index of the observable in the request, with the HTTP status for the
+        # observable and either the new observable or an error message.
+        create_case_observable_bulk_response_dict = \
+            MessageUtils.json_payload_to_dict(
+                create_case_observable_bulk_response)
+        print("Response for the bulk create case observable request: "
+              "'{0}'".format(MessageUtils.dict_to_json(
+                  create_case_observable_bulk_response_dict,
+                  pretty_print=True)))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, create_case_observable_bulk_response.error_message,
+            create_case_observable_bulk_response.error_code))
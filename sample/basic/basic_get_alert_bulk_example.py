@@ -0,0 +1,90 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the search alert request
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/search"
+    req = Request(request_topic)
+
+    # Set the payload for the search alert request. The request matches the
+    # three most recent alerts created by running the
+    # 'basic_create_alert_example.py' example.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "query": {"_string": "title:(OpenDXL AND Alert)"},
+            "range": "0-3",
+            "sort": ["-createdAt"]
+        })
+
+    # Send the search alert request
+    search_alert_response = client.sync_request(req, timeout=30)
+
+    if search_alert_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        search_alert_response_dict = MessageUtils.json_payload_to_dict(
+            search_alert_response)
+        alert_ids = [alert["id"] for alert in search_alert_response_dict]
+        print("Ids of the alerts found by the search alert request: "
+              "{0}".format(alert_ids))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, search_alert_response.error_message,
+            search_alert_response.error_code))
+        exit(1)
+
+    # Create the bulk get alert request
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/get/bulk"
+    req = Request(request_topic)
+
+    # Set the payload for the bulk get alert request. The alerts are requested
+    # from TheHive server concurrently. An id for an alert which does not
+    # exist is included to show how an alert which cannot be retrieved is
+    # reported.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "ids": alert_ids + ["opendxl-missing-alert"]
+        })
+
+    # Send the bulk get alert request
+    get_alert_bulk_response = client.sync_request(req, timeout=30)
+
+    if get_alert_bulk_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        # Display results for the bulk get alert request. The response holds
+        # a result for each id, in the same order as the ids in the request,
+        # with the HTTP status for the alert and either the alert or an
+        # error message.
+        get_alert_bulk_response_dict = MessageUtils.json_payload_to_dict(
+            get_alert_bulk_response)
+        print("Response for the bulk get alert request: '{0}'".format(
+            MessageUtils.dict_to_json(get_alert_bulk_response_dict,
+                                      pretty_print=True)))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, get_alert_bulk_response.error_message,
+            get_alert_bulk_response.error_code))
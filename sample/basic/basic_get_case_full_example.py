@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the new full case request
+    request_topic = "/opendxl-thehive/service/thehive-api/case/create/full"
+    req = Request(request_topic)
+
+    # Set the payload for the new full case request
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "title": "OpenDXL Case Get Full Example",
+            "description": "Created by the OpenDXL Case Get Full Example",
+            "severity": 3,
+            "tasks": [
+                {
+                    "title": "OpenDXL Case Get Full Example Task",
+                    "description": "Created by the OpenDXL Case Get Full "
+                                   "Example",
+                    "status": "InProgress"
+                }
+            ],
+            "observables": [
+                {
+                    "data": "OpenDXL",
+                    "message": "Created by the OpenDXL Case Get Full Example",
+                    "dataType": "user-agent"
+                }
+            ]
+        })
+
+    # Send the new full case request
+    create_case_full_response = client.sync_request(req, timeout=30)
+
+    if create_case_full_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        create_case_full_response_dict = MessageUtils.json_payload_to_dict(
+            create_case_full_response)
+        case_id = create_case_full_response_dict["case"]["id"]
+        print("Id of the case created by the create full case request: "
+              "'{0}'".format(case_id))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, create_case_full_response.error_message,
+            create_case_full_response.error_code))
+        exit(1)
+
+    # Create the get full case request
+    request_topic = "/opendxl-thehive/service/thehive-api/case/get/full"
+    req = Request(request_topic)
+
+    # Set the payload for the get full case request. The case is returned
+    # along with its tasks and at most ten of its observables.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "id": case_id,
+            "observableLimit": 10
+        })
+
+    # Send the get full case request
+    get_case_full_response = client.sync_request(req, timeout=30)
+
+    if get_case_full_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        # Display results for the get full case request
+        get_case_full_response_dict = MessageUtils.json_payload_to_dict(
+            get_case_full_response)
+        print("Response for the get full case request: '{0}'".format(
+            MessageUtils.dict_to_json(get_case_full_response_dict,
+                                      pretty_print=True)))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, get_case_full_response.error_message,
+            get_case_full_response.error_code))
@@ -0,0 +1,94 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the search alert request
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/search"
+    req = Request(request_topic)
+
+    # Set the payload for the search alert request. The request matches all
+    # of the alerts created by running the 'basic_create_alert_example.py'
+    # example. If the "maxMessageBytes" setting in the [Chunking] section of
+    # the service configuration is set, which it is not by default, and the
+    # response is larger than that setting, the response only holds the
+    # first chunk of the results.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "query": {"_string": "title:(OpenDXL AND Alert)"},
+            "range": "all",
+            "sort": ["-createdAt"]
+        })
+
+    # Send the search alert request
+    search_alert_response = client.sync_request(req, timeout=30)
+
+    if search_alert_response.message_type is Message.MESSAGE_TYPE_ERROR:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, search_alert_response.error_message,
+            search_alert_response.error_code))
+        exit(1)
+
+    # The payload of the response holds the first chunk. Each of the
+    # remaining chunks is requested on the chunk/get topic with the
+    # "transferId" from the "other_fields" of the response and the "index" of
+    # the chunk. The payload is only valid JSON once all of the chunks have
+    # been joined together.
+    payload = search_alert_response.payload
+    other_fields = search_alert_response.other_fields
+    chunk_count = int(other_fields.get("chunkCount", 1))
+    request_topic = "/opendxl-thehive/service/thehive-api/chunk/get"
+    for index in range(1, chunk_count):
+        req = Request(request_topic)
+        MessageUtils.dict_to_json_payload(
+            req,
+            {
+                "transferId": other_fields["transferId"],
+                "index": index
+            })
+        get_chunk_response = client.sync_request(req, timeout=30)
+        if get_chunk_response.message_type is Message.MESSAGE_TYPE_ERROR:
+            print("Error invoking service with topic '{0}': {1} ({2})".format(
+                request_topic, get_chunk_response.error_message,
+                get_chunk_response.error_code))
+            exit(1)
+        payload += get_chunk_response.payload
+
+    if len(payload) != int(other_fields.get("totalBytes", len(payload))):
+        print("Error reassembling the response: expected {0} bytes, got "
+              "{1}".format(other_fields["totalBytes"], len(payload)))
+        exit(1)
+
+    # Display results for the search alert request
+    search_alert_response.payload = payload
+    alerts = MessageUtils.json_payload_to_dict(search_alert_response)
+    print("Number of chunks in the response: {0}".format(chunk_count))
+    print("Number of alerts in the response: {0}".format(len(alerts)))
+    if alerts:
+        print("Most recent alert in the response: '{0}'".format(
+            MessageUtils.dict_to_json(alerts[0], pretty_print=True)))
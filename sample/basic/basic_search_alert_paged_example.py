@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/search"
+
+    # Set the payload for the first page of the paged search alert request.
+    # The request matches alerts created by running the
+    # 'basic_create_alert_example.py' example, two at a time.
+    payload = {
+        "query": {"_string": "title:(OpenDXL AND Alert)"},
+        "sort": ["-createdAt"],
+        "pageSize": 2
+    }
+
+    page = 1
+    while payload:
+        # Create the paged search alert request
+        req = Request(request_topic)
+        MessageUtils.dict_to_json_payload(req, payload)
+
+        # Send the paged search alert request
+        search_alert_response = client.sync_request(req, timeout=30)
+
+        if search_alert_response.message_type is not \
+                Message.MESSAGE_TYPE_ERROR:
+            # Display results for the page of the paged search alert request
+            search_alert_response_dict = MessageUtils.json_payload_to_dict(
+                search_alert_response)
+            print("Response for page {0} of the paged search alert request: "
+                  "'{1}'".format(page, MessageUtils.dict_to_json(
+                      search_alert_response_dict, pretty_print=True)))
+        else:
+            print("Error invoking service with topic '{0}': {1} ({2})".format(
+                request_topic, search_alert_response.error_message,
+                search_alert_response.error_code))
+            exit(1)
+
+        # The next page is requested with only the cursor from the response.
+        # The cursor is null once the last page has been returned.
+        cursor = search_alert_response_dict["cursor"]
+        payload = {"cursor": cursor} if cursor else None
+        page += 1
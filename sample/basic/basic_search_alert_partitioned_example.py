@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+import time
+
+from dxlclient.client_config import DxlClientConfig
+from dxlclient.client import DxlClient
+from dxlclient.message import Message, Request
+from dxlbootstrap.util import MessageUtils
+
+# Import common logging and configuration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+from common import *
+
+# Configure local logger
+logging.getLogger().setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Create DXL configuration from file
+config = DxlClientConfig.create_dxl_config_from_file(CONFIG_FILE)
+
+# Create the client
+with DxlClient(config) as client:
+
+    # Connect to the fabric
+    client.connect()
+
+    logger.info("Connected to DXL fabric.")
+
+    # Create the partitioned search alert request
+    request_topic = "/opendxl-thehive/service/thehive-api/alert/search"
+    req = Request(request_topic)
+
+    # Determine the range of creation times, in milliseconds since the
+    # epoch, of the alerts created in the last 28 days
+    now = int(time.time() * 1000)
+    four_weeks_ago = now - 28 * 24 * 60 * 60 * 1000
+
+    # Set the payload for the partitioned search alert request. The request
+    # matches the five most recent alerts created by running the
+    # 'basic_create_alert_example.py' example in the last 28 days. The search
+    # is split into four partitions, one for each week, which are searched for
+    # concurrently.
+    MessageUtils.dict_to_json_payload(
+        req,
+        {
+            "query": {"_string": "title:(OpenDXL AND Alert)"},
+            "range": "0-5",
+            "sort": ["-createdAt"],
+            "partitions": {
+                "field": "createdAt",
+                "from": four_weeks_ago,
+                "to": now + 1,
+                "count": 4
+            }
+        })
+
+    # Send the partitioned search alert request
+    search_alert_response = client.sync_request(req, timeout=30)
+
+    if search_alert_response.message_type is not Message.MESSAGE_TYPE_ERROR:
+        # Display results for the partitioned search alert request. The
+        # results of the partitions are merged in the order given by the sort
+        # and limited to the range of the request.
+        search_alert_response_dict = MessageUtils.json_payload_to_dict(
+            search_alert_response)
+        print("Response for the partitioned search alert request: "
+              "'{0}'".format(MessageUtils.dict_to_json(
+                  search_alert_response_dict, pretty_print=True)))
+    else:
+        print("Error invoking service with topic '{0}': {1} ({2})".format(
+            request_topic, search_alert_response.error_message,
+            search_alert_response.error_code))
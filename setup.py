@@ -6,6 +6,7 @@ import os
 import distutils.command.sdist
 import distutils.log
 import subprocess
+import sys
 from setuptools import Command, setup
 import setuptools.command.sdist
 
@@ -31,8 +32,12 @@ class LintCommand(Command):
     def run(self):
         self.announce("Running pylint for library source files and tests",
                       level=distutils.log.INFO)
+        # The async engine module uses syntax which is only valid on
+        # Python 3.5+, so it cannot be linted by an older interpreter.
+        ignore_args = ["--ignore", "async_engine.py"] \
+            if sys.version_info < (3, 5) else []
         subprocess.check_call(["pylint", "dxlthehiveservice", "tests"] +
-                              glob.glob("*.py"))
+                              glob.glob("*.py") + ignore_args)
         self.announce("Running pylint for samples", level=distutils.log.INFO)
         subprocess.check_call(["pylint"] + glob.glob("sample/*.py") +
                               glob.glob("sample/**/*.py") +
@@ -69,12 +74,15 @@ setup(
     install_requires=[
         "requests",
         "dxlbootstrap>=0.2.0",
-        "dxlclient>=4.1.0.184"
+        "dxlclient>=4.1.0.184",
+        "futures; python_version < '3'"
     ],
 
     tests_require=TEST_REQUIREMENTS,
 
     extras_require={
+        "async": ["aiohttp; python_version >= '3.5'"],
+        "zstd": ["zstandard"],
         "dev": DEV_REQUIREMENTS,
         "test": TEST_REQUIREMENTS
     },
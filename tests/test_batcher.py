@@ -0,0 +1,86 @@
+from __future__ import absolute_import
+import threading
+import time
+import unittest
+
+from dxlthehiveservice.batcher import MicroBatcher
+
+
+class MicroBatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+
+    def _flush(self, batch_key, batch):
+        self.batches.append((batch_key, [item for item, _ in batch]))
+        for item, future in batch:
+            future.set_result(item * 10)
+
+    def _submit_concurrently(self, batcher, items, batch_key="key"):
+        futures = {}
+
+        def _submit(item):
+            futures[item] = batcher.submit(batch_key, item)
+
+        threads = []
+        for item in items:
+            thread = threading.Thread(target=_submit, args=(item,))
+            thread.start()
+            threads.append(thread)
+            # Give the first thread time to open the batch.
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        return futures
+
+    def test_items_submitted_within_wait_are_batched(self):
+        batcher = MicroBatcher(self._flush, 1, 10)
+        start = time.time()
+        futures = self._submit_concurrently(batcher, [1, 2, 3])
+        self.assertEqual([("key", [1, 2, 3])], self.batches)
+        self.assertEqual({1: 10, 2: 20, 3: 30},
+                         {item: future.result(0)
+                          for item, future in futures.items()})
+        self.assertGreaterEqual(time.time() - start, 1)
+        self.assertEqual({"batches": 1, "items": 3}, batcher.stats)
+
+    def test_full_batch_is_flushed_without_waiting(self):
+        batcher = MicroBatcher(self._flush, 10, 3)
+        start = time.time()
+        self._submit_concurrently(batcher, [1, 2, 3])
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual([("key", [1, 2, 3])], self.batches)
+
+    def test_batch_is_flushed_after_wait(self):
+        batcher = MicroBatcher(self._flush, 0.05, 10)
+        self.assertEqual(10, batcher.submit("key", 1).result(0))
+        self.assertEqual(20, batcher.submit("key", 2).result(0))
+        self.assertEqual([("key", [1]), ("key", [2])], self.batches)
+
+    def test_keys_are_batched_separately(self):
+        batcher = MicroBatcher(self._flush, 0.2, 10)
+        threads = [threading.Thread(target=batcher.submit, args=(key, 1))
+                   for key in ("case", "alert")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([("alert", [1]), ("case", [1])],
+                         sorted(self.batches))
+
+    def test_max_size_of_one_disables_batching(self):
+        batcher = MicroBatcher(self._flush, 10, 1)
+        start = time.time()
+        batcher.submit("key", 1)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual([("key", [1])], self.batches)
+
+    def test_flush_exception_fails_futures(self):
+        def _flush(_batch_key, batch):
+            batch[0][1].set_result("done")
+            raise ValueError("failed")
+
+        batcher = MicroBatcher(_flush, 0.2, 2)
+        futures = self._submit_concurrently(batcher, [1, 2])
+        self.assertEqual("done", futures[1].result(0))
+        with self.assertRaises(ValueError):
+            futures[2].result(0)
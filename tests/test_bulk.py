@@ -0,0 +1,183 @@
+from __future__ import absolute_import
+import json
+import unittest
+
+from dxlthehiveservice.bulk import BulkMixin, ChildEntities, ChildSearch
+from dxlthehiveservice.fanout import completed_future
+from dxlthehiveservice.thehive_client import TheHiveClient
+from dxlthehiveservice.thehive_response import TheHiveResponse
+
+
+def _client():
+    # The combining methods need no connection to the DXL fabric or to
+    # TheHive server, so the client is not initialized.
+    return TheHiveClient.__new__(TheHiveClient)
+
+
+def _response(status_code, body):
+    return completed_future(TheHiveResponse(status_code, body))
+
+
+def _observable(data, data_type="ip", message="Sample observable"):
+    return {"data": data, "dataType": data_type, "message": message}
+
+
+class ChunkMultiValueBodiesTest(unittest.TestCase):
+    def test_bodies_which_differ_only_in_value_are_grouped(self):
+        bodies = [_observable("10.0.0.1"), _observable("10.0.0.2"),
+                  _observable("example.com", "domain"),
+                  _observable("10.0.0.3")]
+        self.assertEqual(
+            [[0, 1, 3], [2]],
+            BulkMixin._chunk_multi_value_bodies(bodies, "data", 100))
+
+    def test_chunks_are_bounded_by_size(self):
+        bodies = [_observable("10.0.0.{}".format(index))
+                  for index in range(5)]
+        self.assertEqual(
+            [[0, 1], [2, 3], [4]],
+            BulkMixin._chunk_multi_value_bodies(bodies, "data", 2))
+
+    def test_chunk_size_of_one_disables_grouping(self):
+        bodies = [_observable("10.0.0.1"), _observable("10.0.0.2")]
+        self.assertEqual(
+            [[0], [1]],
+            BulkMixin._chunk_multi_value_bodies(bodies, "data", 1))
+
+    def test_bodies_without_single_string_value_are_not_grouped(self):
+        bodies = [_observable("10.0.0.1"),
+                  _observable(["10.0.0.2", "10.0.0.3"]),
+                  {"dataType": "ip", "message": "Sample observable"},
+                  "not an object",
+                  _observable("10.0.0.4")]
+        self.assertEqual(
+            [[0, 4], [1], [2], [3]],
+            BulkMixin._chunk_multi_value_bodies(bodies, "data", 100))
+
+
+class SplitMultiValueResponseTest(unittest.TestCase):
+    def setUp(self):
+        self.bulk = BulkMixin()
+        self.bodies = [_observable("10.0.0.1"), _observable("10.0.0.2"),
+                       _observable("10.0.0.3")]
+
+    def _split(self, status_code, items):
+        return self.bulk._split_multi_value_response(
+            self.bodies, "data",
+            TheHiveResponse(status_code, json.dumps(items).encode("utf8")))
+
+    def test_created_entities_are_matched_by_value(self):
+        responses = self._split(201, [
+            {"id": "c", "data": "10.0.0.3"},
+            {"id": "a", "data": "10.0.0.1"},
+            {"id": "b", "data": "10.0.0.2"}
+        ])
+        self.assertEqual([201] * 3,
+                         [response.status_code for response in responses])
+        self.assertEqual(["a", "b", "c"],
+                         [response.json()["id"] for response in responses])
+
+    def test_multi_status_items_are_demultiplexed(self):
+        responses = self._split(207, [
+            {"id": "a", "data": "10.0.0.1"},
+            {"type": "ConflictError", "message": "Artifact already exists",
+             "object": _observable("10.0.0.2")},
+            {"id": "c", "data": "10.0.0.3"}
+        ])
+        self.assertEqual([201, 400, 201],
+                         [response.status_code for response in responses])
+        self.assertEqual("Artifact already exists",
+                         responses[1].json()["message"])
+
+    def test_item_missing_from_response_fails(self):
+        responses = self._split(201, [{"id": "a", "data": "10.0.0.1"}])
+        self.assertEqual([201, 500, 500],
+                         [response.status_code for response in responses])
+
+    def test_failed_request_fails_every_body(self):
+        response = TheHiveResponse(404, b'{"message": "Case not found"}')
+        responses = self.bulk._split_multi_value_response(
+            self.bodies, "data", response)
+        self.assertEqual([response] * 3, responses)
+
+
+class CombineBulkResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _client()
+
+    def test_non_json_error_does_not_fail_other_items(self):
+        response = self.client._combine_bulk_results(
+            None, "index", range(3), [
+                _response(201, b'{"id": "a"}'),
+                _response(502, b"<html>Bad Gateway</html>"),
+                _response(400, b'{"message": "Invalid alert"}')
+            ])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            [{"index": 0, "status": 201, "result": {"id": "a"}},
+             {"index": 1, "status": 502, "error": "Error handling request"},
+             {"index": 2, "status": 400, "error": "Invalid alert"}],
+            response.json()["results"])
+
+    def test_non_json_error_for_one_id_does_not_fail_bulk_get(self):
+        response = self.client._combine_bulk_results(
+            None, "id", ["a", "b"], [
+                _response(200, b'{"id": "a"}'),
+                _response(500, b"Internal Server Error")
+            ])
+        self.assertEqual(
+            [{"id": "a", "status": 200, "result": {"id": "a"}},
+             {"id": "b", "status": 500, "error": "Error handling request"}],
+            response.json()["results"])
+
+
+class CreateChildrenTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _client()
+
+    def test_non_json_error_for_one_child_is_reported_as_failed(self):
+        child_responses = [_response(201, b'{"id": "t1"}'),
+                           _response(502, b"<html>Bad Gateway</html>")]
+        self.client._start_creates = \
+            lambda context, entity_type, case_id, path, bodies: \
+            child_responses
+        children = [ChildEntities("tasks", "case_task", "/api/case/{}/task",
+                                  [{"title": "One"}, {"title": "Two"}],
+                                  None)]
+        response = self.client._create_children(
+            None, "case", children,
+            TheHiveResponse(201, b'{"id": "c1"}')).result()
+        self.assertEqual(201, response.status_code)
+        self.assertEqual({
+            "case": {"id": "c1"},
+            "tasks": [
+                {"index": 0, "status": 201, "result": {"id": "t1"}},
+                {"index": 1, "status": 502,
+                 "error": "Error handling request"}],
+            "failed": {"parentId": "c1", "tasks": [1]}
+        }, response.json())
+
+
+class CombineChildrenTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _client()
+
+    def test_non_json_error_for_one_search_is_reported_under_errors(self):
+        children = [ChildSearch("tasks", "case_task", "/api/case/task/_search",
+                                {}),
+                    ChildSearch("observables", "case_observable",
+                                "/api/case/artifact/_search", {})]
+        response = self.client._combine_children(
+            None, "case", children, [
+                _response(200, b'{"id": "c1"}'),
+                _response(200, b'[{"id": "t1"}]'),
+                _response(503, b"Service Unavailable")
+            ])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({
+            "case": {"id": "c1"},
+            "tasks": [{"id": "t1"}],
+            "observables": None,
+            "errors": {"observables": {"status": 503,
+                                       "error": "Error handling request"}}
+        }, response.json())
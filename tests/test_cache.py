@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+import unittest
+
+from mock import patch
+
+from dxlthehiveservice.cache import TtlCache, canonical_hash
+
+_ENTRY_SIZE = 100 + TtlCache.ENTRY_OVERHEAD
+
+
+class TtlCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("dxlthehiveservice.cache.time.time",
+                        lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_and_put(self):
+        cache = TtlCache(10 * _ENTRY_SIZE, 10)
+        self.assertIsNone(cache.get("a"))
+        self.assertTrue(cache.put("a", "value", 100))
+        self.assertEqual("value", cache.get("a"))
+        self.assertTrue(cache.put("a", "replaced", 100))
+        self.assertEqual("replaced", cache.get("a"))
+        self.assertEqual({"hits": 2, "misses": 1, "evictions": 0,
+                          "expirations": 0, "invalidations": 0,
+                          "entries": 1, "bytes": _ENTRY_SIZE}, cache.stats)
+
+    def test_entry_expires_after_ttl(self):
+        cache = TtlCache(10 * _ENTRY_SIZE, 10)
+        cache.put("a", "value", 100)
+        cache.put("b", "value", 100, ttl=20)
+        self.now += 9.9
+        self.assertEqual("value", cache.get("a"))
+        self.now += 0.1
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual("value", cache.get("b"))
+        self.now += 10
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats
+        self.assertEqual(2, stats["expirations"])
+        self.assertEqual(0, stats["entries"])
+        self.assertEqual(0, stats["bytes"])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TtlCache(3 * _ENTRY_SIZE, 10)
+        for key in ("a", "b", "c"):
+            cache.put(key, key, 100)
+        # Using "a" makes "b" the least recently used entry.
+        cache.get("a")
+        cache.put("d", "d", 100)
+        self.assertIsNone(cache.get("b"))
+        for key in ("a", "c", "d"):
+            self.assertEqual(key, cache.get(key))
+        self.assertEqual(1, cache.stats["evictions"])
+
+    def test_size_is_bounded_by_bytes(self):
+        cache = TtlCache(3 * _ENTRY_SIZE, 10)
+        cache.put("a", "a", 100)
+        cache.put("b", "b", 100)
+        # An entry the size of three others evicts both of them.
+        cache.put("c", "c", 100 + 2 * _ENTRY_SIZE)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual("c", cache.get("c"))
+        self.assertEqual(3 * _ENTRY_SIZE, cache.stats["bytes"])
+
+    def test_entry_larger_than_cache_is_not_stored(self):
+        cache = TtlCache(_ENTRY_SIZE, 10)
+        cache.put("a", "a", 100)
+        self.assertFalse(cache.put("b", "b", 101))
+        self.assertEqual("a", cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+    def test_invalidate(self):
+        cache = TtlCache(10 * _ENTRY_SIZE, 10)
+        cache.put("a", "a", 100)
+        cache.invalidate("a")
+        cache.invalidate("missing")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(1, cache.stats["invalidations"])
+
+    def test_invalidate_tag(self):
+        cache = TtlCache(10 * _ENTRY_SIZE, 10)
+        cache.put("a", "a", 100, tags=("alert",))
+        cache.put("b", "b", 100, tags=("alert", "case"))
+        cache.put("c", "c", 100, tags=("case",))
+        cache.invalidate_tag("alert")
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual("c", cache.get("c"))
+        self.assertEqual(2, cache.stats["invalidations"])
+        self.assertEqual(_ENTRY_SIZE, cache.stats["bytes"])
+
+
+class CanonicalHashTest(unittest.TestCase):
+    def test_hash_does_not_depend_on_key_order(self):
+        self.assertEqual(
+            canonical_hash({"query": {"a": 1, "b": [1, 2]}, "range": "0-1"}),
+            canonical_hash({"range": "0-1", "query": {"b": [1, 2], "a": 1}}))
+
+    def test_hash_depends_on_values(self):
+        self.assertNotEqual(canonical_hash({"b": [1, 2]}),
+                            canonical_hash({"b": [2, 1]}))
@@ -0,0 +1,63 @@
+from __future__ import absolute_import
+import unittest
+
+from mock import patch
+
+from dxlthehiveservice.cursors import CursorStore, SearchCursor
+
+
+def _cursor(offset=0):
+    return SearchCursor("alert", "/api/alert/_search", {"query": {}}, 10,
+                        offset, None)
+
+
+class CursorStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("dxlthehiveservice.cursors.time.time",
+                        lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cursor_can_only_be_taken_once(self):
+        store = CursorStore(10, 60)
+        cursor_id = store.put(_cursor())
+        self.assertEqual(_cursor(), store.take(cursor_id))
+        self.assertIsNone(store.take(cursor_id))
+        self.assertIsNone(store.take("unknown"))
+        self.assertEqual({"created": 1, "taken": 1, "expirations": 0,
+                          "evictions": 0, "open": 0}, store.stats)
+
+    def test_each_put_generates_a_new_id(self):
+        store = CursorStore(10, 60)
+        first_id = store.put(_cursor())
+        second_id = store.put(_cursor(10))
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(_cursor(10), store.take(second_id))
+        self.assertEqual(_cursor(), store.take(first_id))
+
+    def test_cursor_can_be_restored_under_its_id(self):
+        store = CursorStore(10, 60)
+        cursor_id = store.put(_cursor())
+        cursor = store.take(cursor_id)
+        self.assertEqual(cursor_id, store.put(cursor, cursor_id))
+        self.assertEqual(cursor, store.take(cursor_id))
+        self.assertEqual(1, store.stats["created"])
+
+    def test_unused_cursor_expires(self):
+        store = CursorStore(10, 60)
+        first_id = store.put(_cursor())
+        self.now += 30
+        second_id = store.put(_cursor(10))
+        self.now += 30
+        self.assertIsNone(store.take(first_id))
+        self.assertEqual(_cursor(10), store.take(second_id))
+        self.assertEqual(1, store.stats["expirations"])
+
+    def test_least_recently_stored_cursor_is_evicted(self):
+        store = CursorStore(2, 60)
+        cursor_ids = [store.put(_cursor(offset)) for offset in (0, 10, 20)]
+        self.assertIsNone(store.take(cursor_ids[0]))
+        self.assertEqual(_cursor(10), store.take(cursor_ids[1]))
+        self.assertEqual(_cursor(20), store.take(cursor_ids[2]))
+        self.assertEqual(1, store.stats["evictions"])
@@ -0,0 +1,136 @@
+from __future__ import absolute_import
+import json
+import unittest
+
+from dxlthehiveservice.json_stream import ArrayStreamParser, HitCollector
+
+
+def _feed_chunks(parser, data, chunk_size):
+    elements = []
+    for start in range(0, len(data), chunk_size):
+        elements.extend(parser.feed(data[start:start + chunk_size]))
+    return elements
+
+
+def _finish(collector):
+    return json.loads(collector.finish().decode("utf-8"))
+
+
+class ArrayStreamParserTest(unittest.TestCase):
+    _ELEMENTS = [
+        {"id": "a1", "title": "with \"quotes\" and \\ backslash"},
+        {"id": "a2", "tags": ["x", "y]", "{z"], "nested": {"a": [1, [2]]}},
+        "string, with ] and , inside",
+        "escaped \\\" quote",
+        12.5,
+        -3,
+        True,
+        False,
+        None,
+        [],
+        {},
+        [[1, 2], [3, [4, 5]]],
+        u"unicode \u00e9\u4e2d"
+    ]
+
+    def _assert_parses(self, data, expected):
+        for chunk_size in range(1, len(data) + 1):
+            parser = ArrayStreamParser()
+            self.assertEqual(expected,
+                             _feed_chunks(parser, data, chunk_size),
+                             "chunk size {}".format(chunk_size))
+            parser.close()
+
+    def test_parse_at_every_chunk_boundary(self):
+        self._assert_parses(json.dumps(self._ELEMENTS).encode("utf-8"),
+                            self._ELEMENTS)
+
+    def test_parse_pretty_printed(self):
+        self._assert_parses(
+            json.dumps(self._ELEMENTS, indent=2).encode("utf-8"),
+            self._ELEMENTS)
+
+    def test_parse_scalars(self):
+        self._assert_parses(b" [1,2.5 , true,false,null,\"s\"] ",
+                            [1, 2.5, True, False, None, "s"])
+
+    def test_parse_empty_array(self):
+        self._assert_parses(b"[]", [])
+        self._assert_parses(b" [ ] \n", [])
+
+    def test_element_is_returned_once_complete(self):
+        parser = ArrayStreamParser()
+        self.assertEqual([], parser.feed(b'[{"id": "a1", "t'))
+        self.assertEqual([], parser.feed(b'itle": "x\\'))
+        self.assertEqual([{"id": "a1", "title": "x\""}],
+                         parser.feed(b'""}, {"id": "a2"'))
+        self.assertEqual([{"id": "a2"}], parser.feed(b"}]"))
+        parser.close()
+
+    def test_trailing_garbage(self):
+        parser = ArrayStreamParser()
+        parser.feed(b"[1, 2] ")
+        with self.assertRaises(ValueError):
+            parser.feed(b"x")
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            ArrayStreamParser().feed(b'{"id": "a1"}')
+
+    def test_invalid_element(self):
+        with self.assertRaises(ValueError):
+            ArrayStreamParser().feed(b"[1, nope]")
+
+    def test_truncated_input(self):
+        for data in (b"", b"[", b'[{"id": "a1"}', b'[{"id": "a', b"[1, 2"):
+            parser = ArrayStreamParser()
+            parser.feed(data)
+            with self.assertRaises(ValueError):
+                parser.close()
+
+    def test_completed_elements_are_released(self):
+        parser = ArrayStreamParser()
+        parser.feed(b'[{"id": "a1", "data": "' + b"x" * 1000 + b'"}, {"id"')
+        # pylint: disable=protected-access
+        self.assertLess(len(parser._buffer), 10)
+
+
+class HitCollectorTest(unittest.TestCase):
+    _HITS = [{"id": "a{}".format(i), "title": "t{}".format(i), "severity": i}
+             for i in range(10)]
+
+    def test_collect_all(self):
+        collector = HitCollector()
+        data = json.dumps(self._HITS).encode("utf-8")
+        for start in range(0, len(data), 7):
+            self.assertFalse(collector.feed(data[start:start + 7]))
+        self.assertEqual(self._HITS, _finish(collector))
+
+    def test_project_fields(self):
+        collector = HitCollector(fields=["id", "missing"])
+        collector.feed(json.dumps(self._HITS).encode("utf-8"))
+        self.assertEqual([{"id": hit["id"]} for hit in self._HITS],
+                         _finish(collector))
+
+    def test_stop_at_limit(self):
+        collector = HitCollector(limit=3)
+        data = json.dumps(self._HITS).encode("utf-8")
+        done = False
+        fed = 0
+        while not done:
+            done = collector.feed(data[fed:fed + 5])
+            fed += 5
+        self.assertLess(fed, len(data))
+        self.assertEqual(self._HITS[:3], _finish(collector))
+
+    def test_limit_not_reached_needs_complete_array(self):
+        collector = HitCollector(limit=20)
+        collector.feed(json.dumps(self._HITS).encode("utf-8")[:-1])
+        with self.assertRaises(ValueError):
+            collector.finish()
+
+    def test_limit_reached_ignores_truncated_rest(self):
+        collector = HitCollector(limit=2)
+        self.assertTrue(collector.feed(
+            json.dumps(self._HITS).encode("utf-8")[:-10]))
+        self.assertEqual(self._HITS[:2], _finish(collector))
@@ -0,0 +1,51 @@
+from __future__ import absolute_import
+import unittest
+
+from mock import Mock, patch
+
+from dxlthehiveservice.request_context import RequestContext, RequestTimeouts
+
+
+def _request(deadline=None):
+    return Mock(destination_topic="/opendxl-thehive/service/thehive-api/"
+                                  "alert/get",
+                other_fields={"deadline": deadline} if deadline else {})
+
+
+class CallerDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("dxlthehiveservice.request_context.time.time",
+                        lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.timeouts = RequestTimeouts(max_queue_age=5)
+
+    def test_future_deadline_bounds_expiry(self):
+        context = RequestContext(_request("1002.5"), timeouts=self.timeouts)
+        self.assertEqual(1002.5, context.caller_deadline)
+        self.assertEqual(1002.5, context.deadline)
+        self.assertEqual(1002.5, context.expires_at)
+        self.assertFalse(context.expired())
+
+    def test_deadline_passed_within_max_queue_age_expires_request(self):
+        context = RequestContext(_request("998"), timeouts=self.timeouts)
+        self.assertEqual(998, context.expires_at)
+        self.assertTrue(context.expired())
+
+    def test_deadline_passed_by_more_than_max_queue_age_is_ignored(self):
+        context = RequestContext(_request("900"), timeouts=self.timeouts)
+        self.assertIsNone(context.caller_deadline)
+        self.assertIsNone(context.deadline)
+        self.assertEqual(1005, context.expires_at)
+        self.assertFalse(context.expired())
+
+    def test_passed_deadline_is_ignored_without_max_queue_age(self):
+        context = RequestContext(_request("999"))
+        self.assertIsNone(context.caller_deadline)
+        self.assertIsNone(context.expires_at)
+        self.assertFalse(context.expired())
+
+    def test_invalid_deadline(self):
+        with self.assertRaises(ValueError):
+            RequestContext(_request("tomorrow"))
@@ -1,3 +1,4 @@
+# pylint: disable=too-many-lines
 from __future__ import absolute_import
 import base64
 import json
@@ -5,6 +6,7 @@ import os
 import re
 import sys
 from tempfile import NamedTemporaryFile
+import time
 import unittest
 
 if sys.version_info[0] > 2:
@@ -68,11 +70,18 @@ class Sample(unittest.TestCase):
         return mock_print
 
     def run_sample(self, sample_file, add_request_mocks_fn=None,
-                   api_password=""):
+                   api_password="", config_settings=None):
         with dxlthehiveservice.TheHiveService("sample") as app:
             config = ConfigParser()
             config.read(app._app_config_path)
 
+            # Settings which are commented out in the sample configuration
+            # but which the sample depends upon
+            for section, option, value in config_settings or []:
+                if not config.has_section(section):
+                    config.add_section(section)
+                config.set(section, option, value)
+
             use_mock_requests = not config.has_option(
                 dxlthehiveservice.TheHiveService._GENERAL_CONFIG_SECTION,
                 dxlthehiveservice.TheHiveService._GENERAL_API_PRINCIPAL_CONFIG_PROP
@@ -107,20 +116,21 @@ class Sample(unittest.TestCase):
                     dxlthehiveservice.TheHiveService._GENERAL_USE_SSL_CONFIG_PROP,
                     "yes"
                 )
-                with NamedTemporaryFile(mode="w+", delete=False) \
-                    as temp_config_file:
-                    config.write(temp_config_file)
-                try:
-                    app._app_config_path = temp_config_file.name
+            with NamedTemporaryFile(mode="w+", delete=False) \
+                as temp_config_file:
+                config.write(temp_config_file)
+            try:
+                app._app_config_path = temp_config_file.name
+                if use_mock_requests:
                     with requests_mock.mock(case_sensitive=True) as req_mock:
                         if add_request_mocks_fn:
                             add_request_mocks_fn(req_mock)
                         mock_print = self._run_sample(app, sample_file)
-                finally:
-                    os.remove(temp_config_file.name)
-            else:
-                mock_print = self._run_sample(app, sample_file)
-                req_mock = None
+                else:
+                    mock_print = self._run_sample(app, sample_file)
+                    req_mock = None
+            finally:
+                os.remove(temp_config_file.name)
         return (mock_print, req_mock)
 
     def test_basic_alert_example(self):
@@ -503,3 +513,635 @@ class Sample(unittest.TestCase):
             )
         )
         mock_print.assert_any_call(StringDoesNotMatch("Error invoking request"))
+
+    def test_basic_get_chunk_example(self):
+        expected_alert_details = [
+            {
+                "id": "alert{}".format(index),
+                "title": "OpenDXL Alert Example",
+                "description": "Created by the OpenDXL Alert Example " +
+                               "x" * 500,
+                "severity": 3,
+                "source": "OpenDXL",
+                "sourceRef": "{:016x}".format(index),
+                "type": "external"
+            } for index in range(100)
+        ]
+
+        def add_search_alert_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/alert/_search"),
+                          text=json.dumps(expected_alert_details))
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_get_chunk_example.py",
+            add_search_alert_request_mocks,
+            config_settings=[("Chunking", "maxMessageBytes", "16384")]
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(1, request_count)
+
+            self.assertEqual({
+                "query": {"_string": "title:(OpenDXL AND Alert)"},
+                "range": "all",
+                "sort": ["-createdAt"]
+            }, req_mock.request_history[0].json())
+
+            mock_print.assert_any_call(
+                "Number of alerts in the response: {}".format(
+                    len(expected_alert_details)))
+            mock_print.assert_any_call(
+                StringMatches("Number of chunks in the response: [2-9]"))
+            mock_print.assert_any_call(
+                StringMatches(
+                    self.expected_print_output(
+                        "Most recent alert in the response:",
+                        expected_alert_details[0]
+                    )
+                )
+            )
+        mock_print.assert_any_call(StringDoesNotMatch("Error"))
+
+    def test_basic_compression_example(self):
+        expected_alert_details = [
+            {
+                "id": "alert{}".format(index),
+                "title": "OpenDXL Alert Example",
+                "description": "Created by the OpenDXL Alert Example",
+                "severity": 3,
+                "source": "OpenDXL",
+                "sourceRef": "{:016x}".format(index),
+                "type": "external"
+            } for index in range(10)
+        ]
+
+        def add_search_alert_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/alert/_search"),
+                          text=json.dumps(expected_alert_details))
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_compression_example.py",
+            add_search_alert_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(1, request_count)
+
+            self.assertEqual({
+                "query": {"_string": "title:(OpenDXL AND Alert)"},
+                "range": "0-10",
+                "sort": ["-createdAt"]
+            }, req_mock.request_history[0].json())
+
+            mock_print.assert_any_call(
+                StringMatches("Encoding of the response: (gzip|zstd)"))
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the search alert request:",
+                    expected_alert_details
+                )
+            )
+        )
+        mock_print.assert_any_call(StringDoesNotMatch("Error"))
+
+    def test_basic_get_alert_bulk_example(self):
+        expected_alert_details = [
+            {
+                "id": "alert{}".format(index),
+                "title": "OpenDXL Alert Example",
+                "description": "Created by the OpenDXL Alert Example",
+                "severity": 3,
+                "source": "OpenDXL",
+                "sourceRef": "{:016x}".format(index),
+                "type": "external"
+            } for index in range(3)
+        ]
+        missing_alert_id = "opendxl-missing-alert"
+
+        def add_get_alert_bulk_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/alert/_search"),
+                          text=json.dumps(expected_alert_details))
+            for alert_detail in expected_alert_details:
+                req_mock.get(
+                    self.get_api_endpoint(
+                        "api/alert/{}".format(alert_detail["id"])),
+                    text=json.dumps(alert_detail))
+            req_mock.get(
+                self.get_api_endpoint("api/alert/{}".format(missing_alert_id)),
+                status_code=404,
+                text=json.dumps({
+                    "type": "NotFoundError",
+                    "message": "alert {} not found".format(missing_alert_id)
+                }))
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_get_alert_bulk_example.py",
+            add_get_alert_bulk_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(5, request_count)
+
+            self.assertEqual({
+                "query": {"_string": "title:(OpenDXL AND Alert)"},
+                "range": "0-3",
+                "sort": ["-createdAt"]
+            }, req_mock.request_history[0].json())
+            self.assertEqual(
+                sorted(["/api/alert/{}".format(alert_detail["id"])
+                        for alert_detail in expected_alert_details] +
+                       ["/api/alert/{}".format(missing_alert_id)]),
+                sorted(request.path
+                       for request in req_mock.request_history[1:]))
+
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the bulk get alert request:",
+                    {
+                        "results": [
+                            {"id": alert_detail["id"],
+                             "result": alert_detail,
+                             "status": 200}
+                            for alert_detail in expected_alert_details
+                        ] + [
+                            {"error": "alert {} not found".format(
+                                missing_alert_id),
+                             "id": missing_alert_id,
+                             "status": 404}
+                        ]
+                    }
+                )
+            )
+        )
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
+
+    def test_basic_create_alert_bulk_example(self):
+        expected_alert_detail = {
+            "title": "OpenDXL Alert Example",
+            "description": "Created by the OpenDXL Bulk Alert Example",
+            "severity": 3,
+            "source": "OpenDXL",
+            "type": "external"
+        }
+
+        def create_alert(request, context):
+            alert_detail = request.json()
+            if "title" not in alert_detail:
+                context.status_code = 400
+                return json.dumps({"type": "AttributeCheckingError",
+                                   "message":
+                                       'Attribute "title" is missing'})
+            alert_detail["id"] = "alert" + alert_detail["sourceRef"]
+            return json.dumps(alert_detail)
+
+        def add_create_alert_bulk_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/alert"),
+                          text=create_alert)
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_create_alert_bulk_example.py",
+            add_create_alert_bulk_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(3, request_count)
+
+            alert_requests = [request.json()
+                              for request in req_mock.request_history]
+            self.assertEqual(3, len(set(alert_request["sourceRef"]
+                                        for alert_request in alert_requests)))
+            self.assertEqual(
+                1, len([alert_request for alert_request in alert_requests
+                        if "title" not in alert_request]))
+
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the bulk create alert request:",
+                    {
+                        "results": [
+                            {"index": 0, "result": expected_alert_detail,
+                             "status": 200},
+                            {"index": 1, "result": expected_alert_detail,
+                             "status": 200},
+                            {"index": 2, "status": 400}
+                        ]
+                    }
+                )
+            )
+        )
+        mock_print.assert_any_call(StringMatches(".*title.* is missing"))
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
+
+    def test_basic_create_case_observable_bulk_example(self):
+        mock_case_id = "123456"
+        expected_case_detail = {
+            "title": "OpenDXL Case Observable Bulk Example",
+            "description": "Created by the OpenDXL Case Observable Bulk Example",
+            "severity": 3
+        }
+        expected_observable_details = [
+            {
+                "data": data,
+                "message": "Created by the OpenDXL Case Observable Bulk "
+                           "Example",
+                "dataType": data_type
+            } for data, data_type in (("192.168.1.1", "ip"),
+                                      ("192.168.1.2", "ip"),
+                                      ("192.168.1.3", "ip"),
+                                      ("opendxl.com", "domain"))
+        ]
+        mock_case_detail_with_id = expected_case_detail.copy()
+        mock_case_detail_with_id["id"] = mock_case_id
+
+        def create_observables(request, _context):
+            observable_detail = request.json()
+            if not isinstance(observable_detail["data"], list):
+                observable_detail["id"] = "artifact-" + \
+                    observable_detail["data"]
+                return json.dumps(observable_detail)
+            observable_details = []
+            for data in observable_detail["data"]:
+                observable_detail_with_id = dict(observable_detail)
+                observable_detail_with_id["data"] = data
+                observable_detail_with_id["id"] = "artifact-" + data
+                observable_details.append(observable_detail_with_id)
+            return json.dumps(observable_details)
+
+        def add_create_case_observable_bulk_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/case"),
+                          text=json.dumps(mock_case_detail_with_id))
+            req_mock.post(
+                self.get_api_endpoint(
+                    "api/case/{}/artifact".format(mock_case_id)),
+                status_code=201,
+                text=create_observables)
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_create_case_observable_bulk_example.py",
+            add_create_case_observable_bulk_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(3, request_count)
+
+            new_case_request = req_mock.request_history[0]
+            self.assertEqual(expected_case_detail, new_case_request.json())
+
+            # The ip observables are combined into a single request.
+            multi_value_observable_detail = \
+                expected_observable_details[0].copy()
+            multi_value_observable_detail["data"] = [
+                observable_detail["data"]
+                for observable_detail in expected_observable_details[:3]]
+            self.assertEqual(
+                sorted([multi_value_observable_detail,
+                        expected_observable_details[3]],
+                       key=json.dumps),
+                sorted([request.json()
+                        for request in req_mock.request_history[1:]],
+                       key=json.dumps))
+
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the bulk create case observable request:",
+                    {
+                        "results": [
+                            {"index": index, "result": observable_detail,
+                             "status": 201}
+                            for index, observable_detail
+                            in enumerate(expected_observable_details)
+                        ]
+                    }
+                )
+            )
+        )
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
+
+    def test_basic_create_case_full_example(self):
+        mock_case_id = "123456"
+        expected_case_detail = {
+            "title": "OpenDXL Case Full Example",
+            "description": "Created by the OpenDXL Case Full Example",
+            "severity": 3
+        }
+        expected_task_details = [
+            {
+                "title": "OpenDXL Case Full Example Task {}".format(index),
+                "description": "Created by the OpenDXL Case Full Example",
+                "status": "InProgress"
+            } for index in range(1, 3)
+        ]
+        expected_observable_details = [
+            {
+                "data": data,
+                "message": "Created by the OpenDXL Case Full Example",
+                "dataType": "ip"
+            } for data in ("192.168.1.1", "192.168.1.2")
+        ]
+        mock_case_detail_with_id = expected_case_detail.copy()
+        mock_case_detail_with_id["id"] = mock_case_id
+
+        def create_task(request, _context):
+            task_detail = request.json()
+            task_detail["id"] = "task-" + task_detail["title"][-1]
+            return json.dumps(task_detail)
+
+        def create_observables(request, context):
+            observable_detail = request.json()
+            if "dataType" not in observable_detail:
+                context.status_code = 400
+                return json.dumps({"type": "AttributeCheckingError",
+                                   "message": "dataType is missing"})
+            observable_details = []
+            for data in observable_detail["data"]:
+                observable_detail_with_id = dict(observable_detail)
+                observable_detail_with_id["data"] = data
+                observable_detail_with_id["id"] = "artifact-" + data
+                observable_details.append(observable_detail_with_id)
+            return json.dumps(observable_details)
+
+        def add_create_case_full_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/case"),
+                          text=json.dumps(mock_case_detail_with_id))
+            req_mock.post(
+                self.get_api_endpoint("api/case/{}/task".format(mock_case_id)),
+                status_code=201,
+                text=create_task)
+            req_mock.post(
+                self.get_api_endpoint(
+                    "api/case/{}/artifact".format(mock_case_id)),
+                status_code=201,
+                text=create_observables)
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_create_case_full_example.py",
+            add_create_case_full_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(5, request_count)
+
+            new_case_request = req_mock.request_history[0]
+            self.assertEqual(expected_case_detail, new_case_request.json())
+
+            child_requests = req_mock.request_history[1:]
+            self.assertEqual(
+                sorted(task_detail["title"]
+                       for task_detail in expected_task_details),
+                sorted(request.json()["title"] for request in child_requests
+                       if request.path.endswith("/task")))
+
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the create full case request:",
+                    {
+                        "case": mock_case_detail_with_id,
+                        "failed": {"observables": [2],
+                                   "parentId": mock_case_id},
+                        "observables": [
+                            {"index": index, "result": observable_detail,
+                             "status": 201}
+                            for index, observable_detail
+                            in enumerate(expected_observable_details)
+                        ] + [
+                            {"error": "dataType is missing", "index": 2,
+                             "status": 400}
+                        ],
+                        "tasks": [
+                            {"index": index, "result": task_detail,
+                             "status": 201}
+                            for index, task_detail
+                            in enumerate(expected_task_details)
+                        ]
+                    }
+                )
+            )
+        )
+        mock_print.assert_any_call(
+            "Indexes of the observables which could not be created for case "
+            "'{}': [2]".format(mock_case_id))
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
+
+    def test_basic_get_case_full_example(self):
+        mock_case_id = "123456"
+        expected_case_detail = {
+            "title": "OpenDXL Case Get Full Example",
+            "description": "Created by the OpenDXL Case Get Full Example",
+            "severity": 3
+        }
+        expected_task_detail = {
+            "title": "OpenDXL Case Get Full Example Task",
+            "description": "Created by the OpenDXL Case Get Full Example",
+            "status": "InProgress"
+        }
+        expected_observable_detail = {
+            "data": "OpenDXL",
+            "message": "Created by the OpenDXL Case Get Full Example",
+            "dataType": "user-agent"
+        }
+        mock_case_detail_with_id = expected_case_detail.copy()
+        mock_case_detail_with_id["id"] = mock_case_id
+        mock_task_detail_with_id = expected_task_detail.copy()
+        mock_task_detail_with_id["id"] = "task1"
+        mock_observable_detail_with_id = expected_observable_detail.copy()
+        mock_observable_detail_with_id["id"] = "artifact1"
+
+        def add_get_case_full_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/case"),
+                          text=json.dumps(mock_case_detail_with_id))
+            req_mock.post(
+                self.get_api_endpoint("api/case/{}/task".format(mock_case_id)),
+                status_code=201,
+                text=json.dumps(mock_task_detail_with_id))
+            req_mock.post(
+                self.get_api_endpoint(
+                    "api/case/{}/artifact".format(mock_case_id)),
+                status_code=201,
+                text=json.dumps([mock_observable_detail_with_id]))
+            req_mock.get(
+                self.get_api_endpoint("api/case/{}".format(mock_case_id)),
+                text=json.dumps(mock_case_detail_with_id))
+            req_mock.post(self.get_api_endpoint("api/case/task/_search"),
+                          text=json.dumps([mock_task_detail_with_id]))
+            req_mock.post(self.get_api_endpoint("api/case/artifact/_search"),
+                          text=json.dumps([mock_observable_detail_with_id]))
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_get_case_full_example.py",
+            add_get_case_full_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(6, request_count)
+
+            search_requests = {
+                request.path: request
+                for request in req_mock.request_history[3:]
+                if request.path.endswith("/_search")
+            }
+            expected_search_query = {
+                "query": {"_parent": {"_type": "case",
+                                      "_query": {"_id": mock_case_id}}}
+            }
+            task_search_request = search_requests["/api/case/task/_search"]
+            self.assertEqual({"range": ["all"]}, task_search_request.qs)
+            self.assertEqual(expected_search_query,
+                             task_search_request.json())
+            observable_search_request = \
+                search_requests["/api/case/artifact/_search"]
+            self.assertEqual({"range": ["0-10"]},
+                             observable_search_request.qs)
+            self.assertEqual(expected_search_query,
+                             observable_search_request.json())
+
+        mock_print.assert_any_call(
+            "Id of the case created by the create full case request: "
+            "'{}'".format(mock_case_id))
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the get full case request:",
+                    {
+                        "case": mock_case_detail_with_id,
+                        "observables": [mock_observable_detail_with_id],
+                        "tasks": [mock_task_detail_with_id]
+                    }
+                )
+            )
+        )
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
+
+    def test_basic_search_alert_paged_example(self):
+        expected_alert_details = [
+            {
+                "id": "alert{}".format(index),
+                "title": "OpenDXL Alert Example",
+                "createdAt": 1524002836273 - index
+            } for index in range(5)
+        ]
+
+        def search_alerts(request, _context):
+            start, end = [int(bound) for bound in
+                          request.json()["range"].split("-")]
+            return json.dumps(expected_alert_details[start:end])
+
+        def add_search_alert_paged_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/alert/_search"),
+                          text=search_alerts)
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_search_alert_paged_example.py",
+            add_search_alert_paged_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(3, request_count)
+
+            for request, expected_range in zip(req_mock.request_history,
+                                               ("0-3", "2-5", "4-7")):
+                self.assertEqual({
+                    "query": {"_string": "title:(OpenDXL AND Alert)"},
+                    "range": expected_range,
+                    "sort": ["-createdAt"]
+                }, request.json())
+
+        for page in range(1, 3):
+            mock_print.assert_any_call(
+                StringMatches(
+                    self.expected_print_output(
+                        "Response for page {} of the paged search alert "
+                        "request:".format(page),
+                        {
+                            "cursor": ".*",
+                            "results": expected_alert_details[
+                                (page - 1) * 2:page * 2]
+                        }
+                    )
+                )
+            )
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for page 3 of the paged search alert request:",
+                    {
+                        "cursor": None,
+                        "results": expected_alert_details[4:]
+                    }
+                )
+            )
+        )
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
+
+    def test_basic_search_alert_partitioned_example(self):
+        day = 24 * 60 * 60 * 1000
+        now = int(time.time() * 1000)
+        # One alert for each of the last eight days, which fall into three of
+        # the four weekly partitions, and one which is too old to be found.
+        expected_alert_details = [
+            {
+                "id": "alert{}".format(index),
+                "title": "OpenDXL Alert Example",
+                "createdAt": now - index * day - 1000
+            } for index in (0, 1, 2, 3, 4, 5, 6, 7, 30)
+        ]
+
+        def search_alerts(request, _context):
+            between = request.json()["query"]["_and"][1]["_between"]
+            return json.dumps([
+                alert_detail for alert_detail in expected_alert_details
+                if between["_from"] <= alert_detail["createdAt"] <
+                between["_to"]])
+
+        def add_search_alert_partitioned_request_mocks(req_mock):
+            req_mock.post(self.get_api_endpoint("api/alert/_search"),
+                          text=search_alerts)
+
+        mock_print, req_mock = self.run_sample(
+            "sample/basic/basic_search_alert_partitioned_example.py",
+            add_search_alert_partitioned_request_mocks
+        )
+
+        if req_mock:
+            request_count = len(req_mock.request_history)
+            self.assertEqual(4, request_count)
+
+            for request in req_mock.request_history:
+                search_request = request.json()
+                self.assertEqual("0-5", search_request["range"])
+                self.assertEqual(["-createdAt"], search_request["sort"])
+                self.assertEqual(
+                    {"_string": "title:(OpenDXL AND Alert)"},
+                    search_request["query"]["_and"][0])
+            # The partitions are consecutive intervals of the last 28 days.
+            intervals = sorted(
+                (between["_from"], between["_to"]) for between in (
+                    request.json()["query"]["_and"][1]["_between"]
+                    for request in req_mock.request_history))
+            for interval, next_interval in zip(intervals, intervals[1:]):
+                self.assertEqual(interval[1], next_interval[0])
+            self.assertEqual(28 * day + 1,
+                             intervals[-1][1] - intervals[0][0])
+
+        mock_print.assert_any_call(
+            StringMatches(
+                self.expected_print_output(
+                    "Response for the partitioned search alert request:",
+                    expected_alert_details[:5]
+                )
+            )
+        )
+        mock_print.assert_any_call(StringDoesNotMatch("alert5"))
+        mock_print.assert_any_call(StringDoesNotMatch("Error invoking"))
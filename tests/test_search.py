@@ -0,0 +1,129 @@
+from __future__ import absolute_import
+import json
+import unittest
+
+from dxlthehiveservice.fanout import completed_future
+from dxlthehiveservice.search import SearchMixin, _sort_hits
+from dxlthehiveservice.thehive_response import TheHiveResponse
+
+
+def _response(hits, status_code=200):
+    return completed_future(
+        TheHiveResponse(status_code, json.dumps(hits).encode("utf8")))
+
+
+class SortHitsTest(unittest.TestCase):
+    def test_sort_by_several_fields(self):
+        hits = [{"id": "a", "severity": 1, "createdAt": 3},
+                {"id": "b", "severity": 2, "createdAt": 1},
+                {"id": "c", "severity": 1, "createdAt": 2}]
+        _sort_hits(hits, ["-severity", "+createdAt"])
+        self.assertEqual(["b", "c", "a"], [hit["id"] for hit in hits])
+
+    def test_missing_values_sort_last(self):
+        for sort in (["createdAt"], ["-createdAt"]):
+            hits = [{"id": "a"}, {"id": "b", "createdAt": None},
+                    {"id": "c", "createdAt": 1}, {"id": "d", "createdAt": 2}]
+            _sort_hits(hits, sort)
+            self.assertEqual(["a", "b"], [hit["id"] for hit in hits[2:]])
+
+    def test_values_of_different_types_are_ordered_by_type(self):
+        hits = [{"id": "a", "value": "text"}, {"id": "b", "value": [1]},
+                {"id": "c", "value": 2}, {"id": "d", "value": 1.5}]
+        _sort_hits(hits, ["value"])
+        self.assertEqual(["d", "c", "a", "b"], [hit["id"] for hit in hits])
+
+
+class PartitionTest(unittest.TestCase):
+    def setUp(self):
+        self.search = SearchMixin()
+        self.search._max_partitions = 4
+
+    def test_partition_by_window(self):
+        bodies = self.search._partition_by_window(
+            {"query": {"status": "New"}}, (10, 35), 10)
+        self.assertEqual(["10-20", "20-30", "30-35"],
+                         [body["range"] for body in bodies])
+        self.assertEqual({"status": "New"}, bodies[0]["query"])
+
+    def test_partition_by_window_requires_range(self):
+        with self.assertRaises(ValueError):
+            self.search._partition_by_window({}, None, 10)
+
+    def test_partition_by_window_limits_partitions(self):
+        with self.assertRaises(ValueError):
+            self.search._partition_by_window({}, (0, 50), 10)
+
+    def test_partition_by_field(self):
+        bodies = self.search._partition_by_field(
+            {"query": {"status": "New"}}, (0, 5), "createdAt", 0, 10, 2)
+        self.assertEqual([
+            {"range": "0-5",
+             "query": {"_and": [
+                 {"status": "New"},
+                 {"_between": {"_field": "createdAt", "_from": 0,
+                               "_to": 5}}]}},
+            {"range": "0-5",
+             "query": {"_and": [
+                 {"status": "New"},
+                 {"_between": {"_field": "createdAt", "_from": 5,
+                               "_to": 10}}]}}
+        ], bodies)
+
+    def test_partition_by_field_skips_empty_intervals(self):
+        bodies = self.search._partition_by_field({}, None, "createdAt", 0,
+                                                 2, 4)
+        self.assertEqual(
+            [(0, 1), (1, 2)],
+            [(body["query"]["_between"]["_from"],
+              body["query"]["_between"]["_to"]) for body in bodies])
+        self.assertEqual("all", bodies[0]["range"])
+
+    def test_partition_by_field_limits_partitions(self):
+        with self.assertRaises(ValueError):
+            self.search._partition_by_field({}, None, "createdAt", 0, 10, 5)
+
+
+class MergePartitionsTest(unittest.TestCase):
+    def setUp(self):
+        self.search = SearchMixin()
+
+    def test_results_are_sorted_and_limited_to_range(self):
+        response = self.search._merge_partitions(
+            (1, 3), ["-createdAt"], None,
+            [_response([{"id": "a", "createdAt": 1},
+                        {"id": "b", "createdAt": 4}]),
+             _response([{"id": "c", "createdAt": 3},
+                        {"id": "d", "createdAt": 2}])])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["c", "d"], [hit["id"] for hit in response.json()])
+
+    def test_results_on_interval_boundary_are_not_repeated(self):
+        response = self.search._merge_partitions(
+            (0, 10), ["createdAt"], None,
+            [_response([{"id": "a", "createdAt": 1},
+                        {"id": "b", "createdAt": 5}]),
+             _response([{"id": "b", "createdAt": 5},
+                        {"id": "c", "createdAt": 6}])])
+        self.assertEqual(["a", "b", "c"],
+                         [hit["id"] for hit in response.json()])
+
+    def test_results_without_range_are_concatenated(self):
+        response = self.search._merge_partitions(
+            None, ["createdAt"], None,
+            [_response([{"id": "b", "createdAt": 2}]),
+             _response([{"id": "a", "createdAt": 1}])])
+        self.assertEqual(["b", "a"], [hit["id"] for hit in response.json()])
+
+    def test_results_are_projected_to_fields(self):
+        response = self.search._merge_partitions(
+            (0, 10), [], ["id"],
+            [_response([{"id": "a", "title": "Alert"}])])
+        self.assertEqual([{"id": "a"}], response.json())
+
+    def test_failed_partition_fails_search(self):
+        failed = TheHiveResponse(500, b'{"message": "failed"}')
+        response = self.search._merge_partitions(
+            (0, 10), [], None,
+            [_response([{"id": "a"}]), completed_future(failed)])
+        self.assertIs(failed, response)
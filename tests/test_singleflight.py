@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+from concurrent.futures import Future
+import unittest
+
+from dxlthehiveservice.singleflight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.calls = []
+
+    def _call(self, key):
+        def _make_call():
+            future = Future()
+            self.calls.append((key, future))
+            return future
+        return self.single_flight.call(key, _make_call)
+
+    def test_identical_calls_in_flight_are_coalesced(self):
+        first = self._call("a")
+        second = self._call("a")
+        self.assertIs(first, second)
+        self.assertEqual(1, len(self.calls))
+        self.calls[0][1].set_result("result")
+        self.assertEqual("result", first.result(0))
+        self.assertEqual({"calls": 1, "coalesced": 1, "inFlight": 0},
+                         self.single_flight.stats)
+
+    def test_different_keys_are_not_coalesced(self):
+        first = self._call("a")
+        second = self._call("b")
+        self.assertIsNot(first, second)
+        self.assertEqual(["a", "b"], [key for key, _ in self.calls])
+        self.assertEqual(2, self.single_flight.stats["inFlight"])
+
+    def test_call_is_made_again_once_complete(self):
+        first = self._call("a")
+        self.calls[0][1].set_result("first")
+        second = self._call("a")
+        self.assertIsNot(first, second)
+        self.assertEqual(2, len(self.calls))
+        self.calls[1][1].set_result("second")
+        self.assertEqual("first", first.result(0))
+        self.assertEqual("second", second.result(0))
+
+    def test_exception_is_shared(self):
+        first = self._call("a")
+        second = self._call("a")
+        self.calls[0][1].set_exception(ValueError("failed"))
+        for future in (first, second):
+            with self.assertRaises(ValueError):
+                future.result(0)
+        self.assertEqual(0, self.single_flight.stats["inFlight"])
+
+    def test_exception_raised_by_call(self):
+        def _raise():
+            raise ValueError("failed")
+        future = self.single_flight.call("a", _raise)
+        with self.assertRaises(ValueError):
+            future.result(0)
+        self.assertEqual(0, self.single_flight.stats["inFlight"])
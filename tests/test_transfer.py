@@ -0,0 +1,59 @@
+from __future__ import absolute_import
+import threading
+import unittest
+
+from dxlthehiveservice.fanout import completed_future
+from dxlthehiveservice.thehive_client import TheHiveClient
+from dxlthehiveservice.thehive_response import TheHiveResponse
+
+
+class CompressedRequestResponseTest(unittest.TestCase):
+    def setUp(self):
+        # Only the state used for the fallback from compressed requests is
+        # set, so the client is not initialized.
+        self.client = TheHiveClient.__new__(TheHiveClient)
+        self.client._compressed_requests_rejected = threading.Event()
+        self.client._compressed_requests_accepted = threading.Event()
+        self.client._stats_lock = threading.Lock()
+        self.sent = []
+
+    def _send(self, response):
+        def send(data, headers=None):
+            self.sent.append((data, headers))
+            return completed_future(response)
+        return send
+
+    def test_bad_request_is_retried_uncompressed(self):
+        response = self.client._on_compressed_request_response(
+            self._send(TheHiveResponse(201, b'{"id": "a"}')), b'{"title": ""}',
+            TheHiveResponse(400, b'{"type": "BadRequest", '
+                                 b'"message": "Invalid Json: Unexpected '
+                                 b'character"}')).result()
+        self.assertEqual(201, response.status_code)
+        self.assertEqual([(b'{"title": ""}', None)], self.sent)
+        self.assertTrue(self.client._compressed_requests_rejected.is_set())
+
+    def test_bad_request_for_uncompressed_retry_keeps_compression(self):
+        retry_response = TheHiveResponse(400, b'{"message": "Invalid alert"}')
+        response = self.client._on_compressed_request_response(
+            self._send(retry_response), b"{}",
+            TheHiveResponse(400, b'{"message": "Invalid Json"}')).result()
+        self.assertIs(retry_response, response)
+        self.assertFalse(self.client._compressed_requests_rejected.is_set())
+
+    def test_bad_request_is_not_retried_once_compression_is_accepted(self):
+        self.client._on_compressed_request_response(
+            self._send(None), b"{}", TheHiveResponse(201, b'{"id": "a"}'))
+        bad_request = TheHiveResponse(400, b'{"message": "Invalid alert"}')
+        response = self.client._on_compressed_request_response(
+            self._send(None), b"{}", bad_request).result()
+        self.assertIs(bad_request, response)
+        self.assertEqual([], self.sent)
+
+    def test_unsupported_media_type_is_retried_uncompressed(self):
+        self.client._compressed_requests_accepted.set()
+        response = self.client._on_compressed_request_response(
+            self._send(TheHiveResponse(201, b'{"id": "a"}')), b"{}",
+            TheHiveResponse(415, b"")).result()
+        self.assertEqual(201, response.status_code)
+        self.assertTrue(self.client._compressed_requests_rejected.is_set())